@@ -2,6 +2,9 @@
 ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Live issue events are served by `tracker.streams` next to Django, whose
+ASGI handler cannot stream from async code, and streaming responses are
+read off the event loop by `core.async_views.ASGIHandler`.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -9,8 +12,25 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+os.environ.setdefault('ROOT_URLCONF', 'app.urls_asgi')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from django.conf import settings  # noqa: E402
+from core.async_views import ASGIHandler  # noqa: E402
+from tracker.streams import issue_events  # noqa: E402
+
+django_application = ASGIHandler()
+
+
+async def application(scope, receive, send):
+    """Serve the event stream path, and everything else with Django."""
+    if (
+        scope["type"] == "http"
+        and scope["path"] == settings.TRACKER_EVENTS_PATH
+    ):
+        return await issue_events(scope, receive, send)
+    return await django_application(scope, receive, send)
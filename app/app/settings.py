@@ -55,6 +55,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.HealthCheckMiddleware",
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -65,7 +68,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "app.urls"
+ROOT_URLCONF = os.environ.get("ROOT_URLCONF", "app.urls")
 
 TEMPLATES = [
     {
@@ -89,13 +92,73 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# The pooling backend hands each request a connection from an in-process
+# pool and takes it back when Django closes it, so CONN_MAX_AGE stays 0.
+# With DB_ENGINE=django.db.backends.postgresql, set DB_CONN_MAX_AGE to
+# keep one persistent connection per worker thread instead.
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": os.environ.get("DB_ENGINE", "core.backends.postgresql_pool"),
         "HOST": os.environ.get("DB_HOST"),
         "NAME": os.environ.get("DB_NAME"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0)),
+        "POOL": {
+            "MIN_SIZE": int(os.environ.get("DB_POOL_MIN_SIZE", 1)),
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 20)),
+            "MAX_LIFETIME": float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+            "MAX_IDLE": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+            "CHECK_INTERVAL": float(
+                os.environ.get("DB_POOL_CHECK_INTERVAL", 5)
+            ),
+        },
+    }
+}
+
+# Read replicas, one alias per host in DB_REPLICA_HOSTS. Safe requests
+# read from a replica within REPLICA_MAX_LAG_SECONDS of the primary, and a
+# client that writes reads from the primary for REPLICA_STICKY_SECONDS.
+# The pins live in the default cache, so replicas are only used when
+# that cache is shared by every worker. Tests run the replicas as mirrors of the default test database.
+
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), 1
+):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["core.routing.ReplicaRouter"]
+
+REPLICA_STICKY_SECONDS = float(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_SECONDS = float(
+    os.environ.get("REPLICA_LAG_CHECK_SECONDS", 1)
+)
+# Always read from the primary: a token is used right after it's created,
+# by a client the sticky window can't recognise yet.
+REPLICA_PRIMARY_MODELS = ["core.authtoken", "sessions.session"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Tracker response caching and the replica read-your-writes pin need a
+# cache every worker shares; deploys use memcached. With the per-process
+# default, responses are not cached.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
@@ -153,16 +216,104 @@ AUTH_USER_MODEL = "core.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.ExpiringTokenAuthentication",
         "rest_framework.authentication.BasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    "DEFAULT_PAGINATION_CLASS": "tracker.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
+TOKEN_AUTH_CACHE_SIZE = int(os.environ.get("TOKEN_AUTH_CACHE_SIZE", 10000))
+TOKEN_AUTH_CACHE_TTL = int(os.environ.get("TOKEN_AUTH_CACHE_TTL", 60))
+# Tokens expire after this many days without use.
+TOKEN_IDLE_DAYS = int(os.environ.get("TOKEN_IDLE_DAYS", 30))
+TOKEN_LAST_USED_FLUSH_SECONDS = float(
+    os.environ.get("TOKEN_LAST_USED_FLUSH_SECONDS", 60)
+)
+
+METRICS_ENABLED = bool(int(os.environ.get("METRICS_ENABLED", 1)))
+METRICS_PATH = "/metrics"
+# Bearer token scrapers send to METRICS_PATH. Without one the endpoint
+# is only served when DEBUG is on.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+HEALTH_CHECK_LIVE_PATH = "/api/health-check/live/"
+HEALTH_CHECK_READY_PATH = "/api/health-check/ready/"
+HEALTH_CHECK_CACHE_SECONDS = float(
+    os.environ.get("HEALTH_CHECK_CACHE_SECONDS", 5)
+)
+
+ASYNC_VIEW_THREADS = int(os.environ.get("ASYNC_VIEW_THREADS", 20))
+
+TRACKER_CACHE_ALIAS = "default"
+TRACKER_CACHE_TIMEOUT = int(os.environ.get("TRACKER_CACHE_TIMEOUT", 300))
+TRACKER_BULK_MAX_ITEMS = int(os.environ.get("TRACKER_BULK_MAX_ITEMS", 1000))
+TRACKER_EXPORT_CHUNK_SIZE = int(
+    os.environ.get("TRACKER_EXPORT_CHUNK_SIZE", 2000)
+)
+TRACKER_CLOSED_STATUSES = ["Closed"]
+TRACKER_STATS_MAX_DAYS = int(os.environ.get("TRACKER_STATS_MAX_DAYS", 366))
+TRACKER_FAST_READS = bool(int(os.environ.get("TRACKER_FAST_READS", 1)))
+# Changes newer than this are held back from the change feed, so writes
+# committing out of timestamp order are not skipped. Bulk writes that take
+# longer than this to commit are rolled back with a 503.
+TRACKER_CHANGES_SETTLE_SECONDS = float(
+    os.environ.get("TRACKER_CHANGES_SETTLE_SECONDS", 2)
+)
+TRACKER_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get("TRACKER_TOMBSTONE_RETENTION_DAYS", 30)
+)
+# Live issue events; LocalBackend only reaches streams served by the
+# process that made the write.
+TRACKER_EVENTS_PATH = "/api/tracker/events/"
+TRACKER_EVENTS_BACKEND = os.environ.get(
+    "TRACKER_EVENTS_BACKEND", "tracker.events.PostgresBackend"
+)
+TRACKER_EVENTS_QUEUE_SIZE = int(
+    os.environ.get("TRACKER_EVENTS_QUEUE_SIZE", 256)
+)
+TRACKER_EVENTS_HEARTBEAT_SECONDS = float(
+    os.environ.get("TRACKER_EVENTS_HEARTBEAT_SECONDS", 15)
+)
+TRACKER_EVENTS_RETRY_MS = int(os.environ.get("TRACKER_EVENTS_RETRY_MS", 2000))
+# Webhook and notification delivery by the process_outbox worker.
+TRACKER_OUTBOX_BATCH_SIZE = int(
+    os.environ.get("TRACKER_OUTBOX_BATCH_SIZE", 100)
+)
+TRACKER_OUTBOX_CONCURRENCY = int(
+    os.environ.get("TRACKER_OUTBOX_CONCURRENCY", 16)
+)
+TRACKER_OUTBOX_TIMEOUT = float(os.environ.get("TRACKER_OUTBOX_TIMEOUT", 10))
+TRACKER_OUTBOX_LEASE_SECONDS = float(
+    os.environ.get("TRACKER_OUTBOX_LEASE_SECONDS", 300)
+)
+TRACKER_OUTBOX_MAX_ATTEMPTS = int(
+    os.environ.get("TRACKER_OUTBOX_MAX_ATTEMPTS", 12)
+)
+TRACKER_OUTBOX_RETRY_BASE_SECONDS = float(
+    os.environ.get("TRACKER_OUTBOX_RETRY_BASE_SECONDS", 10)
+)
+TRACKER_OUTBOX_RETRY_CAP_SECONDS = float(
+    os.environ.get("TRACKER_OUTBOX_RETRY_CAP_SECONDS", 3600)
+)
+
 SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
 }
 
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 25))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = bool(int(os.environ.get("EMAIL_USE_TLS", 0)))
+DEFAULT_FROM_EMAIL = os.environ.get(
+    "DEFAULT_FROM_EMAIL", "tracker@localhost"
+)
+
 CORS_ORIGIN_WHITELIST = [
     os.environ.get(
         "FRONTEND_URL", "https://sparkly-clafoutis-a63d99.netlify.app"
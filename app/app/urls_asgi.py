@@ -0,0 +1,61 @@
+"""app URL Configuration for ASGI servers
+
+Serves the same routes as `app.urls`, with the hot read endpoints running
+as async views; see `core.async_views`.
+"""
+
+from django.urls import include, path, re_path
+
+from app import urls
+from core import views as core_views
+from core.async_views import async_view
+from tracker import urls as tracker_urls
+from tracker import views as tracker_views
+
+issue_list = async_view(
+    tracker_views.IssueViewSet.as_view(
+        {"get": "list", "post": "create"}, basename="issue"
+    )
+)
+issue_detail = async_view(
+    tracker_views.IssueViewSet.as_view(
+        {
+            "get": "retrieve",
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        },
+        basename="issue",
+    )
+)
+project_list = async_view(
+    tracker_views.ProjectViewSet.as_view(
+        {"get": "list", "post": "create"}, basename="project"
+    )
+)
+
+tracker_patterns = [
+    path("issues/", issue_list, name="issue-list"),
+    # Numeric ids only, so list-level actions like issues/search/ still
+    # reach the router.
+    re_path(r"^issues/(?P<pk>[0-9]+)/$", issue_detail, name="issue-detail"),
+    path("projects/", project_list, name="project-list"),
+    *tracker_urls.urlpatterns,
+]
+
+urlpatterns = [
+    path(
+        "api/health-check/",
+        async_view(core_views.health_check),
+        name="health-check",
+    ),
+    path(
+        "api/tracker/",
+        include((tracker_patterns, tracker_urls.app_name)),
+    ),
+    *(
+        pattern
+        for pattern in urls.urlpatterns
+        if getattr(pattern, "namespace", None) != tracker_urls.app_name
+    ),
+]
@@ -4,16 +4,166 @@ Django admin customization
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.postgres.search import SearchQuery
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from core import models
 
 
-class UserAdmin(BaseUserAdmin):
+def estimate_count(queryset):
+    """Return the planner's estimate of the number of rows of a queryset."""
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return 0
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting large results from the planner's estimate.
+
+    An exact count reads every matching row, which on a large table
+    takes longer than the page itself. Above `exact_count_limit` rows
+    the count comes from EXPLAIN instead, so the last page may be off by
+    a few rows.
+    """
+
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate < self.exact_count_limit:
+            return super().count
+        return estimate
+
+
+class LargeTableMixin:
+    """Keep changelists from counting the whole table."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class TeamFilter(admin.SimpleListFilter):
+    """Filter rows by team, following the links of the team changelist.
+
+    Listing every team as a choice would load the whole team table, so
+    the only choice shown is the selected team.
+    """
+
+    title = _("team")
+    parameter_name = "team"
+
+    def lookups(self, request, model_admin):
+        if not (self.value() or "").isdigit():
+            return []
+        return [
+            (str(pk), name)
+            for pk, name in models.Team.objects.filter(
+                pk=self.value()
+            ).values_list("pk", "name")
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(team_id=self.value())
+        return queryset
+
+
+class StatusFilter(admin.SimpleListFilter):
+    """Filter a team's issues by status.
+
+    The choices come from the team's entries of issue_team_status_idx,
+    so the filter is only offered once a team is selected.
+    """
+
+    title = _("status")
+    parameter_name = "status"
+    max_choices = 50
+
+    def lookups(self, request, model_admin):
+        team = request.GET.get(TeamFilter.parameter_name, "")
+        if not team.isdigit():
+            return []
+        statuses = (
+            models.Issue.objects.filter(team_id=team)
+            .order_by("status")
+            .values_list("status", flat=True)
+            .distinct()[: self.max_choices]
+        )
+        return [(status, status) for status in statuses]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(status=self.value())
+        return queryset
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset editing one page of the related rows."""
+
+    per_page = 20
+    page = 1
+    has_next = False
+
+    def get_queryset(self):
+        if not hasattr(self, "_page"):
+            queryset = super().get_queryset()
+            start = (self.page - 1) * self.per_page
+            end = start + self.per_page + 1
+            rows = list(queryset[start:end])
+            self.has_next = len(rows) > self.per_page
+            self._page = rows[: self.per_page]
+        return self._page
+
+
+class PaginatedTabularInline(admin.TabularInline):
+    """Tabular inline showing `per_page` rows at a time.
+
+    The page is read from the `<prefix>-page` query parameter, which the
+    change form keeps when it is saved.
+    """
+
+    formset = PaginatedInlineFormSet
+    template = "admin/core/edit_inline/paginated_tabular.html"
+    per_page = 20
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        page = request.GET.get(f"{formset.get_default_prefix()}-page", "")
+        return type(
+            formset.__name__,
+            (formset,),
+            {
+                "per_page": self.per_page,
+                "page": max(int(page), 1) if page.isdigit() else 1,
+            },
+        )
+
+
+class UserAdmin(LargeTableMixin, BaseUserAdmin):
     """Define admin pages for users."""
 
     ordering = ["id"]
-    list_display = ["email", "name"]
+    list_display = ["email", "name", "team"]
+    list_select_related = ["team"]
+    list_filter = [TeamFilter, "is_staff", "is_superuser", "is_active"]
+    search_fields = ["email", "name"]
+    autocomplete_fields = ["team"]
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         (
@@ -50,14 +200,15 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
-class UserInline(admin.TabularInline):
+class UserInline(PaginatedTabularInline):
     model = models.User
     fields = ("email", "projects")
     readonly_fields = ("email",)
+    autocomplete_fields = ("projects",)
     extra = 0
 
 
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(LargeTableMixin, admin.ModelAdmin):
     """Define admin pages for teams."""
 
     model = models.Team
@@ -66,13 +217,102 @@ class TeamAdmin(admin.ModelAdmin):
     ]
     ordering = ["id"]
 
+    list_display = ["name", "members", "issues"]
+    search_fields = ["name"]
+    fieldsets = ((None, {"fields": ("name",)}),)
+
+    def filtered_link(self, team, changelist, label):
+        url = reverse(changelist)
+        return format_html(
+            '<a href="{}?{}={}">{}</a>',
+            url,
+            TeamFilter.parameter_name,
+            team.pk,
+            label,
+        )
+
+    @admin.display(description=_("members"))
+    def members(self, team):
+        return self.filtered_link(
+            team, "admin:core_user_changelist", _("Members")
+        )
+
+    @admin.display(description=_("issues"))
+    def issues(self, team):
+        return self.filtered_link(
+            team, "admin:core_issue_changelist", _("Issues")
+        )
+
+
+class ProjectAdmin(LargeTableMixin, admin.ModelAdmin):
+    """Define admin pages for projects."""
+
+    ordering = ["id"]
+    list_display = ["name", "team"]
+    list_select_related = ["team"]
+    list_filter = [TeamFilter]
+    search_fields = ["name"]
+    autocomplete_fields = ["team"]
+
+
+class IssueAdmin(LargeTableMixin, admin.ModelAdmin):
+    """Define admin pages for issues."""
+
+    ordering = ["-id"]
     list_display = [
-        "name",
+        "title",
+        "status",
+        "team",
+        "project",
+        "assigned_to",
+        "updated_at",
     ]
-    fieldsets = ((None, {"fields": ("name",)}),)
+    list_select_related = ["team", "project", "assigned_to"]
+    list_filter = [TeamFilter, StatusFilter]
+    search_fields = ["title"]
+    autocomplete_fields = ["team", "project", "created_by", "assigned_to"]
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search the full text index instead of scanning every title."""
+        if not search_term:
+            return queryset, False
+        query = SearchQuery(
+            search_term, config="english", search_type="websearch"
+        )
+        return queryset.filter(search_vector=query), False
+
+
+class WebhookAdmin(LargeTableMixin, admin.ModelAdmin):
+    """Define admin pages for webhooks."""
+
+    list_display = ["url", "team", "is_active"]
+    list_select_related = ["team"]
+    list_filter = [TeamFilter, "is_active"]
+    autocomplete_fields = ["team"]
+
+
+class OutboxMessageAdmin(LargeTableMixin, admin.ModelAdmin):
+    """Define admin pages for queued and failed outbox messages."""
+
+    list_display = ["id", "event", "attempts", "available_at", "failed_at"]
+    list_filter = ["event"]
+    readonly_fields = ["created_at"]
+    raw_id_fields = ["webhook", "recipient"]
+
+
+class AuthTokenAdmin(LargeTableMixin, admin.ModelAdmin):
+    """Define admin pages for API tokens, so they can be revoked."""
+
+    list_display = ["user", "created_at", "last_used_at"]
+    list_select_related = ["user"]
+    autocomplete_fields = ["user"]
+    readonly_fields = ["key", "created_at", "last_used_at"]
 
 
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Project)
-admin.site.register(models.Issue)
+admin.site.register(models.Project, ProjectAdmin)
+admin.site.register(models.Issue, IssueAdmin)
 admin.site.register(models.Team, TeamAdmin)
+admin.site.register(models.Webhook, WebhookAdmin)
+admin.site.register(models.OutboxMessage, OutboxMessageAdmin)
+admin.site.register(models.AuthToken, AuthTokenAdmin)
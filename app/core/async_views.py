@@ -0,0 +1,142 @@
+"""
+Helpers for serving sync views as async views under ASGI.
+"""
+
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler as BaseASGIHandler
+from django.db import close_old_connections, connections
+
+# Every thread keeps its own database connection, so the pool size also
+# caps the connections one ASGI worker can open.
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS, thread_name_prefix="async-view"
+)
+
+
+def _call_and_render(view, request, *args, **kwargs):
+    """Run a sync view and render its response in the calling thread."""
+    # request_started/finished fire on the event loop's thread under ASGI,
+    # so expired connections of the pool threads are closed here instead.
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, "render", None)):
+            response = response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def blocking(func):
+    """Return an async function running func in the bounded pool.
+
+    Expired database connections of the pool thread are closed around
+    the call, as request_started/finished would do for a sync request.
+    """
+
+    def call(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(call, thread_sensitive=False, executor=executor)
+
+
+def async_view(view):
+    """Return an async view running the sync view in a bounded pool.
+
+    Database queries and rendering happen in the pool, so slow queries
+    and slow clients no longer hold a whole worker, while the number of
+    concurrent queries stays bounded by `ASYNC_VIEW_THREADS`.
+    """
+    run = sync_to_async(
+        functools.partial(_call_and_render, view),
+        thread_sensitive=False,
+        executor=executor,
+    )
+
+    async def wrapper(request, *args, **kwargs):
+        return await run(request, *args, **kwargs)
+
+    wrapper.csrf_exempt = getattr(view, "csrf_exempt", False)
+    wrapper.__name__ = getattr(view, "__name__", "async_view")
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+class ASGIHandler(BaseASGIHandler):
+    """ASGI handler reading streaming responses off the event loop.
+
+    Django 3.2 iterates streaming content on the event loop, where the
+    database queries of an export raise SynchronousOnlyOperation. Here
+    each streaming response is read on a thread of its own, so a
+    server-side cursor stays on one connection, and sent in chunks of
+    about `stream_chunk_bytes`.
+    """
+
+    stream_chunk_bytes = 64 * 1024
+
+    def read_chunk(self, parts):
+        """Return the next chunk of parts, or b"" once they are consumed."""
+        chunk = bytearray()
+        for part in parts:
+            chunk += part
+            if len(chunk) >= self.stream_chunk_bytes:
+                break
+        return bytes(chunk)
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        headers = [
+            (
+                header.encode("ascii") if isinstance(header, str) else header,
+                value.encode("latin1") if isinstance(value, str) else value,
+            )
+            for header, value in response.items()
+        ]
+        headers.extend(
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            for cookie in response.cookies.values()
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream")
+        read = sync_to_async(
+            self.read_chunk, thread_sensitive=False, executor=reader
+        )
+        parts = iter(response)
+        try:
+            while True:
+                chunk = await read(parts)
+                if not chunk:
+                    break
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": True,
+                    }
+                )
+            await send({"type": "http.response.body"})
+        finally:
+            # Closing the reader's connection drops any cursor left open;
+            # closing the response then finishes the request as usual.
+            await sync_to_async(
+                connections.close_all, thread_sensitive=False, executor=reader
+            )()
+            reader.shutdown(wait=False)
+            await sync_to_async(response.close, thread_sensitive=True)()
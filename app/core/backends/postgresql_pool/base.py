@@ -0,0 +1,60 @@
+"""
+PostgreSQL backend that checks connections out of an in-process pool.
+
+Use it as `ENGINE` with an optional `POOL` dict in the database settings:
+
+    "ENGINE": "core.backends.postgresql_pool",
+    "CONN_MAX_AGE": 0,
+    "POOL": {"MIN_SIZE": 1, "MAX_SIZE": 10, "TIMEOUT": 10},
+
+Closing the connection, as Django does at the end of every request when
+`CONN_MAX_AGE` is 0, gives it back to the pool instead of disconnecting,
+so requests on any thread reuse a bounded set of server connections.
+"""
+
+from functools import partial
+
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+from core.backends.postgresql_pool.creation import DatabaseCreation
+from core.backends.postgresql_pool.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """A postgresql DatabaseWrapper backed by a ConnectionPool."""
+
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        """Return the pool for this database's connection parameters."""
+        return get_pool(
+            self.get_connection_params(), self.settings_dict.get("POOL", {})
+        )
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = get_pool(conn_params, self.settings_dict.get("POOL", {}))
+        connection = pool.getconn(
+            partial(super().get_new_connection, conn_params)
+        )
+        # Set by the parent class only when it opens a new connection.
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        self._pool = pool
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # A connection closed inside atomic() stays attached to
+                # this wrapper until rollback, so it can't be shared.
+                self._pool.putconn(
+                    self.connection, discard=self.in_atomic_block
+                )
+
+    def pool_stats(self):
+        """Return the stats of the pool this connection draws from."""
+        return self.pool.stats()
@@ -0,0 +1,17 @@
+"""
+Test database creation for the pooling PostgreSQL backend.
+"""
+
+from django.db.backends.postgresql import creation
+
+from core.backends.postgresql_pool.pool import close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Close pooled connections before dropping a test database."""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would make DROP DATABASE fail with
+        # "database is being accessed by other users".
+        close_pools(database=test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
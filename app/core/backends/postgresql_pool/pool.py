@@ -0,0 +1,265 @@
+"""
+A thread-safe pool of psycopg2 connections.
+"""
+
+import collections
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+COUNTERS = ("checkouts", "connects", "closes", "timeouts", "failed_checks")
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became available before the checkout timeout."""
+
+
+class ConnectionPool:
+    """Hand out open connections, reusing the ones given back.
+
+    At most `max_size` connections are open at once; a checkout beyond
+    that waits up to `timeout` seconds for one to be returned. Returned
+    connections are rolled back to a clean state. Connections older than
+    `max_lifetime` are closed instead of reused, and idle connections
+    beyond `min_size` are closed after `max_idle` seconds. A connection
+    idle for longer than `check_interval` is pinged before checkout, so
+    ones dropped by the server or a proxy are replaced transparently.
+    """
+
+    def __init__(
+        self,
+        min_size=0,
+        max_size=10,
+        max_lifetime=1800.0,
+        max_idle=300.0,
+        timeout=10.0,
+        check_interval=5.0,
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_interval = check_interval
+
+        self._cond = threading.Condition()
+        # (connection, returned_at) pairs, most recently returned last.
+        self._idle = collections.deque()
+        self._opened_at = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._counters = dict.fromkeys(COUNTERS, 0)
+        self._wait_seconds = 0.0
+
+    def getconn(self, connect):
+        """Check out a connection, calling `connect()` to open a new one."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            conn, returned_at = self._reserve(deadline)
+            if conn is None:
+                conn = self._open(connect)
+            elif not self._usable(conn, returned_at):
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._counters["checkouts"] += 1
+                self._wait_seconds += time.monotonic() - start
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """Give a checked out connection back to the pool."""
+        now = time.monotonic()
+        opened_at = self._opened_at.get(id(conn), now)
+        if (
+            discard
+            or self._closed
+            or now - opened_at > self.max_lifetime
+            or not self._reset(conn)
+        ):
+            self._discard(conn)
+            return
+
+        expired = []
+        with self._cond:
+            self._idle.append((conn, now))
+            while (
+                self._idle
+                and self._size - len(expired) > self.min_size
+                and now - self._idle[0][1] > self.max_idle
+            ):
+                expired.append(self._idle.popleft()[0])
+            self._cond.notify()
+
+        for old in expired:
+            self._discard(old)
+
+    def close(self):
+        """Close idle connections and discard the rest when returned."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Return the pool's size, usage and lifetime counters."""
+        with self._cond:
+            checkouts = self._counters["checkouts"]
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._counters,
+                "avg_wait_ms": round(
+                    self._wait_seconds * 1000 / checkouts if checkouts else 0,
+                    3,
+                ),
+            }
+
+    def _reserve(self, deadline):
+        """Take an idle connection or a free slot, waiting for either.
+
+        Returns (connection, returned_at), or (None, None) when the caller
+        owns a slot and must open the connection itself.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.OperationalError("Pool is closed.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No connection available within {self.timeout}s "
+                        f"({self.max_size} in use)."
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _open(self, connect):
+        """Open a connection in a slot reserved by _reserve()."""
+        try:
+            conn = connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opened_at[id(conn)] = time.monotonic()
+            self._counters["connects"] += 1
+        return conn
+
+    def _usable(self, conn, returned_at):
+        """Return whether an idle connection can be handed out."""
+        now = time.monotonic()
+        opened_at = self._opened_at.get(id(conn), now)
+        if conn.closed or now - opened_at > self.max_lifetime:
+            return False
+        if now - returned_at <= self.check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if self._reset(conn):
+                return True
+        except psycopg2.Error:
+            pass
+
+        with self._cond:
+            self._counters["failed_checks"] += 1
+        return False
+
+    def _reset(self, conn):
+        """Roll back any open transaction; False if conn is unusable."""
+        if conn.closed:
+            return False
+        try:
+            status = conn.get_transaction_status()
+            if status in (
+                extensions.TRANSACTION_STATUS_INTRANS,
+                extensions.TRANSACTION_STATUS_INERROR,
+            ):
+                conn.rollback()
+                status = conn.get_transaction_status()
+        except psycopg2.Error:
+            return False
+        return status == extensions.TRANSACTION_STATUS_IDLE
+
+    def _discard(self, conn):
+        """Close a connection and free its slot."""
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+        with self._cond:
+            self._opened_at.pop(id(conn), None)
+            self._size -= 1
+            self._counters["closes"] += 1
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Pool settings keys and the ConnectionPool arguments they configure.
+SETTINGS = {
+    "MIN_SIZE": "min_size",
+    "MAX_SIZE": "max_size",
+    "MAX_LIFETIME": "max_lifetime",
+    "MAX_IDLE": "max_idle",
+    "TIMEOUT": "timeout",
+    "CHECK_INTERVAL": "check_interval",
+}
+
+
+def get_pool(conn_params, config):
+    """Return the process's pool for the connection parameters.
+
+    Pools are keyed by process id too: connections inherited across a
+    fork share their sockets with the parent and must never be used.
+    """
+    params = tuple(sorted((k, repr(v)) for k, v in conn_params.items()))
+    key = (os.getpid(), conn_params.get("database"), params)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = ConnectionPool(
+                **{SETTINGS[name]: value for name, value in config.items()}
+            )
+        return pool
+
+
+def close_pools(database=None):
+    """Close this process's pools, or only those for one database."""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [
+            pool
+            for (owner, name, _), pool in _pools.items()
+            if owner == pid and database in (None, name)
+        ]
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,37 @@
+"""
+Retrying with jittered exponential backoff.
+"""
+
+import itertools
+import random
+import time
+
+
+def delay(attempt, base=0.1, cap=5.0):
+    """Return a full-jitter wait before retry number `attempt` (from 0).
+
+    The wait is random up to `base * 2**attempt`, capped at `cap`.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def retry(func, errors, timeout=None, base=0.1, cap=5.0, on_retry=None):
+    """Call func until it stops raising `errors` and return its result.
+
+    Waits between attempts grow exponentially from `base` up to `cap`
+    seconds, with full jitter so that many containers starting together
+    do not retry in lockstep. Once `timeout` seconds would be exceeded the
+    last error is re-raised. `on_retry(error, delay)` is called before
+    each wait.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for attempt in itertools.count():
+        try:
+            return func()
+        except errors as exc:
+            wait = delay(attempt, base, cap)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise
+            if on_retry is not None:
+                on_retry(exc, wait)
+            time.sleep(wait)
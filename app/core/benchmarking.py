@@ -0,0 +1,212 @@
+"""
+Helpers shared by the benchmark management commands.
+"""
+
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.http import HttpRequest, QueryDict
+
+from rest_framework.request import Request
+
+SERVERS = {
+    "wsgi": ["app.wsgi"],
+    "asgi": ["--worker-class", "uvicorn.workers.UvicornWorker", "app.asgi"],
+}
+
+
+def make_viewset(viewset_class, action, user, params=None):
+    """Return a viewset set up as if handling a GET by the given user."""
+    http_request = HttpRequest()
+    http_request.method = "GET"
+    http_request.GET = QueryDict(mutable=True)
+    http_request.GET.update(params or {})
+
+    request = Request(http_request)
+    request.user = user
+    return viewset_class(
+        request=request, action=action, args=(), kwargs={}, format_kwarg=None
+    )
+
+
+def viewset_queryset(viewset_class, action, user, params=None):
+    """Return the queryset a viewset builds for a GET by the given user."""
+    view = make_viewset(viewset_class, action, user, params)
+    return view.filter_queryset(view.get_queryset())
+
+
+def time_call(func, repeat):
+    """Call func `repeat` times and return the timings in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def time_queryset(queryset, repeat):
+    """Evaluate the queryset `repeat` times and return the median in ms."""
+    return statistics.median(
+        time_call(lambda: list(queryset.all()), repeat)
+    )
+
+
+def free_port():
+    """Return a TCP port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name, port, workers, env=None):
+    """Start the app under gunicorn and wait until it answers.
+
+    `name` is a key of SERVERS and `env` overrides environment variables
+    of the server processes.
+    """
+    env = {
+        **os.environ,
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "DJANGO_SETTINGS_MODULE": os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "app.settings"
+        ),
+        **(env or {}),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--backlog",
+            "4096",
+            *SERVERS[name],
+        ],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(
+                f"http://127.0.0.1:{port}/api/health-check/", timeout=1
+            )
+            return process
+        except OSError:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise CommandError(f"The {name} server did not start.")
+
+
+QUERY_SAMPLE = re.compile(
+    r'^app_request_db_queries_(?P<kind>sum|count)'
+    r'\{method="(?P<method>[^"]*)",route="(?P<route>[^"]*)"\} (?P<value>\S+)$',
+    re.MULTILINE,
+)
+
+
+def query_totals(metrics_text):
+    """Return {(route, method): [queries, requests]} from /metrics output."""
+    totals = {}
+    for match in QUERY_SAMPLE.finditer(metrics_text):
+        key = (match["route"], match["method"])
+        index = 0 if match["kind"] == "sum" else 1
+        totals.setdefault(key, [0.0, 0.0])[index] = float(match["value"])
+    return totals
+
+
+def queries_per_request(before, after):
+    """Return {(route, method): queries per request} between two scrapes."""
+    averages = {}
+    for key, (queries, requests) in after.items():
+        old_queries, old_requests = before.get(key, (0.0, 0.0))
+        if requests > old_requests:
+            averages[key] = round(
+                (queries - old_queries) / (requests - old_requests), 2
+            )
+    return averages
+
+
+# Figures compared between benchmark runs and the direction that is worse.
+REGRESSION_CHECKS = {
+    "p95_ms": 1,
+    "p99_ms": 1,
+    "rps": -1,
+    "queries_per_request": 1,
+}
+# Latency and throughput of routes with fewer requests than this in
+# either run are too noisy to compare.
+MIN_TIMED_REQUESTS = 30
+
+
+def find_regressions(baseline, current, threshold):
+    """Return the figures of `current` that regressed against `baseline`.
+
+    Both are benchmark_api results. A figure regresses when it is worse
+    by more than `threshold` percent; query counts also need to grow by
+    at least half a query, and error rates by a percentage point.
+    Timings are only compared for routes with MIN_TIMED_REQUESTS in both
+    runs. Routes and concurrency levels missing from either run are
+    skipped.
+    """
+    baseline_runs = {run["concurrency"]: run for run in baseline["runs"]}
+    regressions = []
+    for run in current["runs"]:
+        old_run = baseline_runs.get(run["concurrency"])
+        if old_run is None:
+            continue
+
+        routes = {"total": run["total"], **run["routes"]}
+        old_routes = {"total": old_run["total"], **old_run["routes"]}
+        for route, figures in routes.items():
+            old = old_routes.get(route)
+            if old is None:
+                continue
+
+            timed = (
+                min(figures["requests"], old["requests"]) >= MIN_TIMED_REQUESTS
+            )
+            for figure, direction in REGRESSION_CHECKS.items():
+                new_value, old_value = figures.get(figure), old.get(figure)
+                if new_value is None or old_value is None:
+                    continue
+                if figure != "queries_per_request" and not timed:
+                    continue
+                change = (new_value - old_value) * direction
+                if change <= abs(old_value) * threshold / 100:
+                    continue
+                if figure == "queries_per_request" and change < 0.5:
+                    continue
+                regressions.append(
+                    (run["concurrency"], route, figure, old_value, new_value)
+                )
+
+            error_rate = figures["errors"] / max(figures["requests"], 1)
+            old_rate = old["errors"] / max(old["requests"], 1)
+            if error_rate - old_rate > 0.01:
+                regressions.append(
+                    (
+                        run["concurrency"],
+                        route,
+                        "error_rate",
+                        round(old_rate, 4),
+                        round(error_rate, 4),
+                    )
+                )
+    return regressions
@@ -0,0 +1,19 @@
+"""
+Telling shared cache backends from per-process ones.
+"""
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Backends whose entries no other worker process can read.
+PROCESS_LOCAL_BACKENDS = (DummyCache, LocMemCache)
+
+
+def is_shared(cache):
+    """Return whether every worker process reads the cache's entries.
+
+    State that must hold across requests, such as invalidation versions,
+    is only correct in a shared cache: gunicorn runs several workers per
+    task, and a write is seen by the one worker that handled it.
+    """
+    return not isinstance(cache, PROCESS_LOCAL_BACKENDS)
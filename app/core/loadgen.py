@@ -0,0 +1,212 @@
+"""
+A small asyncio HTTP/1.1 load generator for the benchmark commands.
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+
+
+class LoadResult:
+    """Latencies and errors collected by one load run."""
+
+    def __init__(self, concurrency, elapsed, latencies, errors):
+        self.concurrency = concurrency
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.errors = errors
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def rps(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent):
+        """Return the latency in ms below which `percent` of requests fall."""
+        if not self.latencies:
+            return 0.0
+        index = round(percent / 100 * (len(self.latencies) - 1))
+        return self.latencies[index]
+
+    def summary(self):
+        """Return the run's figures as a dict."""
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.rps, 1),
+            "mean_ms": round(statistics.fmean(self.latencies or [0]), 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+        }
+
+
+async def _read_response(reader):
+    """Read one response and return (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server.")
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        return status, False
+
+    return status, headers.get("connection") != "close"
+
+
+async def _client(host, port, requests, deadline, latencies, errors, first=0):
+    """Send requests over one keep-alive connection until the deadline.
+
+    `requests` are (label, request) pairs, sent in turn from index
+    `first`. A request is the bytes to send or a callable returning them.
+    Latencies are collected as (label, ms) pairs and errors as labels.
+    """
+    reader = writer = None
+    index = first
+    while time.perf_counter() < deadline:
+        label, request = requests[index % len(requests)]
+        if callable(request):
+            request = request()
+        index += 1
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            errors.append(label)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+
+        latencies.append((label, (time.perf_counter() - start) * 1000))
+        if status >= 400:
+            errors.append(label)
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+def build_request(host, port, path, headers=None, method="GET", data=None):
+    """Return the bytes of a request for path, with data sent as JSON."""
+    body = b"" if data is None else json.dumps(data).encode()
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    if data is not None:
+        lines += [
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+async def run_load(host, port, paths, concurrency, duration, headers=None):
+    """Hit the paths round-robin from `concurrency` connections.
+
+    Returns a LoadResult covering every request finished in `duration`
+    seconds.
+    """
+    requests = [
+        (path, build_request(host, port, path, headers)) for path in paths
+    ]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            _client(host, port, requests, deadline, latencies, errors)
+            for _ in range(concurrency)
+        )
+    )
+    return LoadResult(
+        concurrency,
+        time.perf_counter() - start,
+        [latency for _, latency in latencies],
+        len(errors),
+    )
+
+
+async def run_mix(host, port, requests, concurrency, duration, seed=0):
+    """Send a weighted mix of labelled requests from `concurrency` clients.
+
+    `requests` are (label, request, weight) triples; a request is the
+    bytes to send or a callable returning them. Each label is sent in
+    proportion to its weight, in an order fixed by `seed`. Returns the
+    overall LoadResult and a dict of LoadResults by label.
+    """
+    schedule = [
+        (label, request)
+        for label, request, weight in requests
+        for _ in range(weight)
+    ]
+    random.Random(seed).shuffle(schedule)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            _client(
+                host,
+                port,
+                schedule,
+                deadline,
+                latencies,
+                errors,
+                first=client * len(schedule) // concurrency,
+            )
+            for client in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    by_label = {}
+    for label, latency in latencies:
+        by_label.setdefault(label, []).append(latency)
+    results = {
+        label: LoadResult(
+            concurrency,
+            elapsed,
+            by_label.get(label, []),
+            errors.count(label),
+        )
+        for label, _, weight in requests
+        if weight
+    }
+    total = LoadResult(
+        concurrency,
+        elapsed,
+        [latency for _, latency in latencies],
+        len(errors),
+    )
+    return total, results
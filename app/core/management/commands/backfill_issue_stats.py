@@ -0,0 +1,38 @@
+"""
+Django command to rebuild the daily issue rollups.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracker.stats import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """Django command to backfill the issue analytics rollups."""
+
+    help = (
+        "Rebuild the daily issue rollups from the issue table, for every "
+        "team or only the given ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--team",
+            type=int,
+            action="append",
+            dest="teams",
+            help="Only rebuild this team's rollups. Can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        start = time.perf_counter()
+        rows = rebuild_rollups(options["teams"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} rollup rows in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+        )
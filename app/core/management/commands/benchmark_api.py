@@ -0,0 +1,433 @@
+"""
+Django command to load test every API route and compare with a baseline.
+"""
+
+import asyncio
+import datetime
+import itertools
+import json
+import subprocess
+import tempfile
+import urllib.request
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarking import (
+    SERVERS,
+    find_regressions,
+    free_port,
+    queries_per_request,
+    query_totals,
+    start_server,
+)
+from core.loadgen import build_request, run_mix
+from core.models import Comment, Team
+from core.seed import PASSWORD, VOCABULARY
+from user.authentication import obtain_token
+
+# Default share of each route in the request mix. Reads dominate, as in
+# production; the export streams the whole team and is opt-in.
+DEFAULT_WEIGHTS = {
+    "health-check": 1,
+    "admin-login": 1,
+    "api-schema": 1,
+    "api-docs": 1,
+    "user-create": 1,
+    "user-token": 1,
+    "user-me": 5,
+    "user-me-update": 1,
+    "issue-list": 20,
+    "issue-list-filtered": 10,
+    "issue-detail": 15,
+    "issue-search": 5,
+    "issue-export": 0,
+    "issue-create": 3,
+    "issue-update": 3,
+    "issue-bulk-create": 1,
+    "issue-bulk-transition": 1,
+    "comment-list": 8,
+    "comment-detail": 3,
+    "comment-create": 2,
+    "project-list": 5,
+    "project-detail": 3,
+    "team-list": 2,
+    "team-detail": 2,
+    "stats": 3,
+}
+
+
+def parse_mix(value):
+    """Parse "route=weight,..." into weights overriding the defaults."""
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, value.split(",")):
+        name, _, weight = item.partition("=")
+        if name not in weights or not weight.isdigit():
+            raise CommandError(f"Invalid mix entry {item!r}.")
+        weights[name] = int(weight)
+    return weights
+
+
+def build_routes(team, user):
+    """Return {name: (view name, method, path, data)} for a seeded team.
+
+    `data` is a JSON-serializable body, or a callable returning one for
+    requests that must differ every time.
+    """
+    issue = team.issues.order_by("-id").first()
+    if issue is None:
+        raise CommandError("The seeded team has no issues.")
+    comment = (
+        Comment.objects.filter(issue__team=team).order_by("-id").first()
+    )
+    commented_issue_id = comment.issue_id if comment else issue.id
+    project = team.projects.order_by("id").first()
+    issue_ids = list(
+        team.issues.order_by("-id").values_list("id", flat=True)[:10]
+    )
+    run_id = uuid.uuid4().hex[:8]
+    emails = (f"load-{run_id}-{n}@example.com" for n in itertools.count())
+
+    issues = "/api/tracker/issues/"
+    comments = f"{issues}{commented_issue_id}/comments/"
+    return {
+        "health-check": ("health-check", "GET", "/api/health-check/", None),
+        "admin-login": ("admin:login", "GET", "/admin/login/", None),
+        "api-schema": ("api-schema", "GET", "/api/schema", None),
+        "api-docs": ("api-docs", "GET", "/api/docs/", None),
+        "user-create": (
+            "user:create",
+            "POST",
+            "/api/user/create/",
+            lambda: {
+                "email": next(emails),
+                "password": PASSWORD,
+                "name": "Load Test",
+            },
+        ),
+        "user-token": (
+            "user:token",
+            "POST",
+            "/api/user/token/",
+            {"email": user.email, "password": PASSWORD},
+        ),
+        "user-me": ("user:me", "GET", "/api/user/me/", None),
+        "user-me-update": (
+            "user:me",
+            "PATCH",
+            "/api/user/me/",
+            {"name": user.name},
+        ),
+        "issue-list": ("tracker:issue-list", "GET", issues, None),
+        "issue-list-filtered": (
+            "tracker:issue-list",
+            "GET",
+            f"{issues}?status=Open",
+            None,
+        ),
+        "issue-detail": (
+            "tracker:issue-detail",
+            "GET",
+            f"{issues}{issue.id}/",
+            None,
+        ),
+        "issue-search": (
+            "tracker:issue-search",
+            "GET",
+            f"{issues}search/?q={VOCABULARY[7]}",
+            None,
+        ),
+        "issue-export": (
+            "tracker:issue-export",
+            "GET",
+            f"{issues}export/?format=ndjson",
+            None,
+        ),
+        "issue-create": (
+            "tracker:issue-list",
+            "POST",
+            issues,
+            {"title": "Load test issue", "project": project and project.id},
+        ),
+        "issue-update": (
+            "tracker:issue-detail",
+            "PATCH",
+            f"{issues}{issue.id}/",
+            {"status": "In Progress"},
+        ),
+        "issue-bulk-create": (
+            "tracker:issue-bulk",
+            "POST",
+            f"{issues}bulk/",
+            [{"title": f"Load test issue {n}"} for n in range(10)],
+        ),
+        "issue-bulk-transition": (
+            "tracker:issue-bulk-transition",
+            "POST",
+            f"{issues}bulk/transition/",
+            {"ids": issue_ids, "status": "Open"},
+        ),
+        "comment-list": ("tracker:issue-comment-list", "GET", comments, None),
+        "comment-detail": (
+            "tracker:issue-comment-detail",
+            "GET",
+            f"{comments}{comment.id if comment else 0}/",
+            None,
+        ),
+        "comment-create": (
+            "tracker:issue-comment-list",
+            "POST",
+            comments,
+            {"content": "Load test comment"},
+        ),
+        "project-list": (
+            "tracker:project-list",
+            "GET",
+            "/api/tracker/projects/",
+            None,
+        ),
+        "project-detail": (
+            "tracker:project-detail",
+            "GET",
+            f"/api/tracker/projects/{getattr(project, 'id', 0)}/",
+            None,
+        ),
+        "team-list": ("tracker:team-list", "GET", "/api/tracker/teams/", None),
+        "team-detail": (
+            "tracker:team-detail",
+            "GET",
+            f"/api/tracker/teams/{team.id}/",
+            None,
+        ),
+        "stats": ("tracker:stats-list", "GET", "/api/tracker/stats/", None),
+    }
+
+
+def fresh_request(port, path, headers, method, data):
+    """Return a request whose body is built by calling data()."""
+    return build_request("127.0.0.1", port, path, headers, method, data())
+
+
+def scrape(port, token):
+    """Return the query totals from the server's /metrics endpoint."""
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{settings.METRICS_PATH}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return query_totals(response.read().decode())
+
+
+def git_commit():
+    """Return the checked out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Django command to benchmark every API route under a request mix."""
+
+    help = (
+        "Start the app locally and drive every API route with a weighted "
+        "request mix at several concurrency levels, as a user of a team "
+        "seeded by seed_data. Reports p50/p95/p99 latency, requests per "
+        "second and queries per request, writes them to a JSON file and "
+        "optionally fails on regressions against an earlier file. Routes "
+        "that delete data are not driven."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[10, 50]
+        )
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--warmup", type=float, default=2.0)
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--server", choices=list(SERVERS), default="wsgi")
+        parser.add_argument("--prefix", default="seed")
+        parser.add_argument(
+            "--mix",
+            type=parse_mix,
+            default=DEFAULT_WEIGHTS,
+            help="Comma-separated route=weight pairs overriding the "
+            "default mix, e.g. issue-export=1,user-create=0.",
+        )
+        parser.add_argument("--output", default="benchmark-api.json")
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="Fail if results regressed against this earlier output.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Percent change tolerated before flagging a regression.",
+        )
+        parser.add_argument(
+            "--response-cache",
+            action="store_true",
+            help="Keep the tracker response cache on instead of measuring "
+            "the database path.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        team = (
+            Team.objects.filter(name__startswith=f"{options['prefix']}-team-")
+            .order_by("-id")
+            .first()
+        )
+        user = team and team.members.order_by("id").first()
+        if user is None:
+            raise CommandError("No seeded team with members found.")
+
+        token = obtain_token(user)
+        headers = {"Authorization": f"Token {token.key}"}
+        routes = build_routes(team, user)
+        weights = options["mix"]
+
+        self.metrics_token = uuid.uuid4().hex
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            env = {
+                "PROMETHEUS_MULTIPROC_DIR": metrics_dir,
+                "METRICS_TOKEN": self.metrics_token,
+            }
+            if not options["response_cache"]:
+                env["TRACKER_CACHE_TIMEOUT"] = "0"
+            port = free_port()
+            process = start_server(
+                options["server"], port, options["workers"], env
+            )
+            try:
+                requests = self.requests(port, routes, weights, headers)
+                if options["warmup"]:
+                    asyncio.run(
+                        run_mix(
+                            "127.0.0.1", port, requests, 1, options["warmup"]
+                        )
+                    )
+                runs = [
+                    self.run(port, routes, requests, concurrency, options)
+                    for concurrency in options["concurrency"]
+                ]
+            finally:
+                process.terminate()
+                process.wait()
+
+        result = {
+            "meta": {
+                "created_at": datetime.datetime.now(
+                    datetime.timezone.utc
+                ).isoformat(),
+                "git_commit": git_commit(),
+                "server": options["server"],
+                "workers": options["workers"],
+                "duration": options["duration"],
+                "response_cache": options["response_cache"],
+                "team": team.name,
+                "issues": team.issues.count(),
+                "mix": {
+                    name: weight for name, weight in weights.items() if weight
+                },
+            },
+            "runs": runs,
+        }
+        with open(options["output"], "w") as output:
+            json.dump(result, output, indent=2)
+        self.stdout.write(f"Wrote {options['output']}")
+
+        if options["compare"]:
+            self.compare(options["compare"], result, options["threshold"])
+
+    def requests(self, port, routes, weights, headers):
+        """Return the (name, request, weight) triples of the mix."""
+        requests = []
+        for name, (_, method, path, data) in routes.items():
+            if not weights.get(name):
+                continue
+            if callable(data):
+                request = partial(
+                    fresh_request, port, path, headers, method, data
+                )
+            else:
+                request = build_request(
+                    "127.0.0.1", port, path, headers, method, data
+                )
+            requests.append((name, request, weights[name]))
+        return requests
+
+    def run(self, port, routes, requests, concurrency, options):
+        """Run the mix at one concurrency level, print and return it."""
+        before = scrape(port, self.metrics_token)
+        total, results = asyncio.run(
+            run_mix(
+                "127.0.0.1", port, requests, concurrency, options["duration"]
+            )
+        )
+        queries = queries_per_request(
+            before, scrape(port, self.metrics_token)
+        )
+
+        run = {
+            "concurrency": concurrency,
+            "total": total.summary(),
+            "routes": {},
+        }
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"== {concurrency} connections")
+        )
+        self.stdout.write(
+            f"{'route':<24}{'requests':>9}{'errors':>7}{'req/s':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>7}"
+        )
+        for name, result in [*results.items(), ("total", total)]:
+            summary = result.summary()
+            if name != "total":
+                view_name, method = routes[name][:2]
+                summary["queries_per_request"] = queries.get(
+                    (view_name, method)
+                )
+                run["routes"][name] = summary
+            q = summary.get("queries_per_request")
+            self.stdout.write(
+                f"{name:<24}{summary['requests']:>9}{summary['errors']:>7}"
+                f"{summary['rps']:>9.1f}{summary['p50_ms']:>9.1f}"
+                f"{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+                f"{'' if q is None else q:>7}"
+            )
+        return run
+
+    def compare(self, path, result, threshold):
+        """Print regressions against a baseline file and fail if any."""
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = find_regressions(baseline, result, threshold)
+        if not regressions:
+            self.stdout.write(
+                self.style.SUCCESS(f"No regressions against {path}")
+            )
+            return
+
+        for concurrency, route, figure, old, new in regressions:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{concurrency:>5} conns  {route:<24}{figure:<20}"
+                    f"{old} -> {new}"
+                )
+            )
+        raise CommandError(
+            f"{len(regressions)} regressions against {path} "
+            f"(threshold {threshold}%)."
+        )
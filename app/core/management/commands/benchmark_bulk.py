@@ -0,0 +1,109 @@
+"""
+Django command to compare single-item and bulk issue write throughput.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import Team, User
+from tracker.views import IssueViewSet
+
+create_view = IssueViewSet.as_view({"post": "create"})
+update_view = IssueViewSet.as_view({"patch": "partial_update"})
+bulk_view = IssueViewSet.as_view({"post": "bulk", "patch": "bulk"})
+transition_view = IssueViewSet.as_view({"post": "bulk_transition"})
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the bulk issue endpoints."""
+
+    help = (
+        "Report issues/second for single-item and bulk issue creates and "
+        "status transitions. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def call(self, view, method, data, **kwargs):
+        """Call a view as the benchmark user and return the response."""
+        request = getattr(self.factory, method)("/", data, format="json")
+        force_authenticate(request, user=self.user)
+        response = view(request, **kwargs)
+        assert response.status_code < 300, response.data
+        return response
+
+    def timed(self, name, count, func):
+        """Run func, report its throughput and return its result."""
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{name:<20}{count:>8} issues {elapsed:>8.2f}s "
+            f"{count / elapsed:>10.0f} issues/s"
+        )
+        return result
+
+    def batches(self, items):
+        size = self.batch_size
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        count = options["count"]
+        self.batch_size = options["batch_size"]
+        self.factory = APIRequestFactory()
+
+        with transaction.atomic():
+            team = Team.objects.create(name=f"bench-bulk-{time.time_ns()}")
+            self.user = User.objects.create(
+                email=f"{team.name}@example.com", team=team
+            )
+            payload = [{"title": f"Issue {n}"} for n in range(count)]
+
+            single_ids = self.timed(
+                "single create",
+                count,
+                lambda: [
+                    self.call(create_view, "post", item).data["id"]
+                    for item in payload
+                ],
+            )
+            bulk_ids = self.timed(
+                "bulk create",
+                count,
+                lambda: [
+                    result["id"]
+                    for batch in self.batches(payload)
+                    for result in self.call(bulk_view, "post", batch).data
+                ],
+            )
+            self.timed(
+                "single update",
+                count,
+                lambda: [
+                    self.call(
+                        update_view, "patch", {"status": "Closed"}, pk=pk
+                    )
+                    for pk in single_ids
+                ],
+            )
+            self.timed(
+                "bulk transition",
+                count,
+                lambda: [
+                    self.call(
+                        transition_view,
+                        "post",
+                        {"ids": batch, "status": "Closed"},
+                    )
+                    for batch in self.batches(bulk_ids)
+                ],
+            )
+
+            transaction.set_rollback(True)
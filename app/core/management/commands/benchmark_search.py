@@ -0,0 +1,108 @@
+"""
+Django command to benchmark issue full-text search latency.
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmarking import make_viewset, time_call
+from core.models import Team
+from core.seed import VOCABULARY, seed_dataset
+from tracker.pagination import SearchPagination
+from tracker.views import IssueViewSet
+
+
+class Command(BaseCommand):
+    """Django command to time the issue search query."""
+
+    help = (
+        "Seed a team with many issues and report the latency of the first "
+        "page of search results for a mix of queries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--issues", type=int, default=1000000)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--target-ms", type=float, default=50.0)
+        parser.add_argument("--prefix", default="search")
+        parser.add_argument(
+            "--no-seed",
+            action="store_true",
+            help="Reuse the most recently seeded team instead of seeding.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        prefix = options["prefix"]
+        if not options["no_seed"]:
+            self.stdout.write(f"Seeding {options['issues']} issues...")
+            start = time.perf_counter()
+            seed_dataset(
+                users_per_team=10,
+                projects_per_team=10,
+                issues_per_team=options["issues"],
+                prefix=prefix,
+            )
+            self.stdout.write(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        if connection.vendor == "postgresql":
+            # Flush the GIN pending list and refresh statistics, as
+            # autovacuum would have done on a long-lived table.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT gin_clean_pending_list('issue_search_vector_idx')"
+                )
+                cursor.execute("ANALYZE core_issue")
+
+        team = (
+            Team.objects.filter(name__startswith=f"{prefix}-team-")
+            .order_by("-id")
+            .first()
+        )
+        user = team and team.members.order_by("id").first()
+        if user is None:
+            raise CommandError("No seeded team with members found.")
+
+        queries = [
+            VOCABULARY[7],
+            f"{VOCABULARY[100]} {VOCABULARY[2000]}",
+            f'"{VOCABULARY[42]} {VOCABULARY[43]}"',
+            f"{VOCABULARY[1]} or {VOCABULARY[2]}",
+            "nomatchwhatsoever",
+        ]
+        ordering = SearchPagination.ordering
+        limit = options["page_size"] + 1
+        failures = 0
+
+        for terms in queries:
+            view = make_viewset(IssueViewSet, "search", user, {"q": terms})
+            queryset = view.search_queryset(terms)
+            page = queryset.order_by(*ordering)[:limit]
+            timings = sorted(
+                time_call(lambda: list(page.all()), options["repeat"])
+            )
+            median = statistics.median(timings)
+            p95 = timings[int(0.95 * (len(timings) - 1))]
+            failures += p95 > options["target_ms"]
+
+            self.stdout.write(
+                f"{terms:<28}{queryset.count():>9} matches "
+                f"p50 {median:>7.2f} ms  p95 {p95:>7.2f} ms"
+            )
+
+        if failures:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"{failures} queries over {options['target_ms']} ms at p95"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"All queries under {options['target_ms']} ms at p95"
+                )
+            )
@@ -0,0 +1,85 @@
+"""
+Django command to compare the regular and compiled issue list serializers.
+"""
+
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmarking import make_viewset, time_call
+from core.models import Team
+from core.seed import seed_dataset
+from tracker.views import IssueViewSet
+
+
+class Command(BaseCommand):
+    """Django command to benchmark issue list serialization."""
+
+    help = (
+        "Report rows/second for serializing issues through the regular "
+        "DRF serializer and through the compiled values_list() read path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[10000, 100000]
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--prefix", default="seed")
+        parser.add_argument(
+            "--no-seed",
+            action="store_true",
+            help="Reuse the most recently seeded team instead of seeding.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        prefix = options["prefix"]
+        if not options["no_seed"]:
+            seed_dataset(issues_per_team=max(options["rows"]), prefix=prefix)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE core_issue")
+
+        team = (
+            Team.objects.filter(name__startswith=f"{prefix}-team-")
+            .order_by("-id")
+            .first()
+        )
+        user = team and team.members.order_by("id").first()
+        if user is None:
+            raise CommandError("No seeded team with members found.")
+
+        view = make_viewset(IssueViewSet, "list", user)
+        queryset = view.get_queryset()
+        serializer_class = view.get_serializer_class()
+        context = view.get_serializer_context()
+
+        for rows in options["rows"]:
+            page = queryset[:rows]
+
+            def regular():
+                return serializer_class(
+                    list(page), many=True, context=context
+                ).data
+
+            def fast():
+                serializer = serializer_class(context=context)
+                lookups = serializer.read_lookups()
+                return serializer.represent_rows(
+                    list(page.values_list(*lookups))
+                )
+
+            if regular() != fast():
+                raise CommandError("Compiled output differs from regular.")
+
+            for name, func in (("regular", regular), ("compiled", fast)):
+                median = statistics.median(
+                    time_call(func, options["repeat"])
+                )
+                self.stdout.write(
+                    f"{name:<10}{rows:>9} rows {median:>10.1f} ms "
+                    f"{rows / median * 1000:>12.0f} rows/s"
+                )
@@ -0,0 +1,96 @@
+"""
+Django command to compare WSGI and ASGI serving under concurrent load.
+"""
+
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarking import SERVERS, free_port, start_server
+from core.loadgen import run_load
+from core.models import Team
+from user.authentication import obtain_token
+
+
+class Command(BaseCommand):
+    """Django command to benchmark gunicorn with sync and ASGI workers."""
+
+    help = (
+        "Start the app under gunicorn with sync workers and with uvicorn "
+        "workers and report throughput and latency percentiles for the "
+        "hot read endpoints at several concurrency levels."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, nargs="+", default=[50, 200, 1000]
+        )
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--servers",
+            nargs="+",
+            choices=list(SERVERS),
+            default=list(SERVERS),
+        )
+        parser.add_argument("--prefix", default="seed")
+        parser.add_argument(
+            "--response-cache",
+            action="store_true",
+            help="Keep the tracker response cache on instead of measuring "
+            "the database path.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        team = (
+            Team.objects.filter(name__startswith=f"{options['prefix']}-team-")
+            .order_by("-id")
+            .first()
+        )
+        user = team and team.members.order_by("id").first()
+        if user is None:
+            raise CommandError("No seeded team with members found.")
+
+        token = obtain_token(user)
+        issue = team.issues.order_by("-id").first()
+        paths = [
+            "/api/health-check/",
+            "/api/tracker/issues/",
+            f"/api/tracker/issues/{issue.id}/" if issue else None,
+            "/api/tracker/projects/",
+        ]
+        paths = [path for path in paths if path]
+        headers = {"Authorization": f"Token {token.key}"}
+
+        self.stdout.write(
+            f"{'server':<8}{'conns':>7}{'requests':>10}{'errors':>8}"
+            f"{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+        )
+        env = {}
+        if not options["response_cache"]:
+            env["TRACKER_CACHE_TIMEOUT"] = "0"
+        for name in options["servers"]:
+            port = free_port()
+            process = start_server(name, port, options["workers"], env)
+            try:
+                for concurrency in options["concurrency"]:
+                    result = asyncio.run(
+                        run_load(
+                            "127.0.0.1",
+                            port,
+                            paths,
+                            concurrency,
+                            options["duration"],
+                            headers,
+                        )
+                    )
+                    self.stdout.write(
+                        f"{name:<8}{concurrency:>7}{result.requests:>10}"
+                        f"{result.errors:>8}{result.rps:>10.1f}"
+                        f"{result.percentile(50):>10.1f}"
+                        f"{result.percentile(99):>10.1f}"
+                    )
+            finally:
+                process.terminate()
+                process.wait()
@@ -0,0 +1,124 @@
+"""
+Django command to report query plans for the tracker endpoints.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+
+from core.benchmarking import time_queryset, viewset_queryset
+from core.models import Issue, Project, Team, User
+from core.seed import seed_dataset
+from tracker.views import IssueViewSet, ProjectViewSet, TeamViewSet
+
+
+def endpoint_queries(user, page_size):
+    """Return (name, queryset) pairs matching the tracker endpoint queries."""
+    issues = viewset_queryset(IssueViewSet, "list", user)
+    bounds = issues.aggregate(low=Min("id"), high=Max("id"))
+    middle = ((bounds["low"] or 0) + (bounds["high"] or 0)) // 2
+    sample = issues.filter(id__lte=middle).first() or issues.first()
+    limit = page_size + 1
+
+    return [
+        ("issue-list", issues[:limit]),
+        ("issue-list deep page", issues.filter(id__lt=middle)[:limit]),
+        ("issue-list by status", issues.filter(status="Open")[:limit]),
+        (
+            "issue-list by project",
+            issues.filter(project_id=getattr(sample, "project_id", None))[
+                :limit
+            ],
+        ),
+        (
+            "issue-list by assignee",
+            Issue.objects.filter(assigned_to=user, status="Open").order_by(
+                "-updated_at"
+            )[:limit],
+        ),
+        (
+            "issue-detail",
+            viewset_queryset(IssueViewSet, "retrieve", user).filter(
+                pk=getattr(sample, "pk", None)
+            ),
+        ),
+        (
+            "project-list",
+            viewset_queryset(ProjectViewSet, "list", user)[:limit],
+        ),
+        ("team-list", viewset_queryset(TeamViewSet, "list", user)[:limit]),
+    ]
+
+
+class Command(BaseCommand):
+    """Django command to explain and time the tracker endpoint queries."""
+
+    help = (
+        "Seed a large dataset and report EXPLAIN ANALYZE plans and "
+        "timings for each tracker endpoint query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teams", type=int, default=1)
+        parser.add_argument("--users-per-team", type=int, default=50)
+        parser.add_argument("--projects-per-team", type=int, default=20)
+        parser.add_argument("--issues-per-team", type=int, default=100000)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--prefix", default="seed")
+        parser.add_argument(
+            "--no-seed",
+            action="store_true",
+            help="Reuse the most recently seeded team instead of seeding.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        if not options["no_seed"]:
+            self.stdout.write("Seeding dataset...")
+            start = time.perf_counter()
+            seed_dataset(
+                teams=options["teams"],
+                users_per_team=options["users_per_team"],
+                projects_per_team=options["projects_per_team"],
+                issues_per_team=options["issues_per_team"],
+                prefix=options["prefix"],
+            )
+            self.stdout.write(
+                f"Seeded in {time.perf_counter() - start:.1f}s"
+            )
+
+        team = (
+            Team.objects.filter(name__startswith=f"{options['prefix']}-team-")
+            .order_by("-id")
+            .first()
+        )
+        user = team and team.members.order_by("id").first()
+        if user is None:
+            raise CommandError("No seeded team with members found.")
+
+        explain_options = {}
+        if connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+            tables = ", ".join(
+                connection.ops.quote_name(model._meta.db_table)
+                for model in (Issue, Project, Team, User)
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {tables}")
+
+        summary = []
+        for name, queryset in endpoint_queries(user, options["page_size"]):
+            plan = queryset.explain(**explain_options)
+            median = time_queryset(queryset, options["repeat"])
+            summary.append((name, median))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(plan)
+            self.stdout.write(f"median {median:.2f} ms\n")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("== summary"))
+        for name, median in summary:
+            self.stdout.write(f"{name:<28}{median:>10.2f} ms")
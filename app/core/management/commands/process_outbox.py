@@ -0,0 +1,91 @@
+"""
+Django command to deliver queued webhooks and notifications.
+"""
+
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tracker.outbox import Worker
+
+
+class Command(BaseCommand):
+    """Django command to run the outbox worker."""
+
+    help = (
+        "Deliver outbox messages in batches until stopped, or until none "
+        "are due with --once. Any number of workers can run side by side. "
+        "Throughput is reported every --report-every seconds and on exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TRACKER_OUTBOX_BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.TRACKER_OUTBOX_CONCURRENCY,
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no message is due.",
+        )
+        parser.add_argument("--report-every", type=float, default=60.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no message is due instead of waiting.",
+        )
+
+    def stop(self, signum, frame):
+        """Finish the current batch, then exit."""
+        self.stopping = True
+
+    def report(self, totals, elapsed):
+        delivered, retrying, failed = totals
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Delivered {delivered} messages in {elapsed:.2f}s "
+                f"({delivered / max(elapsed, 1e-9):.1f}/s), "
+                f"{retrying} to retry, {failed} failed"
+            )
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        self.stopping = False
+        handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        worker = Worker(options["batch_size"], options["concurrency"])
+        totals = [0, 0, 0]
+        started = reported = time.perf_counter()
+        try:
+            while not self.stopping:
+                close_old_connections()
+                counts = worker.run_batch()
+                totals = [sum(pair) for pair in zip(totals, counts)]
+
+                now = time.perf_counter()
+                if now - reported >= options["report_every"]:
+                    self.report(totals, now - started)
+                    reported = now
+                if not any(counts):
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        finally:
+            worker.close()
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.report(totals, time.perf_counter() - started)
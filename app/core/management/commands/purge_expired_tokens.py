@@ -0,0 +1,30 @@
+"""
+Django command to delete expired API tokens.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user.authentication import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    """Django command to purge tokens left unused past the idle window."""
+
+    help = (
+        "Delete API tokens unused for TOKEN_IDLE_DAYS. Expired tokens are "
+        "already refused; this only keeps the table small."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        deleted = purge_expired_tokens(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} tokens unused for "
+                f"{settings.TOKEN_IDLE_DAYS} days"
+            )
+        )
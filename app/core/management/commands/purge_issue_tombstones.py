@@ -0,0 +1,28 @@
+"""
+Django command to delete expired issue tombstones.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tracker.changes import purge_tombstones
+
+
+class Command(BaseCommand):
+    """Django command to purge tombstones past their retention period."""
+
+    help = (
+        "Delete issue tombstones older than "
+        "TRACKER_TOMBSTONE_RETENTION_DAYS. Change feed cursors older than "
+        "that get a 410 and have to sync again from scratch."
+    )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        deleted = purge_tombstones()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} tombstones older than "
+                f"{settings.TRACKER_TOMBSTONE_RETENTION_DAYS} days"
+            )
+        )
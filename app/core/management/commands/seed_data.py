@@ -0,0 +1,72 @@
+"""
+Django command to seed a synthetic dataset for benchmarks and load tests.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.models import Comment, Issue, Project, Team, User
+from core.seed import seed_dataset
+from tracker.stats import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """Django command to bulk insert teams, users, issues and comments."""
+
+    help = (
+        "Bulk insert teams with users, projects, issues and comments, "
+        "rebuild their rollups and refresh planner statistics. The same "
+        "--seed always produces the same dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teams", type=int, default=1)
+        parser.add_argument("--users-per-team", type=int, default=50)
+        parser.add_argument("--projects-per-team", type=int, default=20)
+        parser.add_argument("--issues-per-team", type=int, default=100000)
+        parser.add_argument("--comments-per-issue", type=int, default=3)
+        parser.add_argument("--prefix", default="seed")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        start = time.perf_counter()
+        teams = seed_dataset(
+            teams=options["teams"],
+            users_per_team=options["users_per_team"],
+            projects_per_team=options["projects_per_team"],
+            issues_per_team=options["issues_per_team"],
+            comments_per_issue=options["comments_per_issue"],
+            prefix=options["prefix"],
+            seed=options["seed"],
+        )
+        team_ids = [team.id for team in teams]
+        rebuild_rollups(team_ids)
+
+        if connection.vendor == "postgresql":
+            tables = ", ".join(
+                connection.ops.quote_name(model._meta.db_table)
+                for model in (Comment, Issue, Project, Team, User)
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {tables}")
+
+        counts = {
+            "users": User.objects.filter(team_id__in=team_ids).count(),
+            "projects": Project.objects.filter(team_id__in=team_ids).count(),
+            "issues": Issue.objects.filter(team_id__in=team_ids).count(),
+            "comments": Comment.objects.filter(
+                issue__team_id__in=team_ids
+            ).count(),
+        }
+        summary = ", ".join(
+            f"{count} {name}" for name, count in counts.items()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(teams)} teams with {summary} in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+        )
@@ -2,26 +2,39 @@
 Django command to wait for database to be available.
 """
 
-import time
-
 from psycopg2 import OperationalError as Psycopg2OpError
 
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backoff import retry
+
+DB_ERRORS = (Psycopg2OpError, OperationalError)
 
 
 class Command(BaseCommand):
     """Django command to wait for database."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Give up after this many seconds. Waits forever by default.",
+        )
+
     def handle(self, *args, **options):
         """Entrypoint for command"""
         self.stdout.write("Waiting for database...")
-        db_up = False
-        while db_up is False:
-            try:
-                self.check(databases=["default"])
-                db_up = True
-            except (Psycopg2OpError, OperationalError):
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+        try:
+            retry(
+                lambda: self.check(databases=["default"]),
+                DB_ERRORS,
+                timeout=options["timeout"],
+                on_retry=lambda exc, delay: self.stdout.write(
+                    f"Database unavailable, waiting {delay:.2f} seconds..."
+                ),
+            )
+        except DB_ERRORS as exc:
+            raise CommandError(f"Database unavailable: {exc}")
         self.stdout.write(self.style.SUCCESS("Database available!"))
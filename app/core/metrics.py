@@ -0,0 +1,250 @@
+"""
+Per-request timings for Server-Timing headers and Prometheus metrics.
+
+Set PROMETHEUS_MULTIPROC_DIR to a directory shared by the gunicorn
+workers (emptied before they start) and every worker's /metrics response
+aggregates the samples of all of them.
+"""
+
+import contextvars
+import os
+import threading
+import time
+
+from django.db import connections
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUEST_SECONDS = Histogram(
+    "app_request_duration_seconds",
+    "Time to handle a request.",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "app_requests",
+    "Requests handled, by response status.",
+    ["route", "method", "status"],
+)
+DB_SECONDS = Histogram(
+    "app_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "app_request_db_queries",
+    "Database queries per request.",
+    ["route", "method"],
+    buckets=QUERY_BUCKETS,
+)
+SERIALIZE_SECONDS = Histogram(
+    "app_request_serialize_duration_seconds",
+    "Time spent serializing response data per request.",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "app_response_size_bytes",
+    "Size of non-streaming response bodies.",
+    ["route", "method"],
+    buckets=SIZE_BUCKETS,
+)
+POOL_CONNECTIONS = Gauge(
+    "app_db_pool_connections",
+    "Pooled database connections by state.",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+)
+POOL_TIMEOUTS = Gauge(
+    "app_db_pool_timeouts",
+    "Pool checkouts that timed out in live workers.",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+EVENT_STREAMS = Gauge(
+    "app_event_streams",
+    "Open live event streams.",
+    multiprocess_mode="livesum",
+)
+EVENT_STREAM_OVERFLOWS = Counter(
+    "app_event_stream_overflows",
+    "Event streams closed because the client fell behind.",
+)
+
+POOL_STATES = ("in_use", "idle", "waiting")
+POOL_UPDATE_SECONDS = 1.0
+
+_timings = contextvars.ContextVar("request_timings", default=None)
+_pool_lock = threading.Lock()
+_pool_updated = {"at": 0.0}
+# labels() takes a lock and builds a key on every call, so the labelled
+# children are looked up once per route and method.
+_children = {}
+
+
+class RequestTimings:
+    """Time spent by one request in the database and in serializers."""
+
+    __slots__ = ("db", "queries", "serialize", "serializing")
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.serialize = 0.0
+        self.serializing = False
+
+    def server_timing(self, total):
+        """Return the Server-Timing header value, durations in ms."""
+        return (
+            f"total;dur={total * 1000:.2f}, "
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialize * 1000:.2f}"
+        )
+
+
+def current():
+    """Return the timings of the request being handled, if any."""
+    return _timings.get()
+
+
+def start_request():
+    """Start collecting timings for a request; returns a reset token."""
+    timings = RequestTimings()
+    return timings, _timings.set(timings)
+
+
+def end_request(token):
+    """Stop collecting timings for the request started with token."""
+    _timings.reset(token)
+
+
+class SerializeTimer:
+    """Context manager adding its duration to the request's serialize time.
+
+    Nested timers count once, so serializers nested inside timed
+    serializers are not counted twice.
+    """
+
+    __slots__ = ("timings", "start")
+
+    def __enter__(self):
+        timings = _timings.get()
+        if timings is None or timings.serializing:
+            self.timings = None
+            return
+        timings.serializing = True
+        self.timings = timings
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.serialize += time.perf_counter() - self.start
+            self.timings.serializing = False
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the request timings."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """Wrap every new database connection with time_query."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def route_name(request):
+    """Return a low-cardinality label for the URL pattern that matched."""
+    match = request.resolver_match
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+def _route_metrics(route, method, status):
+    key = (route, method, status)
+    children = _children.get(key)
+    if children is None:
+        children = _children[key] = (
+            REQUEST_SECONDS.labels(route, method),
+            REQUESTS.labels(route, method, status),
+            DB_SECONDS.labels(route, method),
+            DB_QUERIES.labels(route, method),
+            SERIALIZE_SECONDS.labels(route, method),
+            RESPONSE_BYTES.labels(route, method),
+        )
+    return children
+
+
+def observe(request, response, timings, total):
+    """Add a finished request to the Prometheus metrics."""
+    (
+        request_seconds,
+        requests,
+        db_seconds,
+        db_queries,
+        serialize_seconds,
+        response_bytes,
+    ) = _route_metrics(
+        route_name(request), request.method, response.status_code
+    )
+    request_seconds.observe(total)
+    requests.inc()
+    db_seconds.observe(timings.db)
+    db_queries.observe(timings.queries)
+    serialize_seconds.observe(timings.serialize)
+    if not response.streaming:
+        response_bytes.observe(len(response.content))
+    update_pool_gauges()
+
+
+def update_pool_gauges(force=False):
+    """Copy connection pool stats into gauges, at most once a second."""
+    now = time.monotonic()
+    with _pool_lock:
+        if not force and now - _pool_updated["at"] < POOL_UPDATE_SECONDS:
+            return
+        _pool_updated["at"] = now
+
+    for conn in connections.all():
+        if not hasattr(conn, "pool_stats"):
+            continue
+        stats = conn.pool_stats()
+        for state in POOL_STATES:
+            POOL_CONNECTIONS.labels(conn.alias, state).set(stats[state])
+        POOL_TIMEOUTS.labels(conn.alias).set(stats["timeouts"])
+
+
+def render():
+    """Return the metrics in Prometheus text format."""
+    update_pool_gauges(force=True)
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return generate_latest(registry)
@@ -0,0 +1,194 @@
+"""
+Middleware for the app.
+"""
+
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from core import health, metrics, routing
+from core.async_views import blocking
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AsyncCapableMiddleware:
+    """Middleware running natively under both WSGI and ASGI.
+
+    Under ASGI, Django runs sync-only middleware, and everything after
+    it, on one shared thread, so async views would be served one at a
+    time. Subclasses implement `call` for sync handlers and `acall` for
+    async ones, where blocking work goes through `blocking`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function for the handler,
+            # as django.utils.deprecation.MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        return self.call(request)
+
+    def call(self, request):
+        raise NotImplementedError
+
+    async def acall(self, request):
+        raise NotImplementedError
+
+
+class HealthCheckMiddleware(AsyncCapableMiddleware):
+    """Answer health probes before the rest of the middleware stack.
+
+    Must be first in `MIDDLEWARE`. Probes skip sessions, CSRF, CORS,
+    host validation and URL resolution, so liveness costs next to nothing
+    and readiness costs only its (cached) dependency checks plus a snapshot
+    of the database connection pools.
+    """
+
+    def call(self, request):
+        if request.path == settings.HEALTH_CHECK_LIVE_PATH:
+            return self.live()
+        if request.path == settings.HEALTH_CHECK_READY_PATH:
+            return self.ready()
+        return self.get_response(request)
+
+    async def acall(self, request):
+        if request.path == settings.HEALTH_CHECK_LIVE_PATH:
+            return self.live()
+        if request.path == settings.HEALTH_CHECK_READY_PATH:
+            return await blocking(self.ready)()
+        return await self.get_response(request)
+
+    def live(self):
+        return JsonResponse({"status": "ok"})
+
+    def ready(self):
+        ready, checks = health.readiness()
+        return JsonResponse(
+            {
+                "status": "ready" if ready else "unavailable",
+                "checks": checks,
+                "pools": health.database_pools(),
+            },
+            status=200 if ready else 503,
+        )
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Time every request and serve the totals at `METRICS_PATH`.
+
+    Adds a Server-Timing header with the total, database and serializer
+    time to each response and records them, with the query count and
+    response size, in per-route Prometheus histograms. Like the health
+    probes, the metrics endpoint skips host validation so scrapers can
+    reach workers by IP. It requires `METRICS_TOKEN` as a bearer token,
+    and is refused outright when no token is set unless `DEBUG` is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.timing_origins = ", ".join(settings.CORS_ORIGIN_WHITELIST)
+
+    def call(self, request):
+        if request.path == settings.METRICS_PATH:
+            return self.metrics(request)
+
+        timings, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.record(request, response, timings, start)
+
+    async def acall(self, request):
+        if request.path == settings.METRICS_PATH:
+            return await blocking(self.metrics)(request)
+
+        # The sync parts of the request run with a copy of this context,
+        # so their queries still add to these timings.
+        timings, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.record(request, response, timings, start)
+
+    def record(self, request, response, timings, start):
+        total = time.perf_counter() - start
+        response["Server-Timing"] = timings.server_timing(total)
+        response["Timing-Allow-Origin"] = self.timing_origins
+        metrics.observe(request, response, timings, total)
+        return response
+
+    def metrics(self, request):
+        if not settings.METRICS_TOKEN:
+            if not settings.DEBUG:
+                return HttpResponse(status=403)
+        elif request.META.get("HTTP_AUTHORIZATION") != (
+            f"Bearer {settings.METRICS_TOKEN}"
+        ):
+            return HttpResponse(status=401)
+        return HttpResponse(metrics.render(), content_type=CONTENT_TYPE_LATEST)
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """Serve safe requests from a replica unless the client just wrote.
+
+    Writes pin the client to the primary for `REPLICA_STICKY_SECONDS`.
+    Requests fall back to the primary when every replica is lagging by
+    more than `REPLICA_MAX_LAG_SECONDS` or is unreachable, and always
+    when the pins' cache is per-process.
+    """
+
+    def call(self, request):
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400 and routing.replicas_enabled():
+                routing.pin_to_primary(request)
+            return response
+
+        alias = self.choose_alias(request)
+        if alias is None:
+            return self.get_response(request)
+
+        with routing.use_replica(alias):
+            return self.get_response(request)
+
+    async def acall(self, request):
+        if request.method not in SAFE_METHODS:
+            response = await self.get_response(request)
+            if response.status_code < 400 and routing.replicas_enabled():
+                await blocking(routing.pin_to_primary)(request)
+            return response
+
+        alias = None
+        if routing.replicas_enabled():
+            alias = await blocking(self.choose_alias)(request)
+        if alias is None:
+            return await self.get_response(request)
+
+        # The context variable is copied into the threads running the
+        # sync parts of the request, so their reads use the replica.
+        with routing.use_replica(alias):
+            return await self.get_response(request)
+
+    def choose_alias(self, request):
+        """Return the replica to read from, or None for the primary."""
+        if routing.replicas_enabled() and not routing.is_pinned(request):
+            return routing.choose_replica()
+        return None
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:07
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_alter_team_name'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(fields=['team', '-id'], name='issue_team_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(fields=['team', 'status', 'id'], name='issue_team_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(fields=['team', 'project', 'id'], name='issue_team_project_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(fields=['assigned_to', 'status', 'updated_at'], name='issue_assignee_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(fields=['team', '-id'], name='project_team_id_idx'),
+        ),
+    ]
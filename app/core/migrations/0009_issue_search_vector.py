@@ -0,0 +1,88 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}title, '')), 'A')
+    || setweight(
+        to_tsvector('pg_catalog.english', coalesce({row}description, '')), 'B'
+    )
+"""
+
+CREATE_TRIGGER_SQL = f"""
+CREATE FUNCTION core_issue_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_issue_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON core_issue
+    FOR EACH ROW EXECUTE PROCEDURE core_issue_search_vector_update();
+
+UPDATE core_issue SET search_vector = {SEARCH_VECTOR_SQL.format(row="")};
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS core_issue_search_vector_update ON core_issue;
+DROP FUNCTION IF EXISTS core_issue_search_vector_update();
+"""
+
+CREATE_INDEX_SQL = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS issue_search_vector_idx
+    ON core_issue USING gin (search_vector);
+"""
+
+DROP_INDEX_SQL = "DROP INDEX CONCURRENTLY IF EXISTS issue_search_vector_idx;"
+
+
+def postgresql_only(sql):
+    """Return a RunPython callable executing sql on PostgreSQL only.
+
+    Other backends keep the column empty and search falls back to
+    icontains lookups.
+    """
+
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_issue_team_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            postgresql_only(CREATE_TRIGGER_SQL),
+            postgresql_only(DROP_TRIGGER_SQL),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='issue',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='issue_search_vector_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(
+                    postgresql_only(CREATE_INDEX_SQL),
+                    postgresql_only(DROP_INDEX_SQL),
+                ),
+            ],
+        ),
+    ]
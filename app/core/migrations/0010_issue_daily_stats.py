@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_issue_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=150)),
+                ('created', models.IntegerField(default=0)),
+                ('entered', models.IntegerField(default=0)),
+                ('exited', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='issue_stats', to='core.project')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_stats', to='core.team')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='issuedailystat',
+            index=models.Index(fields=['team', 'day'], name='issuedailystat_team_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='issuedailystat',
+            constraint=models.UniqueConstraint(fields=('team', 'project', 'day', 'status'), name='issuedailystat_unique_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='issuedailystat',
+            constraint=models.UniqueConstraint(condition=models.Q(('project', None)), fields=('team', 'day', 'status'), name='issuedailystat_unique_team_key'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:36
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_comment_counts(apps, schema_editor):
+    """Set comment_count on every issue that already has comments."""
+    Comment = apps.get_model('core', 'Comment')
+    Issue = apps.get_model('core', 'Issue')
+    counts = (
+        Comment.objects.filter(issue=OuterRef('pk'))
+        .order_by()
+        .values('issue')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Issue.objects.filter(
+        id__in=Comment.objects.values('issue_id')
+    ).update(comment_count=Subquery(counts))
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_issue_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            backfill_comment_counts, migrations.RunPython.noop
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'created_at', 'id'], name='comment_issue_created_idx'),
+        ),
+    ]
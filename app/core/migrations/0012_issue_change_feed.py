@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:26
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_comment_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issue_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField()),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_tombstones', to='core.team')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['team', 'deleted_at', 'id'], name='tombstone_team_deleted_idx'),
+                    models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+                ],
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='issue',
+            index=models.Index(fields=['team', 'updated_at', 'id'], name='issue_team_updated_idx'),
+        ),
+    ]
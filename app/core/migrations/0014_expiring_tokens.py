@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0003_tokenproxy'),
+        ('core', '0013_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='authtoken',
+            index=models.Index(fields=['user', 'last_used_at'], name='authtoken_user_used_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='authtoken',
+            index=models.Index(fields=['last_used_at'], name='authtoken_used_idx'),
+        ),
+        # Existing tokens keep working, starting a fresh idle window.
+        migrations.RunSQL(
+            '''
+            INSERT INTO core_authtoken (key, user_id, created_at, last_used_at)
+            SELECT key, user_id, created, now() FROM authtoken_token
+            ''',
+            migrations.RunSQL.noop,
+        ),
+    ]
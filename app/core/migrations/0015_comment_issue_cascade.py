@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_expiring_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='issue',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='core.issue'),
+        ),
+    ]
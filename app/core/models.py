@@ -2,9 +2,15 @@
 Database models.
 """
 
+import binascii
+import os
+
 from django.conf import settings
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -38,6 +44,38 @@ class UserManager(BaseUserManager):
         return self.email
 
 
+class AuthToken(models.Model):
+    """API token that expires after TOKEN_IDLE_DAYS without being used.
+
+    Uses are recorded in batches, see `user.authentication`.
+    """
+
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="auth_tokens",
+        on_delete=models.CASCADE,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "last_used_at"], name="authtoken_user_used_idx"
+            ),
+            models.Index(fields=["last_used_at"], name="authtoken_used_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = binascii.hexlify(os.urandom(20)).decode()
+        return super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.key
+
+
 class Team(models.Model):
     """Team objects."""
 
@@ -60,6 +98,11 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["team", "-id"], name="project_team_id_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -141,10 +184,41 @@ class Issue(models.Model):
         on_delete=models.DO_NOTHING,
         null=True,
     )
+    # Maintained by a database trigger from the title and description.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Kept in step with the comments table by the tracker signals.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["team", "-id"], name="issue_team_id_idx"),
+            models.Index(
+                fields=["team", "status", "id"], name="issue_team_status_idx"
+            ),
+            models.Index(
+                fields=["team", "project", "id"], name="issue_team_project_idx"
+            ),
+            models.Index(
+                fields=["assigned_to", "status", "updated_at"],
+                name="issue_assignee_status_idx",
+            ),
+            models.Index(
+                fields=["team", "updated_at", "id"],
+                name="issue_team_updated_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="issue_search_vector_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded values so changes can be detected on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     @property
     def project_name(self):
         return self.project.name
@@ -154,13 +228,142 @@ class Issue(models.Model):
         return self.team.name
 
 
+class IssueTombstone(models.Model):
+    """Record of a deleted issue, kept for clients syncing changes."""
+
+    team = models.ForeignKey(
+        Team, related_name="issue_tombstones", on_delete=models.CASCADE
+    )
+    issue_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["team", "deleted_at", "id"],
+                name="tombstone_team_deleted_idx",
+            ),
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"Issue {self.issue_id} deleted at {self.deleted_at}"
+
+
+class Webhook(models.Model):
+    """Endpoint receiving the issue events of a team."""
+
+    team = models.ForeignKey(
+        Team, related_name="webhooks", on_delete=models.CASCADE
+    )
+    url = models.URLField(max_length=500)
+    # Deliveries are signed with HMAC-SHA256 of the body when set.
+    secret = models.CharField(max_length=255, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.url
+
+
+class OutboxMessage(models.Model):
+    """Webhook delivery or notification waiting for the outbox worker.
+
+    Messages are written in the transaction of the change they announce
+    and deleted once delivered. `available_at` is when the next attempt
+    is due; messages that used up their attempts get `failed_at`.
+    """
+
+    event = models.CharField(max_length=50)
+    payload = models.JSONField()
+    webhook = models.ForeignKey(
+        Webhook,
+        related_name="messages",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="notifications",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                condition=models.Q(failed_at=None),
+                name="outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.pk}"
+
+
+class IssueDailyStat(models.Model):
+    """Daily issue counters per team, project and status.
+
+    `created` counts issues opened in the status that day, `entered` and
+    `exited` count issues moving into and out of it (creation and
+    deletion included), so summing `entered - exited` up to a day gives
+    the number of issues in the status at the end of that day.
+    """
+
+    team = models.ForeignKey(
+        Team, related_name="issue_stats", on_delete=models.CASCADE
+    )
+    project = models.ForeignKey(
+        Project,
+        related_name="issue_stats",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    day = models.DateField()
+    status = models.CharField(max_length=150)
+    created = models.IntegerField(default=0)
+    entered = models.IntegerField(default=0)
+    exited = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["team", "project", "day", "status"],
+                name="issuedailystat_unique_key",
+            ),
+            # NULLs never conflict in the constraint above.
+            models.UniqueConstraint(
+                fields=["team", "day", "status"],
+                condition=models.Q(project=None),
+                name="issuedailystat_unique_team_key",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["team", "day"], name="issuedailystat_team_day_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}"
+
+
 class Comment(models.Model):
     """Comment objects."""
 
     issue = models.ForeignKey(
         Issue,
         related_name="comments",
-        on_delete=models.DO_NOTHING,
+        on_delete=models.CASCADE,
         null=True,
         blank=True,
     )
@@ -175,5 +378,13 @@ class Comment(models.Model):
         null=True,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["issue", "created_at", "id"],
+                name="comment_issue_created_idx",
+            ),
+        ]
+
     def __str__(self):
-        return self.comment
+        return self.content
@@ -0,0 +1,161 @@
+"""
+Routing of safe reads to database replicas.
+
+`ReplicaRoutingMiddleware` picks a replica for each GET/HEAD/OPTIONS
+request and `ReplicaRouter` sends the request's reads to it; everything
+else, including all reads outside a request, uses the primary. A client
+that has just written is pinned to the primary for
+`REPLICA_STICKY_SECONDS`, so it always reads its own writes.
+
+The pins are kept in the default cache. A per-process cache would only
+pin the worker that took the write, so replicas are not used at all
+unless that cache is shared.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.caching import is_shared
+
+# Replication lag of the server, or 0 for a primary or a caught-up replica.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+    )
+END
+"""
+
+_read_alias = contextvars.ContextVar("read_alias", default=None)
+_lock = threading.Lock()
+_lag_checks = {}
+
+
+@contextlib.contextmanager
+def use_replica(alias):
+    """Send the ORM reads made inside the block to a replica alias."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def current_replica():
+    """Return the replica the current request reads from, if any."""
+    return _read_alias.get()
+
+
+def replica_lag(alias):
+    """Return the replication lag of a database alias in seconds."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def _is_fresh(alias):
+    """Return whether a replica is reachable and within the lag limit.
+
+    The answer is reused for `REPLICA_LAG_CHECK_SECONDS`, so each process
+    asks a replica about its lag at most that often.
+    """
+    now = time.monotonic()
+    with _lock:
+        expires, fresh = _lag_checks.get(alias, (0.0, False))
+    if now < expires:
+        return fresh
+
+    try:
+        fresh = replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    except Exception:
+        fresh = False
+    with _lock:
+        _lag_checks[alias] = (now + settings.REPLICA_LAG_CHECK_SECONDS, fresh)
+    return fresh
+
+
+def replicas_enabled():
+    """Return whether reads may go to replicas.
+
+    Only with replicas configured and a shared cache for the pins.
+    """
+    return bool(settings.DATABASE_REPLICAS) and is_shared(caches["default"])
+
+
+def choose_replica():
+    """Return a random replica within the lag limit, or None if none are."""
+    fresh = [
+        alias for alias in settings.DATABASE_REPLICAS if _is_fresh(alias)
+    ]
+    return random.choice(fresh) if fresh else None
+
+
+def reset():
+    """Forget the cached replica lag checks."""
+    with _lock:
+        _lag_checks.clear()
+
+
+def _pin_key(request):
+    """Return the cache key pinning the request's client to the primary.
+
+    Clients are told apart by their credentials: the Authorization header
+    or, for browser sessions, the session cookie.
+    """
+    credential = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credential:
+        return None
+    digest = hashlib.sha256(credential.encode()).hexdigest()
+    return f"replica:pin:{digest}"
+
+
+def pin_to_primary(request):
+    """Read from the primary for the client's next requests."""
+    key = _pin_key(request)
+    if key is not None:
+        caches["default"].set(key, True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(request):
+    """Return whether the client wrote within the sticky window."""
+    key = _pin_key(request)
+    return key is not None and caches["default"].get(key, False)
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the current request."""
+
+    def _is_primary_only(self, model):
+        return model._meta.label_lower in settings.REPLICA_PRIMARY_MODELS
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or self._is_primary_only(model):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
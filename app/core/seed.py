@@ -0,0 +1,109 @@
+"""
+Helpers for seeding large synthetic datasets.
+"""
+
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from core.models import Comment, Issue, Project, Team, User
+
+ISSUE_STATUSES = ["Open", "In Progress", "Closed"]
+BATCH_SIZE = 5000
+PASSWORD = "seed-password-123"
+
+# Three-syllable pseudo-words give full-text search a realistic spread of
+# rare and common terms.
+SYLLABLES = [
+    "ba", "de", "fi", "go", "ku", "la", "me", "ni",
+    "po", "ru", "sa", "te", "vi", "wo", "xu", "zy",
+]
+VOCABULARY = ["".join(word) for word in itertools.product(SYLLABLES, repeat=3)]
+
+
+def _chunks(total, size=BATCH_SIZE):
+    """Yield the sizes of consecutive batches adding up to total."""
+    while total > 0:
+        yield min(total, size)
+        total -= size
+
+
+@transaction.atomic
+def seed_dataset(
+    teams=1,
+    users_per_team=10,
+    projects_per_team=5,
+    issues_per_team=1000,
+    comments_per_issue=0,
+    prefix="seed",
+    password=PASSWORD,
+    seed=None,
+):
+    """Bulk insert teams, users, projects, issues and comments.
+
+    Rows are written with `bulk_create` in batches, so seeding a million
+    issues takes seconds rather than the hours a create() per row would.
+    Every user shares one pre-hashed password. Issues get between 0 and
+    twice `comments_per_issue` comments, and a matching comment_count.
+    Returns the teams.
+    """
+    rng = random.Random(seed)
+    hashed_password = make_password(password)
+    start = Team.objects.filter(name__startswith=f"{prefix}-team-").count()
+
+    created_teams = Team.objects.bulk_create(
+        Team(name=f"{prefix}-team-{start + n}") for n in range(teams)
+    )
+
+    for team in created_teams:
+        users = User.objects.bulk_create(
+            User(
+                email=f"{prefix}-{team.id}-{n}@example.com",
+                name=f"Seed User {n}",
+                password=hashed_password,
+                team=team,
+            )
+            for n in range(users_per_team)
+        )
+        projects = Project.objects.bulk_create(
+            Project(team=team, name=f"Project {n}")
+            for n in range(projects_per_team)
+        )
+
+        for size in _chunks(issues_per_team):
+            issues = Issue.objects.bulk_create(
+                (
+                    Issue(
+                        team=team,
+                        project=rng.choice(projects) if projects else None,
+                        title=" ".join(rng.choices(VOCABULARY, k=5)),
+                        description=" ".join(rng.choices(VOCABULARY, k=20)),
+                        status=rng.choice(ISSUE_STATUSES),
+                        created_by=rng.choice(users) if users else None,
+                        assigned_to=rng.choice(users) if users else None,
+                        comment_count=(
+                            rng.randint(0, 2 * comments_per_issue)
+                            if comments_per_issue
+                            else 0
+                        ),
+                    )
+                    for _ in range(size)
+                ),
+                batch_size=BATCH_SIZE,
+            )
+            Comment.objects.bulk_create(
+                (
+                    Comment(
+                        issue=issue,
+                        content=" ".join(rng.choices(VOCABULARY, k=12)),
+                        created_by=rng.choice(users) if users else None,
+                    )
+                    for issue in issues
+                    for _ in range(issue.comment_count)
+                ),
+                batch_size=BATCH_SIZE,
+            )
+
+    return created_teams
@@ -0,0 +1,171 @@
+"""
+Serializer helpers shared by the API apps.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+
+from rest_framework import fields, relations
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import ISO_8601, api_settings
+
+from core import metrics
+
+# Fields whose to_representation() returns database values unchanged.
+PASSTHROUGH_FIELDS = (
+    fields.BooleanField,
+    fields.CharField,
+    fields.ChoiceField,
+    fields.IntegerField,
+    relations.PrimaryKeyRelatedField,
+    relations.StringRelatedField,
+)
+
+
+def _param_names(params, name):
+    return {part.strip() for part in params.get(name, "").split(",")} - {""}
+
+
+def sparse_fieldset(request, names):
+    """Return the field names a read request asked for, in order.
+
+    `?fields=a,b` keeps only the listed fields and `?omit=c` drops the
+    listed ones. Write requests always get every field, so sparse
+    parameters can never cause submitted data to be ignored.
+    """
+    names = list(dict.fromkeys(names))
+    if request is None or request.method not in SAFE_METHODS:
+        return names
+
+    params = getattr(request, "query_params", request.GET)
+    fields = _param_names(params, "fields")
+    omit = _param_names(params, "omit")
+    return [
+        name
+        for name in names
+        if (not fields or name in fields) and name not in omit
+    ]
+
+
+def is_sparse_request(request):
+    """Return True if a read request asked for a sparse fieldset."""
+    if request is None or request.method not in SAFE_METHODS:
+        return False
+
+    params = getattr(request, "query_params", request.GET)
+    return bool(_param_names(params, "fields") or _param_names(params, "omit"))
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin dropping the fields a request did not ask for.
+
+    Fields are removed before serialization, so unrequested related
+    fields are never evaluated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if is_sparse_request(request):
+            keep = set(sparse_fieldset(request, self.fields))
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+
+class TimedSerializerMixin:
+    """Serializer mixin counting to_representation() in request timings."""
+
+    def to_representation(self, instance):
+        with metrics.SerializeTimer():
+            return super().to_representation(instance)
+
+
+def format_datetimes(values):
+    """Format a column of datetimes exactly as DRF's DateTimeField does.
+
+    Only the ISO 8601 output format is supported.
+    """
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+    formatted = []
+    for value in values:
+        if not value:
+            formatted.append(None)
+            continue
+        if tz is not None:
+            if timezone.is_aware(value):
+                value = value.astimezone(tz)
+            else:
+                value = timezone.make_aware(value, tz)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, timezone.utc)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        formatted.append(value)
+    return formatted
+
+
+class CompiledReadMixin:
+    """Serializer mixin rendering `values_list()` rows without DRF fields.
+
+    `read_columns` maps each field name to the lookup whose database
+    value that field renders; for example a `StringRelatedField` over a
+    team maps to `team__name`. Rows are turned into dicts column by
+    column, skipping the per-field attribute lookups and
+    to_representation() calls of the regular path. The output matches
+    `serializer.data` exactly.
+    """
+
+    read_columns = None
+
+    def _read_formatter(self, field):
+        if isinstance(field, fields.DateTimeField):
+            output_format = getattr(
+                field, "format", api_settings.DATETIME_FORMAT
+            )
+            if output_format and output_format.lower() == ISO_8601:
+                return format_datetimes
+            return False
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return None
+        return False
+
+    def read_lookups(self):
+        """Return the value lookups for the readable fields, in order.
+
+        Returns None when any field cannot be compiled, in which case the
+        regular serializer has to be used.
+        """
+        if self.read_columns is None:
+            return None
+
+        names, lookups, formatters = [], [], []
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            formatter = self._read_formatter(field)
+            if name not in self.read_columns or formatter is False:
+                return None
+            names.append(name)
+            lookups.append(self.read_columns[name])
+            formatters.append(formatter)
+
+        self._read_plan = names, formatters
+        return lookups
+
+    def represent_rows(self, rows):
+        """Return the output dicts for rows fetched with read_lookups().
+
+        Rows may carry extra trailing values, which are ignored.
+        """
+        names, formatters = self._read_plan
+        if not rows:
+            return []
+
+        with metrics.SerializeTimer():
+            columns = list(zip(*rows))[: len(names)]
+            for index, formatter in enumerate(formatters):
+                if formatter is not None:
+                    columns[index] = formatter(columns[index])
+            return [dict(zip(names, values)) for values in zip(*columns)]
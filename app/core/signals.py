@@ -0,0 +1,14 @@
+"""
+Signal handlers for the core app.
+"""
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core import metrics
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    """Count the queries of every new connection in request timings."""
+    metrics.install_query_timer(sender, connection)
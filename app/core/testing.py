@@ -0,0 +1,143 @@
+"""
+Test helpers shared by the apps' test suites.
+"""
+
+import atexit
+import functools
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from user.authentication import last_used, token_cache
+
+# Methods answered by the framework itself rather than by the view.
+IMPLICIT_METHODS = {"head", "options"}
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_cache_dir():
+    directory = tempfile.mkdtemp(prefix="test-cache-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+
+def shared_caches():
+    """Return CACHES settings for a cache every process shares.
+
+    Features that need a shared cache are off with the per-process
+    default, so their tests override CACHES with this. The file-based
+    backend is shared between processes without running a cache server.
+    """
+    return {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": _shared_cache_dir(),
+        }
+    }
+
+
+def _walk(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f"{namespace}:{pattern.name}", pattern.callback
+
+
+def endpoints(namespace):
+    """Return the (URL name, method) of every view under a URL namespace.
+
+    Viewsets contribute the methods mapped to their actions; other views
+    the HTTP methods they implement.
+    """
+    _, resolver = get_resolver().namespace_dict[namespace]
+    found = set()
+    for name, callback in _walk(resolver.url_patterns, namespace):
+        actions = getattr(callback, "actions", None)
+        if actions is None:
+            view_class = callback.view_class
+            methods = [
+                method
+                for method in view_class.http_method_names
+                if hasattr(view_class, method)
+            ]
+        else:
+            methods = list(actions)
+        found.update(
+            (name, method.upper())
+            for method in methods
+            if method not in IMPLICIT_METHODS
+        )
+    return found
+
+
+class QueryBudgetMixin:
+    """Check every endpoint runs a bounded number of queries.
+
+    Subclasses map each (URL name, method) of `query_budget_namespace`
+    to the most queries one request may run in `query_budgets`, and call
+    assertQueryBudget once per entry. Each request is measured at both
+    `query_budget_sizes` with cold caches, so a count that grows with
+    the number of rows fails even while it is within budget.
+    """
+
+    query_budget_namespace = None
+    query_budgets = {}
+    query_budget_sizes = (2, 12)
+
+    def clear_query_caches(self):
+        """Forget cached responses and tokens before a measured request."""
+        for cache in caches.all():
+            cache.clear()
+        token_cache.clear()
+        last_used.clear()
+
+    def assertQueryBudget(self, endpoint, method, grow, request):
+        """Assert the endpoint stays within budget at both dataset sizes.
+
+        `grow(size)` adds rows until the dataset has `size` of them and
+        returns whatever `request` needs, such as an object to delete.
+        `request(target)` sends the request and returns the response.
+        Streaming responses are consumed inside the measurement.
+        """
+        budget = self.query_budgets[(endpoint, method)]
+        counts = []
+        for size in self.query_budget_sizes:
+            target = grow(size)
+            self.clear_query_caches()
+            with CaptureQueriesContext(connection) as queries:
+                response = request(target)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+
+            self.assertLess(
+                response.status_code,
+                400,
+                f"{method} {endpoint} failed: {response.status_code}",
+            )
+            counts.append((size, queries.captured_queries))
+
+        sql = "\n".join(query["sql"] for query in counts[-1][1])
+        (small, few), (large, many) = counts
+        self.assertEqual(
+            len(few),
+            len(many),
+            f"{method} {endpoint} ran {len(few)} queries with {small} rows "
+            f"and {len(many)} with {large}:\n{sql}",
+        )
+        self.assertLessEqual(
+            len(many),
+            budget,
+            f"{method} {endpoint} ran {len(many)} queries, over its budget "
+            f"of {budget}:\n{sql}",
+        )
+
+    def test_every_endpoint_has_a_budget(self):
+        """Test a budget is declared for every endpoint of the namespace."""
+        self.assertEqual(
+            set(self.query_budgets), endpoints(self.query_budget_namespace)
+        )
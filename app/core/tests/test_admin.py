@@ -2,9 +2,14 @@
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.test import Client
 
+from core.admin import EstimatedCountPaginator, UserInline
+from core.models import Issue, Project, Team
+
 
 class AdminSiteTests(TestCase):
     """Tests for Django admin."""
@@ -41,3 +46,156 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+
+class LargeTableAdminTests(TestCase):
+    """Test admin pages stay cheap as tables grow."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="testpass123"
+        )
+        self.client.force_login(self.admin_user)
+        self.team = Team.objects.create(name="Sample Team")
+        self.project = Project.objects.create(name="Project", team=self.team)
+
+    def add_issues(self, count, **fields):
+        Issue.objects.bulk_create(
+            Issue(
+                title=f"Issue {index}",
+                team=self.team,
+                project=self.project,
+                assigned_to=self.admin_user,
+                **fields,
+            )
+            for index in range(count)
+        )
+
+    def add_members(self, count):
+        start = get_user_model().objects.count()
+        for index in range(start, start + count):
+            get_user_model().objects.create_user(
+                email=f"member{index}@example.com",
+                password="testpass123",
+                team=self.team,
+            )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_changelists_run_constant_queries(self):
+        """Test changelist query counts do not grow with the rows."""
+        urls = [
+            reverse(f"admin:core_{model}_changelist")
+            for model in ("issue", "user", "team", "project")
+        ]
+        self.add_issues(2)
+        self.add_members(2)
+        few = [self.count_queries(url) for url in urls]
+
+        self.add_issues(10)
+        self.add_members(10)
+        many = [self.count_queries(url) for url in urls]
+
+        self.assertEqual(few, many)
+
+    def test_team_change_page_paginates_members(self):
+        """Test a team's page lists one page of members at a time."""
+        self.admin_user.team = self.team
+        self.admin_user.save()
+        self.add_members(UserInline.per_page)
+        url = reverse("admin:core_team_change", args=[self.team.id])
+
+        first = self.client.get(url)
+        second = self.client.get(url, {"members-page": 2})
+
+        last = f"member{UserInline.per_page}@example.com"
+        self.assertContains(first, "member1@example.com")
+        self.assertNotContains(first, last)
+        self.assertContains(first, "?members-page=2")
+        self.assertContains(second, last)
+        self.assertNotContains(second, "member1@example.com")
+
+    def test_issues_filtered_by_team_and_status(self):
+        """Test the team and status filters narrow the issue list."""
+        self.add_issues(1, status="Closed")
+        other = Team.objects.create(name="Other Team")
+        Issue.objects.create(title="Elsewhere", team=other, status="Closed")
+        url = reverse("admin:core_issue_changelist")
+
+        res = self.client.get(url, {"team": self.team.id, "status": "Closed"})
+
+        self.assertContains(res, "Issue 0")
+        self.assertNotContains(res, "Elsewhere")
+
+    def test_issue_search_uses_full_text(self):
+        """Test searching issues matches words of their titles."""
+        Issue.objects.create(title="Broken login page", team=self.team)
+        Issue.objects.create(title="Slow dashboard", team=self.team)
+        url = reverse("admin:core_issue_changelist")
+
+        res = self.client.get(url, {"q": "logins"})
+
+        self.assertContains(res, "Broken login page")
+        self.assertNotContains(res, "Slow dashboard")
+
+    def test_user_autocomplete(self):
+        """Test users can be picked by email in foreign key widgets."""
+        url = reverse("admin:autocomplete")
+
+        res = self.client.get(
+            url,
+            {
+                "term": "admin",
+                "app_label": "core",
+                "model_name": "issue",
+                "field_name": "assigned_to",
+            },
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            [result["id"] for result in res.json()["results"]],
+            [str(self.admin_user.id)],
+        )
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Test the changelist paginator."""
+
+    def setUp(self):
+        team = Team.objects.create(name="Sample Team")
+        Issue.objects.bulk_create(
+            Issue(title=f"Issue {index}", team=team) for index in range(5)
+        )
+
+    def test_small_results_counted_exactly(self):
+        """Test results under the limit get an exact count."""
+        paginator = EstimatedCountPaginator(Issue.objects.order_by("id"), 2)
+
+        self.assertEqual(paginator.count, 5)
+
+    def test_large_results_estimated(self):
+        """Test results over the limit are counted by the planner."""
+        paginator = EstimatedCountPaginator(Issue.objects.order_by("id"), 2)
+        paginator.exact_count_limit = 0
+
+        with CaptureQueriesContext(connection) as queries:
+            count = paginator.count
+
+        self.assertGreater(count, 0)
+        (query,) = queries
+        self.assertTrue(query["sql"].startswith("EXPLAIN"))
+
+    def test_empty_filter_estimated_without_query(self):
+        """Test a filter that can match nothing needs no query."""
+        paginator = EstimatedCountPaginator(
+            Issue.objects.filter(id__in=[]).order_by("id"), 2
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 0)
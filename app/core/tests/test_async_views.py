@@ -0,0 +1,122 @@
+"""
+Tests for the async views served under ASGI.
+"""
+
+import asyncio
+import time
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import path as url_path, resolve
+
+from core.models import AuthToken, Issue, Project, Team
+
+SLOW_SECONDS = 0.5
+
+
+async def slow_view(request):
+    await asyncio.sleep(SLOW_SECONDS)
+    return HttpResponse()
+
+
+urlpatterns = [url_path("slow/", slow_view)]
+
+
+@override_settings(ROOT_URLCONF="app.urls_asgi")
+class AsyncViewTests(TransactionTestCase):
+    """Test the ASGI URL configuration.
+
+    Async views query from their own threads and connections, so the
+    data must be committed for them to see it.
+    """
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Sample Team")
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.token = AuthToken.objects.create(user=user)
+        self.client = AsyncClient()
+
+    def get(self, path):
+        """GET path through the ASGI handler as the test user."""
+        return asyncio.run(
+            self.client.get(path, authorization=f"Token {self.token.key}")
+        )
+
+    def test_hot_endpoints_are_async(self):
+        """Test the hot read endpoints resolve to coroutine views."""
+        for path in [
+            "/api/health-check/",
+            "/api/tracker/issues/",
+            "/api/tracker/issues/1/",
+            "/api/tracker/projects/",
+        ]:
+            view = resolve(path).func
+
+            self.assertTrue(asyncio.iscoroutinefunction(view), path)
+
+    def test_other_routes_still_resolve(self):
+        """Test routes without an async view fall through to the router."""
+        for path, name in [
+            ("/api/tracker/issues/search/", "tracker:issue-search"),
+            ("/api/tracker/teams/", "tracker:team-list"),
+            ("/api/user/me/", "user:me"),
+        ]:
+            match = resolve(path)
+
+            self.assertEqual(match.view_name, name)
+            self.assertFalse(asyncio.iscoroutinefunction(match.func))
+
+    def test_health_check(self):
+        """Test the health check answers through the async view."""
+        res = self.get("/api/health-check/")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"healthy": True})
+
+    def test_list_and_retrieve_issues(self):
+        """Test issues are listed and retrieved through the async views."""
+        issue = Issue.objects.create(title="Issue", team=self.team)
+        Project.objects.create(name="Project", team=self.team)
+
+        listed = self.get("/api/tracker/issues/")
+        detail = self.get(f"/api/tracker/issues/{issue.id}/")
+        projects = self.get("/api/tracker/projects/")
+
+        self.assertEqual(listed.json()["results"][0]["id"], issue.id)
+        self.assertEqual(detail.json()["title"], "Issue")
+        self.assertEqual(projects.json()["results"][0]["name"], "Project")
+
+
+@override_settings(ROOT_URLCONF="core.tests.test_async_views")
+class AsyncMiddlewareTests(TransactionTestCase):
+    """Test the middleware stack keeps ASGI requests concurrent."""
+
+    def test_async_views_run_concurrently(self):
+        """Test concurrent requests to an async view overlap."""
+
+        async def requests():
+            client = AsyncClient()
+            return await asyncio.gather(
+                *(client.get("/slow/") for _ in range(4))
+            )
+
+        start = time.perf_counter()
+        responses = asyncio.run(requests())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([res.status_code for res in responses], [200] * 4)
+        self.assertIn("Server-Timing", responses[0])
+        self.assertLess(elapsed, 2 * SLOW_SECONDS)
+
+    def test_health_probes(self):
+        """Test the probes answer through the async middleware."""
+        client = AsyncClient()
+
+        live = asyncio.run(client.get("/api/health-check/live/"))
+        ready = asyncio.run(client.get("/api/health-check/ready/"))
+
+        self.assertEqual(live.json(), {"status": "ok"})
+        self.assertEqual(ready.json()["status"], "ready")
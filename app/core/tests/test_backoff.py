@@ -0,0 +1,52 @@
+"""
+Tests for retrying with backoff.
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.backoff import retry
+
+
+@patch("time.sleep")
+@patch("random.uniform", side_effect=lambda low, high: high)
+class RetryTests(SimpleTestCase):
+    """Test the retry helper."""
+
+    def test_returns_once_func_succeeds(self, patched_uniform, patched_sleep):
+        """Test errors are retried with exponentially growing waits."""
+        results = iter([OSError, OSError, OSError, "ok"])
+
+        def func():
+            result = next(results)
+            if result is OSError:
+                raise OSError
+            return result
+
+        self.assertEqual(retry(func, OSError, base=1, cap=3), "ok")
+        waits = [call.args[0] for call in patched_sleep.call_args_list]
+        self.assertEqual(waits, [1, 2, 3])
+
+    def test_other_errors_not_retried(self, patched_uniform, patched_sleep):
+        """Test only the given errors are retried."""
+        with self.assertRaises(ValueError):
+            retry(lambda: int("x"), OSError)
+
+        patched_sleep.assert_not_called()
+
+    @patch("time.monotonic")
+    def test_gives_up_at_deadline(
+        self, patched_monotonic, patched_uniform, patched_sleep
+    ):
+        """Test the error is re-raised instead of waiting past the timeout."""
+        patched_monotonic.side_effect = [0, 0, 1, 3]
+        patched_sleep.side_effect = None
+
+        with self.assertRaises(OSError):
+            retry(self.fail_always, OSError, timeout=5, base=1)
+
+        self.assertEqual(patched_sleep.call_count, 2)
+
+    def fail_always(self):
+        raise OSError("down")
@@ -0,0 +1,118 @@
+"""
+Tests for the helpers shared by the benchmark commands.
+"""
+
+from django.test import SimpleTestCase
+
+from core.benchmarking import (
+    find_regressions,
+    queries_per_request,
+    query_totals,
+)
+
+METRICS = """\
+app_request_db_queries_count{method="GET",route="tracker:issue-list"} 4.0
+app_request_db_queries_sum{method="GET",route="tracker:issue-list"} 12.0
+app_request_db_queries_count{method="POST",route="tracker:issue-list"} 1.0
+app_request_db_queries_sum{method="POST",route="tracker:issue-list"} 5.0
+app_request_db_duration_seconds_count{method="GET",route="x"} 9.0
+"""
+
+
+def summary(requests=100, errors=0, rps=100.0, p95=10.0, p99=20.0, q=3.0):
+    """Return a route summary as written by benchmark_api."""
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": rps,
+        "p50_ms": p95 / 2,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "queries_per_request": q,
+    }
+
+
+def result(**routes):
+    """Return a benchmark_api result with one run at 10 connections."""
+    return {
+        "runs": [
+            {
+                "concurrency": 10,
+                "total": summary(q=None),
+                "routes": routes,
+            }
+        ]
+    }
+
+
+class QueryTotalsTests(SimpleTestCase):
+    """Test queries per request are read from /metrics output."""
+
+    def test_query_totals(self):
+        """Test sums and counts are collected per route and method."""
+        self.assertEqual(
+            query_totals(METRICS),
+            {
+                ("tracker:issue-list", "GET"): [12.0, 4.0],
+                ("tracker:issue-list", "POST"): [5.0, 1.0],
+            },
+        )
+
+    def test_queries_per_request_between_scrapes(self):
+        """Test only requests made between the scrapes are averaged."""
+        before = {("a", "GET"): [10.0, 5.0], ("b", "GET"): [4.0, 2.0]}
+        after = {
+            ("a", "GET"): [19.0, 8.0],
+            ("b", "GET"): [4.0, 2.0],
+            ("c", "GET"): [2.0, 1.0],
+        }
+
+        self.assertEqual(
+            queries_per_request(before, after),
+            {("a", "GET"): 3.0, ("c", "GET"): 2.0},
+        )
+
+
+class FindRegressionsTests(SimpleTestCase):
+    """Test benchmark runs are compared figure by figure."""
+
+    def test_no_regressions_within_threshold(self):
+        """Test changes below the threshold are not flagged."""
+        baseline = result(a=summary())
+        current = result(a=summary(rps=95.0, p95=10.9, q=3.4))
+
+        self.assertEqual(find_regressions(baseline, current, 10), [])
+
+    def test_regressions_flagged(self):
+        """Test slower, fewer and heavier requests are all flagged."""
+        baseline = result(a=summary(), b=summary())
+        current = result(
+            a=summary(p95=15.0, rps=50.0), b=summary(q=5.0, errors=5)
+        )
+
+        self.assertEqual(
+            find_regressions(baseline, current, 10),
+            [
+                (10, "a", "p95_ms", 10.0, 15.0),
+                (10, "a", "rps", 100.0, 50.0),
+                (10, "b", "queries_per_request", 3.0, 5.0),
+                (10, "b", "error_rate", 0.0, 0.05),
+            ],
+        )
+
+    def test_improvements_and_new_routes_ignored(self):
+        """Test faster routes and routes missing from the baseline pass."""
+        baseline = result(a=summary())
+        current = result(a=summary(p95=1.0, rps=500.0, q=1.0), b=summary())
+
+        self.assertEqual(find_regressions(baseline, current, 10), [])
+
+    def test_small_samples_only_compare_queries(self):
+        """Test timings of rarely sent routes are not compared."""
+        baseline = result(a=summary(requests=5))
+        current = result(a=summary(requests=5, p95=50.0, q=4.0))
+
+        self.assertEqual(
+            find_regressions(baseline, current, 10),
+            [(10, "a", "queries_per_request", 3.0, 4.0)],
+        )
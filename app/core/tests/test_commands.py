@@ -2,13 +2,28 @@
 Test custom django management commands.
 """
 
+import datetime
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2OpError
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.models import (
+    AuthToken,
+    Comment,
+    Issue,
+    IssueDailyStat,
+    IssueTombstone,
+    Team,
+)
 
 
 @patch("core.management.commands.wait_for_db.Command.check")
@@ -34,3 +49,244 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class ExplainQueriesCommandTests(TestCase):
+    """Test the explain_queries command."""
+
+    def test_explain_queries_reports_each_endpoint(self):
+        """Test a plan and timing is printed for every tracker query."""
+        out = StringIO()
+
+        call_command(
+            "explain_queries",
+            users_per_team=2,
+            projects_per_team=2,
+            issues_per_team=30,
+            repeat=1,
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        for name in ["issue-list", "issue-list deep page", "team-list"]:
+            self.assertIn(f"== {name}\n", output)
+        self.assertIn("Execution Time", output)
+        self.assertEqual(Issue.objects.count(), 30)
+
+    def test_explain_queries_without_seed_data(self):
+        """Test the command fails cleanly when nothing has been seeded."""
+        with self.assertRaises(CommandError):
+            call_command("explain_queries", no_seed=True, stdout=StringIO())
+
+
+class BenchmarkBulkCommandTests(TestCase):
+    """Test the benchmark_bulk command."""
+
+    def test_benchmark_bulk_reports_throughput(self):
+        """Test throughput is reported and nothing is left behind."""
+        out = StringIO()
+
+        call_command("benchmark_bulk", count=4, batch_size=2, stdout=out)
+
+        output = out.getvalue()
+        for name in ["single create", "bulk create", "bulk transition"]:
+            self.assertIn(name, output)
+        self.assertFalse(Issue.objects.exists())
+
+
+class BenchmarkSearchCommandTests(TestCase):
+    """Test the benchmark_search command."""
+
+    def test_benchmark_search_reports_latency(self):
+        """Test a latency line is printed for every query."""
+        out = StringIO()
+
+        call_command("benchmark_search", issues=20, repeat=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertEqual(output.count(" matches "), 5)
+        self.assertIn("p95", output)
+
+
+class BenchmarkSerializersCommandTests(TestCase):
+    """Test the benchmark_serializers command."""
+
+    def test_benchmark_serializers_reports_both_paths(self):
+        """Test rows/second is printed for both paths at every size."""
+        out = StringIO()
+
+        call_command(
+            "benchmark_serializers", rows=[5, 10], repeat=1, stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertEqual(output.count("rows/s"), 4)
+        self.assertIn("compiled", output)
+
+
+class BackfillIssueStatsCommandTests(TestCase):
+    """Test the backfill_issue_stats command."""
+
+    def test_backfill_rebuilds_rollups(self):
+        """Test stale rollups are replaced by counts from the issues."""
+        team = Team.objects.create(name="Sample Team")
+        Issue.objects.create(title="Open", team=team)
+        Issue.objects.create(title="Closed", team=team, status="Closed")
+        IssueDailyStat.objects.filter(team=team).update(created=100)
+        out = StringIO()
+
+        call_command("backfill_issue_stats", team=[team.id], stdout=out)
+
+        stats = IssueDailyStat.objects.filter(team=team)
+        self.assertEqual(sum(stat.created for stat in stats), 2)
+        self.assertIn("Rebuilt 2 rollup rows", out.getvalue())
+
+
+class SeedDataCommandTests(TestCase):
+    """Test the seed_data command."""
+
+    def seed(self, prefix="load"):
+        call_command(
+            "seed_data",
+            teams=2,
+            users_per_team=2,
+            projects_per_team=2,
+            issues_per_team=10,
+            comments_per_issue=2,
+            prefix=prefix,
+            seed=1,
+            stdout=StringIO(),
+        )
+        return Team.objects.filter(name__startswith=f"{prefix}-team-")
+
+    def test_seed_data_creates_dataset(self):
+        """Test issues, comments and rollups are seeded consistently."""
+        teams = self.seed()
+
+        issues = Issue.objects.filter(team__in=teams)
+        self.assertEqual(teams.count(), 2)
+        self.assertEqual(issues.count(), 20)
+        self.assertEqual(
+            sum(issue.comment_count for issue in issues),
+            Comment.objects.filter(issue__in=issues).count(),
+        )
+        stats = IssueDailyStat.objects.filter(team__in=teams)
+        self.assertEqual(sum(stat.created for stat in stats), 20)
+
+    def test_seed_data_is_reproducible(self):
+        """Test the same seed produces the same issues."""
+        def titles(teams):
+            return [
+                list(
+                    Issue.objects.filter(team=team)
+                    .order_by("id")
+                    .values_list("title", "status", "comment_count")
+                )
+                for team in teams.order_by("id")
+            ]
+
+        first = titles(self.seed())
+        second = titles(self.seed("again"))
+
+        self.assertEqual(first, second)
+
+
+class PurgeIssueTombstonesCommandTests(TestCase):
+    """Test the purge_issue_tombstones command."""
+
+    def test_purge_reports_deleted_count(self):
+        """Test expired tombstones are deleted and counted."""
+        team = Team.objects.create(name="Sample Team")
+        IssueTombstone.objects.create(
+            team=team,
+            issue_id=1,
+            deleted_at=timezone.now() - datetime.timedelta(days=400),
+        )
+        out = StringIO()
+
+        call_command("purge_issue_tombstones", stdout=out)
+
+        self.assertFalse(IssueTombstone.objects.exists())
+        self.assertIn("Deleted 1 tombstones", out.getvalue())
+
+
+class PurgeExpiredTokensCommandTests(TestCase):
+    """Test the purge_expired_tokens command."""
+
+    def test_purge_deletes_expired_tokens_in_batches(self):
+        """Test only expired tokens are deleted, whatever the batch size."""
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        expired = timezone.now() - datetime.timedelta(days=31)
+        for _ in range(3):
+            AuthToken.objects.create(user=user, last_used_at=expired)
+        kept = AuthToken.objects.create(user=user)
+        out = StringIO()
+
+        call_command("purge_expired_tokens", "--batch-size", "2", stdout=out)
+
+        self.assertEqual(list(AuthToken.objects.all()), [kept])
+        self.assertIn("Deleted 3 tokens", out.getvalue())
+
+
+@patch("core.management.commands.boot.call_command")
+@patch("core.management.commands.boot.pending_migrations", return_value=[])
+class BootCommandTests(SimpleTestCase):
+    """Test the boot command."""
+
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        override = override_settings(STATIC_ROOT=static_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def boot(self, **options):
+        """Run boot against a patched database and return its output."""
+        out = StringIO()
+        with patch("core.management.commands.boot.connections"):
+            call_command("boot", stdout=out, **options)
+        return out.getvalue()
+
+    def test_boot_runs_each_phase(self, patched_pending, patched_call):
+        """Test static files are collected and migrations are skipped."""
+        output = self.boot()
+
+        patched_call.assert_called_once_with(
+            "collectstatic", interactive=False, verbosity=0
+        )
+        self.assertIn("migrate", output)
+        self.assertIn("up to date, skipped", output)
+        self.assertIn("boot: done", output)
+
+    def test_unchanged_static_skipped(self, patched_pending, patched_call):
+        """Test collectstatic is skipped when the manifest matches."""
+        self.boot()
+        patched_call.reset_mock()
+
+        output = self.boot()
+
+        patched_call.assert_not_called()
+        self.assertIn("unchanged, skipped", output)
+
+    def test_pending_migrations_applied(self, patched_pending, patched_call):
+        """Test migrate runs when migrations are pending."""
+        patched_pending.return_value = ["0001", "0002"]
+
+        output = self.boot()
+
+        patched_call.assert_any_call("migrate", interactive=False, verbosity=0)
+        self.assertIn("applied 2 migrations", output)
+
+    @patch("time.sleep")
+    def test_database_deadline(self, patched_sleep, patched_pending, *args):
+        """Test boot fails once the database deadline passes."""
+        with patch("core.management.commands.boot.connections") as conns:
+            conns.__getitem__.return_value.ensure_connection.side_effect = (
+                OperationalError("down")
+            )
+            with self.assertRaises(CommandError):
+                call_command("boot", timeout=0.5, stdout=StringIO())
+
+        patched_pending.assert_not_called()
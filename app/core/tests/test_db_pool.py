@@ -0,0 +1,143 @@
+"""
+Tests for the pooling PostgreSQL backend.
+"""
+
+import threading
+from unittest.mock import patch
+
+import psycopg2
+
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+
+from core.backends.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+def connect():
+    """Open a raw connection to the test database."""
+    return psycopg2.connect(**connection.get_connection_params())
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the ConnectionPool on its own."""
+
+    def make_pool(self, **kwargs):
+        pool = ConnectionPool(**kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_returned_connection_is_reused(self):
+        """Test a returned connection is handed out again."""
+        pool = self.make_pool()
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(connect), conn)
+        stats = pool.stats()
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["in_use"], 1)
+
+    def test_open_transaction_rolled_back_on_return(self):
+        """Test a connection comes back without an open transaction."""
+        pool = self.make_pool()
+        conn = pool.getconn(connect)
+        conn.cursor().execute("SELECT 1")
+        pool.putconn(conn)
+
+        self.assertEqual(
+            conn.get_transaction_status(),
+            psycopg2.extensions.TRANSACTION_STATUS_IDLE,
+        )
+
+    def test_exhausted_pool_times_out(self):
+        """Test checkout fails once max_size connections are in use."""
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        conn = pool.getconn(connect)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(connect)
+
+        pool.putconn(conn)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_waiter_gets_returned_connection(self):
+        """Test a blocked checkout resumes when a connection is returned."""
+        pool = self.make_pool(max_size=1, timeout=5)
+        conn = pool.getconn(connect)
+        threading.Timer(0.05, pool.putconn, [conn]).start()
+
+        self.assertIs(pool.getconn(connect), conn)
+
+    def test_expired_connection_replaced(self):
+        """Test connections older than max_lifetime are not reused."""
+        pool = self.make_pool(max_lifetime=0)
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+
+        self.assertIsNot(pool.getconn(connect), conn)
+        self.assertTrue(conn.closed)
+
+    def test_broken_connection_replaced_on_checkout(self):
+        """Test a connection failing its health check is replaced."""
+        pool = self.make_pool(check_interval=0)
+        conn = pool.getconn(connect)
+        pool.putconn(conn)
+        with connect() as killer, killer.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_terminate_backend(%s)", [conn.get_backend_pid()]
+            )
+        killer.close()
+
+        fresh = pool.getconn(connect)
+
+        self.assertIsNot(fresh, conn)
+        with fresh.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+        self.assertEqual(pool.stats()["failed_checks"], 1)
+
+    def test_failed_connect_frees_slot(self):
+        """Test an error while connecting doesn't leak pool capacity."""
+        pool = self.make_pool(max_size=1, timeout=0.05)
+
+        with patch("psycopg2.connect", side_effect=psycopg2.OperationalError):
+            with self.assertRaises(psycopg2.OperationalError):
+                pool.getconn(connect)
+
+        pool.putconn(pool.getconn(connect))
+        self.assertEqual(pool.stats()["size"], 1)
+
+
+class PoolingBackendTests(TransactionTestCase):
+    """Test the database backend built on the pool."""
+
+    def test_close_returns_connection_to_pool(self):
+        """Test closing and reconnecting reuses the server connection."""
+        connection.ensure_connection()
+        raw = connection.connection
+        connects = connection.pool_stats()["connects"]
+
+        connection.close()
+        connection.ensure_connection()
+
+        self.assertIs(connection.connection, raw)
+        self.assertEqual(connection.pool_stats()["connects"], connects)
+
+    def test_threads_use_separate_connections(self):
+        """Test connections checked out by other threads are not shared."""
+        connection.ensure_connection()
+        seen = []
+
+        def query():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_backend_pid()")
+                seen.append(cursor.fetchone()[0])
+            connection.close()
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+
+        self.assertNotEqual(seen, [connection.connection.get_backend_pid()])
+        self.assertGreaterEqual(connection.pool_stats()["idle"], 1)
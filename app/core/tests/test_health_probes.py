@@ -0,0 +1,98 @@
+"""
+Tests for the liveness and readiness probes.
+"""
+
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import health
+
+LIVE_URL = "/api/health-check/live/"
+READY_URL = "/api/health-check/ready/"
+
+
+def cache_down():
+    """Stand in for a check of an unreachable cache."""
+    raise OSError("down")
+
+
+class HealthProbeTests(TestCase):
+    """Test the health probes answered by HealthCheckMiddleware."""
+
+    def setUp(self):
+        health.reset()
+        self.addCleanup(health.reset)
+
+    def test_liveness_skips_middleware_and_database(self):
+        """Test liveness answers without queries or host validation."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(LIVE_URL, HTTP_HOST="10.0.0.1")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"status": "ok"})
+        self.assertEqual(len(queries), 0)
+        self.assertNotIn("X-Frame-Options", res)
+
+    def test_readiness_reports_each_dependency(self):
+        """Test readiness reports every check with its latency."""
+        res = self.client.get(READY_URL)
+
+        body = res.json()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(body["status"], "ready")
+        self.assertEqual(
+            set(body["checks"]), {"database", "migrations", "cache"}
+        )
+        for check in body["checks"].values():
+            self.assertTrue(check["ok"])
+            self.assertGreaterEqual(check["latency_ms"], 0)
+
+    def test_readiness_reports_pool_stats(self):
+        """Test readiness includes the database connection pool stats."""
+        res = self.client.get(READY_URL)
+
+        pool = res.json()["pools"]["default"]
+        self.assertGreaterEqual(pool["checkouts"], 1)
+        self.assertLessEqual(pool["in_use"], pool["max_size"])
+
+    def test_readiness_is_cached(self):
+        """Test repeated probes reuse the last result."""
+        self.client.get(READY_URL)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(5):
+                self.client.get(READY_URL)
+
+        self.assertEqual(len(queries), 0)
+
+    @override_settings(HEALTH_CHECK_CACHE_SECONDS=0)
+    def test_applied_migrations_checked_once(self):
+        """Test the migration graph is not reloaded once clean."""
+        self.client.get(READY_URL)
+        with patch("core.health.MigrationExecutor") as executor:
+            res = self.client.get(READY_URL)
+
+        executor.assert_not_called()
+        self.assertEqual(res.status_code, 200)
+
+    def test_failing_dependency_returns_503(self):
+        """Test a failing check makes the instance unavailable."""
+        with patch.dict(health.CHECKS, cache=cache_down):
+            res = self.client.get(READY_URL)
+
+        body = res.json()
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(body["status"], "unavailable")
+        self.assertEqual(body["checks"]["cache"]["error"], "down")
+        self.assertTrue(body["checks"]["database"]["ok"])
+
+    def test_pending_migrations_not_ready(self):
+        """Test unapplied migrations make the instance unavailable."""
+        with patch("core.health.MigrationExecutor") as executor:
+            executor.return_value.migration_plan.return_value = ["0001"]
+            res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(res.json()["checks"]["migrations"]["ok"])
@@ -0,0 +1,99 @@
+"""
+Tests for the benchmark load generator.
+"""
+
+import asyncio
+
+from django.test import SimpleTestCase
+
+from core.loadgen import LoadResult, build_request, run_load, run_mix
+
+
+async def serve_and_load(body, keep_alive, concurrency, mix=None):
+    """Run the load generator against a tiny local HTTP server.
+
+    With `mix`, a list of (label, path, weight), run_mix is used instead
+    of run_load.
+    """
+    connection = b"keep-alive" if keep_alive else b"close"
+
+    async def handle(reader, writer):
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n"
+                    b"Connection: %s\r\n\r\n%s"
+                    % (len(body), connection, body)
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        if mix is not None:
+            requests = [
+                (label, build_request("127.0.0.1", port, path), weight)
+                for label, path, weight in mix
+            ]
+            return await run_mix("127.0.0.1", port, requests, concurrency, 0.2)
+        return await run_load(
+            "127.0.0.1", port, ["/a", "/b"], concurrency, 0.2
+        )
+
+
+class LoadGeneratorTests(SimpleTestCase):
+    """Test the asyncio load generator."""
+
+    def test_keep_alive_connections(self):
+        """Test requests are sent over reused connections without errors."""
+        result = asyncio.run(serve_and_load(b"{}", True, 5))
+
+        self.assertGreater(result.requests, 5)
+        self.assertEqual(result.errors, 0)
+        self.assertEqual(result.summary()["concurrency"], 5)
+
+    def test_server_closing_connections(self):
+        """Test clients reconnect when the server closes connections."""
+        result = asyncio.run(serve_and_load(b"x" * 1000, False, 3))
+
+        self.assertGreater(result.requests, 3)
+        self.assertEqual(result.errors, 0)
+
+    def test_percentiles(self):
+        """Test percentiles pick from the sorted latencies."""
+        result = LoadResult(1, 2.0, [float(n) for n in range(100, 0, -1)], 0)
+
+        self.assertEqual(result.percentile(50), 51.0)
+        self.assertEqual(result.percentile(99), 99.0)
+        self.assertEqual(result.rps, 50.0)
+
+    def test_request_mix(self):
+        """Test every label of a mix is sent and reported on its own."""
+        total, results = asyncio.run(
+            serve_and_load(b"{}", True, 4, [("a", "/a", 9), ("b", "/b", 1)])
+        )
+
+        self.assertEqual(set(results), {"a", "b"})
+        self.assertEqual(
+            total.requests, results["a"].requests + results["b"].requests
+        )
+        self.assertGreater(results["a"].requests, results["b"].requests)
+        self.assertEqual(total.errors, 0)
+
+    def test_request_with_body(self):
+        """Test JSON bodies are sent with their length and content type."""
+        request = build_request(
+            "localhost", 80, "/x", {"Authorization": "Token t"}, "POST", [1]
+        )
+
+        head, body = request.split(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"POST /x HTTP/1.1\r\n"))
+        self.assertIn(b"Content-Length: 3", head)
+        self.assertIn(b"Content-Type: application/json", head)
+        self.assertIn(b"Authorization: Token t", head)
+        self.assertEqual(body, b"[1]")
@@ -0,0 +1,153 @@
+"""
+Tests for the request timings and the Prometheus metrics endpoint.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import Issue, Team
+
+METRICS_URL = "/metrics"
+ISSUES_URL = "/api/tracker/issues/"
+
+
+def server_timing(response):
+    """Return the Server-Timing metrics of a response as a dict."""
+    return {
+        match["name"]: (float(match["dur"]), match["desc"])
+        for match in re.finditer(
+            r'(?P<name>\w+);dur=(?P<dur>[\d.]+)(?:;desc="(?P<desc>[^"]*)")?',
+            response["Server-Timing"],
+        )
+    }
+
+
+class RequestMetricsTests(TestCase):
+    """Test MetricsMiddleware."""
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        for n in range(3):
+            Issue.objects.create(title=f"Issue {n}", team=self.team)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        """Test responses report total, database and serializer time."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ISSUES_URL, {"fields": "id,title"})
+
+        timing = server_timing(res)
+        self.assertEqual(set(timing), {"total", "db", "serialize"})
+        self.assertEqual(timing["db"][1], f"{len(queries)} queries")
+        self.assertGreater(timing["serialize"][0], 0)
+        self.assertLessEqual(timing["db"][0], timing["total"][0])
+        self.assertIn("Timing-Allow-Origin", res)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_aggregate_by_route(self):
+        """Test the endpoint exposes per-route histograms and pool gauges."""
+        self.client.get(ISSUES_URL)
+        self.client.get(ISSUES_URL)
+
+        res = self.client.get(
+            METRICS_URL,
+            HTTP_HOST="10.0.0.1",
+            HTTP_AUTHORIZATION="Bearer secret",
+        )
+
+        body = res.content.decode()
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        count = re.search(
+            r'app_request_duration_seconds_count\{method="GET",'
+            r'route="tracker:issue-list"\} (\S+)',
+            body,
+        )
+        self.assertGreaterEqual(float(count[1]), 2)
+        self.assertIn("app_request_db_queries_bucket", body)
+        self.assertIn("app_response_size_bytes_sum", body)
+        self.assertIn(
+            'app_db_pool_connections{database="default",state="in_use"}',
+            body,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token_required(self):
+        """Test the endpoint requires the bearer token when one is set."""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 401)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_metrics_refused_without_token_in_production(self):
+        """Test the endpoint is closed when no token is set and not DEBUG."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 403)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_metrics_open_without_token_in_debug(self):
+        """Test the endpoint needs no token in DEBUG without one set."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_queries_outside_requests_not_counted(self):
+        """Test the query timer is a no-op outside a request."""
+        self.assertIn(metrics.time_query, connection.execute_wrappers)
+
+        Issue.objects.count()
+
+        self.assertIsNone(metrics.current())
+
+
+class MultiprocessMetricsTests(TestCase):
+    """Test samples from several worker processes are aggregated."""
+
+    def observe_in_worker(self, directory):
+        """Record one request in a separate process sharing directory."""
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from core import metrics; "
+                "metrics.REQUEST_SECONDS.labels('worker', 'GET')"
+                ".observe(0.01)",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory},
+            check=True,
+        )
+
+    def test_render_sums_worker_samples(self):
+        """Test /metrics output includes every worker's samples."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.observe_in_worker(directory)
+            self.observe_in_worker(directory)
+
+            with patch.dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory):
+                body = metrics.render().decode()
+
+        self.assertIn(
+            'app_request_duration_seconds_count{method="GET",route="worker"} '
+            "2.0",
+            body,
+        )
@@ -0,0 +1,221 @@
+"""
+Tests for routing reads to database replicas.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.test import (
+    AsyncClient,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import routing
+from core.models import AuthToken, Issue, Team
+from core.testing import shared_caches
+
+REPLICA = "replica"
+ISSUES_URL = "/api/tracker/issues/"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], CACHES=shared_caches())
+class ReplicaRoutingTests(TransactionTestCase):
+    """Test reads go to a replica, here a mirror of the test database.
+
+    The replica alias is added once the test databases are set up, the
+    way DB_REPLICA_HOSTS adds mirrors of the default test database.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connections.settings[REPLICA] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            "TEST": {"MIRROR": DEFAULT_DB_ALIAS},
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections.settings[REPLICA]
+        super().tearDownClass()
+
+    def setUp(self):
+        caches["default"].clear()
+        routing.reset()
+        self.addCleanup(routing.reset)
+        self.team = Team.objects.create(name="Sample Team")
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+        self.client = self.make_client("user@example.com")
+
+    def make_client(self, email):
+        """Return an API client authenticated as a new team member."""
+        user = get_user_model().objects.create_user(
+            email=email, password="testpass123", team=self.team
+        )
+        client = APIClient()
+        token = AuthToken.objects.create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        return client
+
+    def get_issues(self, client=None):
+        """List issues and return the queries run on (primary, replica)."""
+        with CaptureQueriesContext(
+            connections[DEFAULT_DB_ALIAS]
+        ) as primary, CaptureQueriesContext(connections[REPLICA]) as replica:
+            res = (client or self.client).get(ISSUES_URL)
+
+        self.assertEqual(res.status_code, 200)
+        ids = [issue["id"] for issue in res.json()["results"]]
+        self.assertIn(self.issue.id, ids)
+        return primary, replica
+
+    def issue_queries(self, queries):
+        return [q for q in queries if "core_issue" in q["sql"]]
+
+    def test_safe_reads_use_replica(self):
+        """Test list reads run on the replica and tokens on the primary."""
+        primary, replica = self.get_issues()
+
+        self.assertTrue(self.issue_queries(replica))
+        self.assertFalse(self.issue_queries(primary))
+        self.assertTrue(any("authtoken" in q["sql"] for q in primary))
+
+    def test_writer_sticks_to_primary(self):
+        """Test a client reads from the primary right after writing."""
+        res = self.client.post(ISSUES_URL, {"title": "New"})
+        self.assertEqual(res.status_code, 201)
+
+        primary, replica = self.get_issues()
+        self.assertTrue(self.issue_queries(primary))
+        self.assertFalse(self.issue_queries(replica))
+
+        other = self.make_client("other@example.com")
+        # Skip the team's cached response so the list is queried again.
+        caches[settings.TRACKER_CACHE_ALIAS].clear()
+        primary, replica = self.get_issues(other)
+        self.assertTrue(self.issue_queries(replica))
+
+    def test_pin_seen_by_other_workers(self):
+        """Test a pin set through one cache instance holds in another.
+
+        Each worker process builds its own cache instance, so the write
+        and the read that follows it may be handled by different ones.
+        """
+        writer = {"default": caches.create_connection("default")}
+        reader = {"default": caches.create_connection("default")}
+
+        with patch.object(routing, "caches", writer):
+            res = self.client.post(ISSUES_URL, {"title": "New"})
+        self.assertEqual(res.status_code, 201)
+
+        with patch.object(routing, "caches", reader):
+            primary, replica = self.get_issues()
+        self.assertTrue(self.issue_queries(primary))
+        self.assertFalse(self.issue_queries(replica))
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        }
+    )
+    def test_per_process_cache_disables_replicas(self):
+        """Test reads stay on the primary when pins can't be shared."""
+        primary, replica = self.get_issues()
+
+        self.assertTrue(self.issue_queries(primary))
+        self.assertFalse(self.issue_queries(replica))
+
+    def test_replica_reads_not_cached(self):
+        """Test responses read from a replica are neither cached nor tagged.
+
+        A lagging replica may miss writes of the team's current version,
+        which a cached copy would then serve to writers on the primary.
+        """
+        res = self.client.get(ISSUES_URL)
+        self.assertNotIn("ETag", res)
+
+        primary, replica = self.get_issues()
+        self.assertTrue(self.issue_queries(replica))
+
+        self.client.post(ISSUES_URL, {"title": "New"})
+        primary, replica = self.get_issues()
+        self.assertTrue(self.issue_queries(primary))
+        self.assertIn("ETag", self.client.get(ISSUES_URL))
+
+    def test_failed_write_does_not_pin(self):
+        """Test a rejected write keeps the client on the replica."""
+        res = self.client.post(ISSUES_URL, {})
+        self.assertEqual(res.status_code, 400)
+
+        primary, replica = self.get_issues()
+        self.assertTrue(self.issue_queries(replica))
+
+    @override_settings(ROOT_URLCONF="app.urls_asgi")
+    def test_async_views_use_replica(self):
+        """Test the replica choice reaches async views' worker threads."""
+        token = AuthToken.objects.get(user__email="user@example.com")
+        # Check the lag here: the test client never closes connections
+        # opened on the middleware's thread.
+        routing.choose_replica()
+        connections[REPLICA].close()
+        db_for_read = routing.ReplicaRouter.db_for_read
+        issue_reads = []
+
+        def spy(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            if model is Issue:
+                issue_reads.append(alias)
+            return alias
+
+        with patch.object(routing.ReplicaRouter, "db_for_read", spy):
+            res = asyncio.run(
+                AsyncClient().get(
+                    ISSUES_URL, authorization=f"Token {token.key}"
+                )
+            )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(issue_reads), {REPLICA})
+
+    @patch("core.routing.replica_lag", return_value=60.0)
+    def test_lagging_replica_falls_back(self, patched_lag):
+        """Test reads use the primary while the replica lags too far."""
+        primary, replica = self.get_issues()
+        self.get_issues()
+
+        self.assertTrue(self.issue_queries(primary))
+        self.assertFalse(self.issue_queries(replica))
+        patched_lag.assert_called_once_with(REPLICA)
+
+    @patch("core.routing.replica_lag", side_effect=OperationalError)
+    def test_unreachable_replica_falls_back(self, patched_lag):
+        """Test reads use the primary when the replica is down."""
+        primary, replica = self.get_issues()
+
+        self.assertTrue(self.issue_queries(primary))
+        self.assertFalse(replica.captured_queries)
+
+    def test_replica_lag_of_primary_server(self):
+        """Test the lag query reports 0 for a server not in recovery."""
+        self.assertEqual(routing.replica_lag(REPLICA), 0)
+
+    def test_router_defaults_to_primary(self):
+        """Test reads outside a routed request and writes use the primary."""
+        router = routing.ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Issue), DEFAULT_DB_ALIAS)
+        with routing.use_replica(REPLICA):
+            self.assertEqual(router.db_for_read(Issue), REPLICA)
+            self.assertEqual(router.db_for_read(AuthToken), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Issue), DEFAULT_DB_ALIAS)
+        self.assertFalse(router.allow_migrate(REPLICA, "core"))
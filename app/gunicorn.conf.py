@@ -0,0 +1,13 @@
+"""
+Gunicorn settings, loaded from the working directory on start-up.
+"""
+
+import os
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
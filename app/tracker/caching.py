@@ -0,0 +1,138 @@
+"""
+Team-versioned response caching for the tracker APIs.
+
+Every team has a version counter that is bumped whenever one of its
+issues, projects or comments is written. Cached responses and ETags are
+keyed by that version, so a write invalidates everything cached for the
+team at once without having to track individual keys.
+
+The versions only invalidate anything if every worker reads them from
+the same cache, so nothing is cached, and no ETags are sent, when
+`TRACKER_CACHE_ALIAS` is a per-process backend such as LocMemCache.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import routing
+from core.caching import is_shared
+
+
+def get_cache():
+    """Return the cache backend used for tracker responses."""
+    return caches[settings.TRACKER_CACHE_ALIAS]
+
+
+def _version_key(team_id):
+    return f"tracker:team:{team_id}:version"
+
+
+def _initial_version():
+    # Seeding from the clock means a version evicted from the cache is
+    # never handed out again, so stale entries can't be served by it.
+    return time.time_ns()
+
+
+def get_team_version(team_id):
+    """Return the current cache version for a team."""
+    cache = get_cache()
+    key = _version_key(team_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_team_version(team_id):
+    """Invalidate every cached response for a team."""
+    if team_id is None:
+        return
+
+    cache = get_cache()
+    key = _version_key(team_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+class TeamCachedResponseMixin:
+    """Cache responses per team version, with ETags.
+
+    A request whose `If-None-Match` matches the current ETag is answered
+    with a 304 before the handler runs. Only responses read from the
+    primary are cached and given an ETag: a lagging replica may not have
+    the writes of the current version yet. Responses are served uncached
+    when the cache is per-process, whose versions other workers' writes
+    never bump.
+    """
+
+    def get_response_cache_key(self, request, team_id):
+        """Return a digest identifying this response for the team version."""
+        parts = [
+            str(team_id),
+            str(get_team_version(team_id)),
+            self.basename,
+            self.action,
+            request.get_host(),
+            request.path,
+            "&".join(sorted(request.GET.urlencode().split("&"))),
+            request.accepted_media_type,
+        ]
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response or build and cache it with handler."""
+        team_id = request.user.team_id
+        cache = get_cache()
+        if team_id is None or not is_shared(cache):
+            return handler(request, *args, **kwargs)
+
+        digest = self.get_response_cache_key(request, team_id)
+        etag = f'"{digest}"'
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = cache.get(f"tracker:response:{digest}")
+            if data is not None:
+                response = Response(data)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                if routing.current_replica() is not None:
+                    patch_cache_control(response, private=True, no_cache=True)
+                    return response
+
+                cache.set(
+                    f"tracker:response:{digest}",
+                    response.data,
+                    settings.TRACKER_CACHE_TIMEOUT,
+                )
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class TeamVersionedCacheMixin(TeamCachedResponseMixin):
+    """Cache list and retrieve responses per team version, with ETags."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
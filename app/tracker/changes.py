@@ -0,0 +1,200 @@
+"""
+Issue change feed for clients syncing deltas instead of whole lists.
+
+A client's position is a pair of keyset positions: one in the team's
+issues ordered by (updated_at, id) and one in its tombstones ordered by
+(deleted_at, id). Both travel in a single opaque cursor. Rows written in
+the last TRACKER_CHANGES_SETTLE_SECONDS are held back, so a transaction
+that commits after a later-stamped one is never skipped by a cursor that
+has already moved past its timestamp. That only holds if writes commit
+within the window of their timestamp, which `stamp` checks.
+"""
+
+import base64
+import binascii
+import contextlib
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from core.models import IssueTombstone
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class CursorExpired(APIException):
+    """The deletes a cursor still needs have already been purged."""
+
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        "This cursor is older than the deletion history. Sync again "
+        "without a cursor."
+    )
+    default_code = "cursor_expired"
+
+
+class WriteTooSlow(APIException):
+    """A write outlasted the settle window and was rolled back."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The change took too long to save. Try again."
+    default_code = "write_too_slow"
+
+
+def encode_cursor(issues, tombstones):
+    """Return the opaque cursor for a pair of (timestamp, id) positions."""
+    payload = [
+        issues[0].isoformat(),
+        issues[1],
+        tombstones[0].isoformat(),
+        tombstones[1],
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the (issues, tombstones) positions held by a cursor."""
+    try:
+        updated_at, issue_id, deleted_at, tombstone_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        positions = (
+            (datetime.datetime.fromisoformat(updated_at), int(issue_id)),
+            (datetime.datetime.fromisoformat(deleted_at), int(tombstone_id)),
+        )
+    except (binascii.Error, TypeError, ValueError):
+        raise NotFound("Invalid cursor.")
+
+    if any(timezone.is_naive(moment) for moment, _ in positions):
+        raise NotFound("Invalid cursor.")
+    return positions
+
+
+def settled_until():
+    """Return the newest timestamp the feed may hand out yet."""
+    return timezone.now() - datetime.timedelta(
+        seconds=settings.TRACKER_CHANGES_SETTLE_SECONDS
+    )
+
+
+@contextlib.contextmanager
+def stamp():
+    """Yield the timestamp of a write; raise WriteTooSlow if it lags.
+
+    Use it inside the write's transaction once its row locks are held,
+    so waiting for them does not age the timestamp. Rows stamped more
+    than TRACKER_CHANGES_SETTLE_SECONDS before their commit could be
+    skipped by the feed, so such a write is rolled back instead.
+    """
+    moment = timezone.now()
+    yield moment
+    window = settings.TRACKER_CHANGES_SETTLE_SECONDS
+    # A window of 0 holds nothing back, so there is nothing to protect.
+    if window and (timezone.now() - moment).total_seconds() >= window:
+        raise WriteTooSlow()
+
+
+def start_positions(since=None):
+    """Return the positions of a client starting to sync.
+
+    With `since`, the client has everything up to then. Without it, it
+    syncs every issue and only needs the deletes from now on.
+    """
+    if since is not None:
+        return (since, 0), (since, 0)
+    return (EPOCH, 0), (settled_until(), 0)
+
+
+def after(queryset, field, position):
+    """Filter queryset to rows past a (timestamp, id) keyset position.
+
+    The redundant lower bound on `field` lets PostgreSQL range scan the
+    (team, field, id) index instead of filtering the OR.
+    """
+    moment, pk = position
+    return queryset.filter(
+        Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk}),
+        **{f"{field}__gte": moment},
+    )
+
+
+def check_history(tombstones_position):
+    """Raise CursorExpired if deletes after the position were purged."""
+    oldest = timezone.now() - datetime.timedelta(
+        days=settings.TRACKER_TOMBSTONE_RETENTION_DAYS
+    )
+    if tombstones_position[0] < oldest:
+        raise CursorExpired()
+
+
+def next_page(issues, team_id, positions, limit, until=None):
+    """Return the next page of changes after positions.
+
+    `issues` is the team's issue queryset. Returns the changed issues,
+    the deleted (deleted_at, tombstone id, issue id) rows, the cursor
+    to resume from and whether more changes are waiting. Changes after
+    `until` are left for later; it defaults to settled_until().
+    """
+    issues_position, tombstones_position = positions
+    check_history(tombstones_position)
+    if until is None:
+        until = settled_until()
+
+    changed = list(
+        after(issues, "updated_at", issues_position)
+        .filter(updated_at__lte=until)
+        .order_by("updated_at", "id")[: limit + 1]
+    )
+    deleted = list(
+        after(
+            IssueTombstone.objects.filter(team_id=team_id),
+            "deleted_at",
+            tombstones_position,
+        )
+        .filter(deleted_at__lte=until)
+        .order_by("deleted_at", "id")
+        .values_list("deleted_at", "id", "issue_id")[: limit + 1]
+    )
+    has_more = len(changed) > limit or len(deleted) > limit
+    changed, deleted = changed[:limit], deleted[:limit]
+
+    if changed:
+        issues_position = (changed[-1].updated_at, changed[-1].id)
+    if deleted:
+        tombstones_position = deleted[-1][:2]
+    else:
+        # Nothing was deleted up to `until`, so cursors of teams that
+        # rarely delete move along instead of expiring.
+        tombstones_position = max(tombstones_position, (until, 0))
+
+    return (
+        changed,
+        deleted,
+        encode_cursor(issues_position, tombstones_position),
+        has_more,
+    )
+
+
+def record_deleted(issue):
+    """Leave a tombstone for a deleted issue of a team and return it."""
+    if issue.team_id is not None:
+        return IssueTombstone.objects.create(
+            team_id=issue.team_id,
+            issue_id=issue.pk,
+            deleted_at=timezone.now(),
+        )
+
+
+def purge_tombstones():
+    """Delete tombstones past the retention period; returns the count."""
+    oldest = timezone.now() - datetime.timedelta(
+        days=settings.TRACKER_TOMBSTONE_RETENTION_DAYS
+    )
+    deleted, _ = IssueTombstone.objects.filter(deleted_at__lt=oldest).delete()
+    return deleted
@@ -0,0 +1,289 @@
+"""
+Live issue events for clients streaming their team's changes.
+
+Writes publish small issue events through the backend named by
+TRACKER_EVENTS_BACKEND. Every ASGI process runs one Broker, which hands
+each event to the open streams of its team through bounded queues. A
+stream that falls a queue behind is closed instead of buffering without
+limit; its client reconnects with Last-Event-ID and catches up from the
+change feed, see `tracker.changes`.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+from core import metrics
+from tracker import outbox
+
+CREATED = "issue.created"
+UPDATED = "issue.updated"
+DELETED = "issue.deleted"
+
+# Events carry the issue without its description, so they stay well
+# within PostgreSQL's 8000 byte NOTIFY payloads.
+ISSUE_FIELDS = (
+    "id",
+    "team",
+    "project",
+    "title",
+    "status",
+    "assigned_to",
+    "comment_count",
+    "created_at",
+    "updated_at",
+)
+
+_backends = {}
+
+
+def issue_data(issue):
+    """Return the JSON-ready fields of an issue sent with its events."""
+    return {
+        "id": issue.pk,
+        "project": issue.project_id,
+        "title": issue.title,
+        "status": issue.status,
+        "assigned_to": issue.assigned_to_id,
+        "comment_count": issue.comment_count,
+        "created_at": issue.created_at.isoformat(),
+        "updated_at": issue.updated_at.isoformat(),
+    }
+
+
+def issue_event(issue, name=UPDATED):
+    """Return the event for a created or updated issue."""
+    return {
+        "team": issue.team_id,
+        "event": name,
+        "position": [issue.updated_at.isoformat(), issue.pk],
+        "data": issue_data(issue),
+    }
+
+
+def deleted_event(tombstone):
+    """Return the event for the deleted issue a tombstone stands for."""
+    return {
+        "team": tombstone.team_id,
+        "event": DELETED,
+        "position": [tombstone.deleted_at.isoformat(), tombstone.pk],
+        "data": {"id": tombstone.issue_id},
+    }
+
+
+def get_backend():
+    """Return the configured events backend."""
+    path = settings.TRACKER_EVENTS_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def publish(events):
+    """Publish events to live streams and to the teams' webhooks.
+
+    Both happen only once the current transaction commits.
+    """
+    events = [event for event in events if event["team"] is not None]
+    if events:
+        get_backend().publish(events)
+        outbox.record_events(events)
+
+
+def publish_issues(issues, name=UPDATED):
+    """Publish an event for every issue of a queryset or list.
+
+    Returns the issues, loaded if a queryset was given.
+    """
+    if hasattr(issues, "only"):
+        issues = list(issues.only(*ISSUE_FIELDS))
+    publish([issue_event(issue, name) for issue in issues])
+    return issues
+
+
+class LocalBackend:
+    """Deliver events to the streams of the publishing process only.
+
+    Suits a single ASGI process serving both the writes and the streams.
+    """
+
+    def publish(self, events):
+        transaction.on_commit(lambda: broker.publish_threadsafe(events))
+
+    async def listen(self, broker):
+        return None
+
+
+class PostgresBackend:
+    """Deliver events to every process through PostgreSQL NOTIFY.
+
+    Notifications are sent in the writing transaction, so PostgreSQL
+    delivers them only once it commits. Each process listens on one
+    dedicated connection, read by the event loop without a thread.
+    """
+
+    channel = "tracker_events"
+
+    def publish(self, events):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) "
+                "AS payload",
+                [self.channel, [json.dumps(event) for event in events]],
+            )
+
+    def connect(self):
+        """Open the connection listening to the channel."""
+        wrapper = connections["default"]
+        conn = wrapper.Database.connect(**wrapper.get_connection_params())
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return conn
+
+    async def listen(self, broker):
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(None, self.connect)
+        return PostgresListener(loop, conn, broker)
+
+
+class PostgresListener:
+    """Pass the notifications of a listening connection to a broker."""
+
+    def __init__(self, loop, conn, broker):
+        self.loop = loop
+        self.conn = conn
+        self.broker = broker
+        loop.add_reader(conn.fileno(), self.read)
+
+    def read(self):
+        """Publish the notifications waiting on the connection."""
+        try:
+            self.conn.poll()
+        except self.conn.Error:
+            # Notifications were lost with the connection, so streams
+            # resume from the change feed and the next one reconnects.
+            self.broker.stop()
+            return
+
+        events = [json.loads(notify.payload) for notify in self.conn.notifies]
+        self.conn.notifies.clear()
+        self.broker.publish(events)
+
+    def close(self):
+        """Stop reading and close the connection."""
+        if not self.loop.is_closed():
+            self.loop.remove_reader(self.conn.fileno())
+        self.conn.close()
+
+
+class Stream:
+    """The bounded queue of events waiting for one client."""
+
+    def __init__(self, team_id, size):
+        self.team_id = team_id
+        self.queue = asyncio.Queue(size)
+        self.closed = False
+        self.overflowed = False
+
+    def put(self, event):
+        """Queue an event, closing the stream if its queue is full."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            metrics.EVENT_STREAM_OVERFLOWS.inc()
+            self.close()
+
+    def close(self):
+        """Stop the stream once the events already queued are skipped."""
+        self.closed = True
+        if not self.queue.full():
+            self.queue.put_nowait(None)
+
+    async def get(self, timeout):
+        """Return the next event, or None once closed or after timeout."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return None if self.closed else event
+
+
+class Broker:
+    """Fan events out to the open streams of this process by team."""
+
+    def __init__(self):
+        self.streams = defaultdict(set)
+        self.loop = None
+        self.backend = None
+        self.listener = None
+        self.starting = None
+
+    async def start(self):
+        """Start listening to the backend from the running event loop."""
+        loop = asyncio.get_running_loop()
+        backend = get_backend()
+        while self.starting is not None and self.loop is loop:
+            await asyncio.shield(self.starting)
+        if self.loop is loop and self.backend is backend:
+            return
+
+        self.stop()
+        self.loop, self.backend = loop, backend
+        self.starting = loop.create_future()
+        try:
+            self.listener = await backend.listen(self)
+        except BaseException:
+            self.loop = None
+            raise
+        finally:
+            self.starting.set_result(None)
+            self.starting = None
+
+    def stop(self):
+        """Stop listening and close every stream."""
+        if self.listener is not None:
+            self.listener.close()
+        self.loop = self.backend = self.listener = None
+        for streams in self.streams.values():
+            for stream in streams:
+                stream.close()
+
+    async def subscribe(self, team_id):
+        """Return a new stream of the team's events."""
+        await self.start()
+        stream = Stream(team_id, settings.TRACKER_EVENTS_QUEUE_SIZE)
+        self.streams[team_id].add(stream)
+        metrics.EVENT_STREAMS.inc()
+        return stream
+
+    def unsubscribe(self, stream):
+        """Stop sending events to a stream."""
+        streams = self.streams.get(stream.team_id, set())
+        if stream in streams:
+            streams.discard(stream)
+            metrics.EVENT_STREAMS.dec()
+        if not streams:
+            self.streams.pop(stream.team_id, None)
+
+    def publish(self, events):
+        """Queue events for the streams of their teams."""
+        for event in events:
+            for stream in list(self.streams.get(event["team"], ())):
+                stream.put(event)
+
+    def publish_threadsafe(self, events):
+        """Publish events from any thread of the process."""
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.publish, events)
+
+
+broker = Broker()
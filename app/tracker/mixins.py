@@ -0,0 +1,101 @@
+"""
+View mixins for the tracker APIs.
+"""
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+
+from rest_framework.response import Response
+
+from core.serializers import is_sparse_request, sparse_fieldset
+
+
+class SparseQuerysetMixin:
+    """Load only what the requested serializer fields need.
+
+    `select_related_fields` and `prefetch_related_fields` map serializer
+    field names to the lookups that field needs; lookups for fields left
+    out of `?fields=` or listed in `?omit=` are skipped. Sparse reads also
+    restrict the SELECT to the requested columns plus the ordering fields
+    the cursor paginator reads.
+    """
+
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    def get_requested_fields(self):
+        """Return the serializer field names this request will render."""
+        serializer_class = self.get_serializer_class()
+        return sparse_fieldset(self.request, serializer_class.Meta.fields)
+
+    def _columns(self, model, names):
+        columns = []
+        for name in names:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.append(name)
+        return columns
+
+    def narrow_queryset(self, queryset):
+        """Apply the related lookups and columns the request needs."""
+        names = self.get_requested_fields()
+        select = [
+            self.select_related_fields[name]
+            for name in names
+            if name in self.select_related_fields
+        ]
+        prefetch = [
+            self.prefetch_related_fields[name]
+            for name in names
+            if name in self.prefetch_related_fields
+        ]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        if is_sparse_request(self.request):
+            ordering = getattr(self, "ordering_fields", None) or []
+            queryset = queryset.only(
+                "pk", *self._columns(queryset.model, [*names, *ordering])
+            )
+
+        return queryset
+
+
+class CompiledListMixin:
+    """List through the serializer's compiled read path when it can.
+
+    Rows are fetched with `values_list()` instead of as model instances
+    and rendered by `CompiledReadMixin.represent_rows()`. Views fall back
+    to the regular list when `TRACKER_FAST_READS` is off or a requested
+    field cannot be compiled.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        lookups = getattr(serializer, "read_lookups", lambda: None)()
+        if not settings.TRACKER_FAST_READS or lookups is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            # The cursor reads its position from the ordering fields.
+            ordering = self.paginator.get_ordering(request, queryset, self)
+            lookups += [
+                name
+                for name in (field.lstrip("-") for field in ordering)
+                if name not in lookups
+            ]
+        rows = queryset.values_list(*lookups, named=True)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.represent_rows(page)
+            )
+
+        return Response(serializer.represent_rows(list(rows)))
@@ -0,0 +1,213 @@
+"""
+Transactional outbox for webhooks and assignment notifications.
+
+Writes add OutboxMessage rows in the transaction of the change, so a
+message exists exactly when its change was committed and requests never wait on
+a receiver. The `process_outbox` worker leases due messages with
+SELECT ... FOR UPDATE SKIP LOCKED, so several workers never claim the
+same row, delivers them concurrently and retries failures with jittered
+exponential backoff. Delivery is at least once: receivers should ignore
+a repeated X-Tracker-Delivery id.
+"""
+
+import datetime
+import hashlib
+import hmac
+import json
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import backoff
+from core.models import OutboxMessage, Webhook
+
+ASSIGNED = "issue.assigned"
+
+
+def record_events(events):
+    """Queue a webhook delivery of every event for its team's webhooks."""
+    teams = {event["team"] for event in events}
+    webhooks = Webhook.objects.filter(team_id__in=teams, is_active=True)
+    by_team = {}
+    for webhook_id, team_id in webhooks.values_list("id", "team_id"):
+        by_team.setdefault(team_id, []).append(webhook_id)
+
+    OutboxMessage.objects.bulk_create(
+        OutboxMessage(
+            event=event["event"],
+            payload=event["data"],
+            webhook_id=webhook_id,
+        )
+        for event in events
+        for webhook_id in by_team.get(event["team"], ())
+    )
+
+
+def notify_assigned(assignments):
+    """Queue a notification per (assignee, newly assigned issues) pair."""
+    OutboxMessage.objects.bulk_create(
+        OutboxMessage(
+            event=ASSIGNED,
+            payload={
+                "issues": [
+                    {"id": issue.pk, "title": issue.title} for issue in issues
+                ]
+            },
+            recipient=assignee,
+        )
+        for assignee, issues in assignments
+        if assignee is not None and issues
+    )
+
+
+def claim(batch_size):
+    """Lease up to batch_size due messages and return them.
+
+    The lease pushes `available_at` out, so the messages are retried if
+    this worker dies before recording the outcome.
+    """
+    now = timezone.now()
+    lease = datetime.timedelta(seconds=settings.TRACKER_OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        ids = list(
+            OutboxMessage.objects.filter(failed_at=None, available_at__lte=now)
+            .order_by("available_at", "id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        OutboxMessage.objects.filter(id__in=ids).update(
+            available_at=now + lease, attempts=F("attempts") + 1
+        )
+    return list(
+        OutboxMessage.objects.filter(id__in=ids)
+        .select_related("webhook", "recipient")
+        .order_by("id")
+    )
+
+
+def sign(secret, body):
+    """Return the X-Tracker-Signature header value of a webhook body."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def post_webhook(message):
+    """POST a message to its webhook; raises on failure."""
+    webhook = message.webhook
+    if not webhook.is_active:
+        return
+
+    body = json.dumps(
+        {
+            "id": message.pk,
+            "event": message.event,
+            "data": message.payload,
+            "created_at": message.created_at.isoformat(),
+        }
+    ).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-Tracker-Event": message.event,
+        "X-Tracker-Delivery": str(message.pk),
+    }
+    if webhook.secret:
+        headers["X-Tracker-Signature"] = sign(webhook.secret, body)
+    request = urllib.request.Request(
+        webhook.url, data=body, headers=headers, method="POST"
+    )
+    with urllib.request.urlopen(
+        request, timeout=settings.TRACKER_OUTBOX_TIMEOUT
+    ) as response:
+        response.read()
+
+
+def mail_assignee(message):
+    """Email a notification to its recipient; raises on failure."""
+    issues = message.payload["issues"]
+    if len(issues) == 1:
+        subject = f"Assigned to you: {issues[0]['title']}"
+    else:
+        subject = f"{len(issues)} issues assigned to you"
+    lines = [f"#{issue['id']} {issue['title']}" for issue in issues]
+    send_mail(
+        subject,
+        "You were assigned:\n\n" + "\n".join(lines) + "\n",
+        None,
+        [message.recipient.email],
+    )
+
+
+def deliver_one(message):
+    """Deliver a message; returns None or the error it failed with."""
+    try:
+        if message.webhook_id is not None:
+            post_webhook(message)
+        else:
+            mail_assignee(message)
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+def record_outcomes(outcomes):
+    """Delete delivered messages and reschedule or fail the others.
+
+    Returns the (delivered, retrying, failed) counts.
+    """
+    now = timezone.now()
+    delivered, retrying, failed = [], [], []
+    for message, error in outcomes:
+        if error is None:
+            delivered.append(message.pk)
+            continue
+
+        message.last_error = error[:1000]
+        if message.attempts >= settings.TRACKER_OUTBOX_MAX_ATTEMPTS:
+            message.failed_at = now
+            failed.append(message)
+        else:
+            message.available_at = now + datetime.timedelta(
+                seconds=backoff.delay(
+                    message.attempts - 1,
+                    base=settings.TRACKER_OUTBOX_RETRY_BASE_SECONDS,
+                    cap=settings.TRACKER_OUTBOX_RETRY_CAP_SECONDS,
+                )
+            )
+            retrying.append(message)
+
+    OutboxMessage.objects.filter(id__in=delivered).delete()
+    OutboxMessage.objects.bulk_update(
+        retrying + failed, ["last_error", "available_at", "failed_at"]
+    )
+    return len(delivered), len(retrying), len(failed)
+
+
+class Worker:
+    """Delivers claimed batches of messages on a pool of threads.
+
+    Deliveries only wait on the network: the messages are loaded with
+    their webhook and recipient before being handed to the threads, so
+    the pool never opens database connections.
+    """
+
+    def __init__(self, batch_size, concurrency):
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="outbox"
+        )
+
+    def run_batch(self):
+        """Claim and deliver one batch; returns its outcome counts."""
+        messages = claim(self.batch_size)
+        if not messages:
+            return 0, 0, 0
+        outcomes = zip(messages, self.executor.map(deliver_one, messages))
+        return record_outcomes(outcomes)
+
+    def close(self):
+        self.executor.shutdown()
@@ -0,0 +1,197 @@
+"""
+Pagination for the tracker APIs.
+"""
+
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, F, Func, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class RowComparison(Func):
+    """SQL row value comparison, `(a, b) < (%s, %s)`.
+
+    Compares the columns as one tuple, so an index on the same columns
+    in the same order can seek straight to the position.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, columns, operator, values):
+        self.operator = operator
+        self.width = len(columns)
+        super().__init__(*columns, *values)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        parts, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            parts.append(sql)
+            params.extend(expression_params)
+        columns = ", ".join(parts[:self.width])
+        values = ", ".join(parts[self.width:])
+        return f"({columns}) {self.operator} ({values})", params
+
+
+class KeysetPagination(CursorPagination):
+    """Keyset pagination with opaque cursors.
+
+    Pages are fetched with a `WHERE (<ordering>) < (<position>)` filter
+    rather than an OFFSET, so deep pages cost the same as the first one.
+    The ordering defaults to `-id` and follows the view's
+    `OrderingFilter` when one is configured.
+
+    DRF's cursor only holds the first ordering field and walks ties with
+    an offset, so many equal values degrade into an offset scan. Here the
+    cursor holds every ordering field, and `id` is appended when the
+    ordering does not include it, so every position is unique.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering, ending with `id` to break ties."""
+        ordering = super().get_ordering(request, queryset, view)
+        if not {"id", "pk"} & {field.lstrip("-") for field in ordering}:
+            direction = "-" if ordering[-1].startswith("-") else ""
+            ordering += (f"{direction}id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = 0, False, None
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(
+                self.after(queryset, current_position, reverse)
+            )
+
+        # One extra row tells whether a page follows this one.
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def after(self, queryset, position, reverse):
+        """Return the filter for the rows past position.
+
+        Orderings in a single direction compare the whole row at once.
+        Mixed directions expand to `a > x OR (a = x AND b < y) ...`.
+        """
+        try:
+            raw_values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(raw_values, list) or len(raw_values) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        names, operators, fields, values = [], [], [], []
+        for order, raw in zip(self.ordering, raw_values):
+            name = order.lstrip("-")
+            field = self.position_field(queryset, name)
+            try:
+                values.append(field.to_python(raw))
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            names.append(name)
+            fields.append(field)
+            # Test for: (cursor reversed) XOR (field descending)
+            descending = order.startswith("-")
+            operators.append("lt" if reverse != descending else "gt")
+
+        if len(set(operators)) == 1:
+            return RowComparison(
+                [F(name) for name in names],
+                "<" if operators[0] == "lt" else ">",
+                [
+                    Value(value, output_field=field)
+                    for value, field in zip(values, fields)
+                ],
+            )
+
+        condition = Q()
+        for index, (name, operator) in enumerate(zip(names, operators)):
+            ties = dict(zip(names[:index], values))
+            condition |= Q(**ties, **{f"{name}__{operator}": values[index]})
+        return condition
+
+    @staticmethod
+    def position_field(queryset, name):
+        """Return the model field or annotation an ordering refers to."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == "pk":
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            name = order.lstrip("-")
+            if isinstance(instance, dict):
+                value = instance[name]
+            else:
+                value = getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values, separators=(",", ":"))
+
+
+class SearchPagination(KeysetPagination):
+    """Keyset pagination over search results, best matches first."""
+
+    ordering = ("-rank", "-id")
+
+
+class CommentPagination(KeysetPagination):
+    """Keyset pagination over an issue's comments, oldest first."""
+
+    ordering = ("created_at", "id")
@@ -0,0 +1,70 @@
+"""
+Renderers for the tracker APIs.
+"""
+
+import csv
+import datetime
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def _format_value(value):
+    """Format a database value the way the JSON API renders it."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+    return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render newline-delimited JSON, one object per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+    def stream(self, columns, rows):
+        """Yield one encoded line per row tuple."""
+        for row in rows:
+            yield (
+                json.dumps(dict(zip(columns, map(_format_value, row)))) + "\n"
+            ).encode()
+
+
+class _Line:
+    """File-like object that hands back whatever csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    """Render comma-separated values with a header row."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        columns = list(rows[0]) if rows else []
+        return b"".join(
+            self.stream(columns, ([row[c] for c in columns] for row in rows))
+        )
+
+    def stream(self, columns, rows):
+        """Yield the encoded header line and then one line per row tuple."""
+        writer = csv.writer(_Line())
+        yield writer.writerow(columns).encode()
+        for row in rows:
+            yield writer.writerow(map(_format_value, row)).encode()
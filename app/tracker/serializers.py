@@ -2,16 +2,43 @@
 Serializers for the tracker API
 """
 
+from django.conf import settings
+from django.utils import timezone
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 import datetime
 
 from core.models import Comment, Issue, Team, Project, User
-
-
-class IssueSerializer(serializers.ModelSerializer):
+from core.serializers import (
+    CompiledReadMixin,
+    SparseFieldsetMixin,
+    TimedSerializerMixin,
+)
+from tracker import outbox
+from user.authentication import token_cache
+
+
+class IssueSerializer(
+    TimedSerializerMixin,
+    SparseFieldsetMixin,
+    CompiledReadMixin,
+    serializers.ModelSerializer,
+):
     """Serializer for issue objects."""
 
+    read_columns = {
+        "id": "id",
+        "title": "title",
+        "description": "description",
+        "status": "status",
+        "project": "project_id",
+        "team": "team__name",
+        "comment_count": "comment_count",
+        "created_at": "created_at",
+    }
+
     team = serializers.StringRelatedField(
         read_only=True,
         required=False,
@@ -26,9 +53,10 @@ class IssueSerializer(serializers.ModelSerializer):
             "status",
             "project",
             "team",
+            "comment_count",
             "created_at",
         ]
-        read_only_fields = ["id"]
+        read_only_fields = ["id", "comment_count"]
 
     def update(self, instance, validated_data):
         """Update Issue."""
@@ -49,10 +77,142 @@ class IssueDetailSerializer(IssueSerializer):
             "updated_at",
             "assigned_to",
         ]
-        read_only_fields = ["id", "created_at", "updated_at", "created_by"]
+        read_only_fields = [
+            "id",
+            "comment_count",
+            "created_at",
+            "updated_at",
+            "created_by",
+        ]
+
+    def create(self, validated_data):
+        """Create Issue and notify its assignee."""
+        issue = super().create(validated_data)
+        outbox.notify_assigned([(issue.assigned_to, [issue])])
+        return issue
+
+    def update(self, instance, validated_data):
+        """Update Issue and notify a new assignee."""
+        assigned_before = instance.assigned_to_id
+        issue = super().update(instance, validated_data)
+        if issue.assigned_to_id != assigned_before:
+            outbox.notify_assigned([(issue.assigned_to, [issue])])
+        return issue
+
+
+class ContextLookupField(serializers.RelatedField):
+    """Primary key field resolved from a dict of objects in the context.
+
+    Bulk writes load every referenced row in one query up front and pass
+    them in the serializer context, instead of querying once per item.
+    """
+
+    default_error_messages = {
+        "does_not_exist": 'Invalid pk "{pk_value}" - object does not exist.',
+        "incorrect_type": (
+            "Incorrect type. Expected pk value, received {data_type}."
+        ),
+    }
+
+    def __init__(self, lookup, **kwargs):
+        self.lookup = lookup
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        return None
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        obj = self.context[self.lookup].get(pk)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+    def to_representation(self, value):
+        return value.pk
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class BulkIssueSerializer(IssueDetailSerializer):
+    """Serializer validating one item of a bulk issue write."""
+
+    project = ContextLookupField(
+        lookup="projects", required=False, allow_null=True
+    )
+    assigned_to = ContextLookupField(
+        lookup="members", required=False, allow_null=True
+    )
+
+
+class IssueTransitionSerializer(serializers.Serializer):
+    """Serializer for moving a batch of issues to a status or assignee."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+    status = serializers.CharField(max_length=150, required=False)
+    assigned_to = ContextLookupField(
+        lookup="members", required=False, allow_null=True
+    )
+
+    def validate(self, attrs):
+        """Require at least one change to apply."""
+        if "status" not in attrs and "assigned_to" not in attrs:
+            raise serializers.ValidationError(
+                "Provide a status, an assigned_to, or both."
+            )
+        return attrs
+
+
+class IssueStatsQuerySerializer(serializers.Serializer):
+    """Serializer for the issue analytics query parameters."""
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    project = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        """Default to the last 30 days and cap the range length."""
+        end = attrs.setdefault("end", timezone.localdate())
+        start = attrs.setdefault("start", end - datetime.timedelta(days=29))
+        if start > end:
+            raise serializers.ValidationError(
+                {"start": ["Must not be after end."]}
+            )
+        if (end - start).days >= settings.TRACKER_STATS_MAX_DAYS:
+            raise serializers.ValidationError(
+                f"At most {settings.TRACKER_STATS_MAX_DAYS} days can be "
+                "requested at once."
+            )
+        return attrs
+
+
+class IssueChangesQuerySerializer(serializers.Serializer):
+    """Serializer for the issue change feed query parameters."""
+
+    cursor = serializers.CharField(required=False)
+    updated_since = serializers.DateTimeField(required=False)
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=500
+    )
+
+    def validate(self, attrs):
+        """Resume from either a cursor or a timestamp, not both."""
+        if "cursor" in attrs and "updated_since" in attrs:
+            raise serializers.ValidationError(
+                "Provide a cursor or updated_since, not both."
+            )
+        attrs.setdefault("page_size", api_settings.PAGE_SIZE)
+        return attrs
+
+
+class CommentSerializer(
+    TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     """Serializer for comment objects."""
 
     class Meta:
@@ -60,17 +220,30 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "issue",
-            "text",
+            "content",
+            "created_at",
+            "updated_at",
+            "created_by",
+        ]
+        read_only_fields = [
+            "id",
+            "issue",
             "created_at",
             "updated_at",
             "created_by",
         ]
-        read_only_fields = ["id"]
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(
+    TimedSerializerMixin,
+    SparseFieldsetMixin,
+    CompiledReadMixin,
+    serializers.ModelSerializer,
+):
     """Serializer for project objects."""
 
+    read_columns = {"id": "id", "name": "name", "team": "team_id"}
+
     class Meta:
         model = Project
         fields = [
@@ -99,7 +272,9 @@ class ProjectDetailSerializer(ProjectSerializer):
         ]
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(
+    TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     """Serializer for team objects."""
 
     projects = serializers.PrimaryKeyRelatedField(
@@ -124,11 +299,36 @@ class TeamSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id"]
 
+    def lookup_members(self, data):
+        """Return the users for member ids, rejecting unknown ids."""
+        try:
+            ids = serializers.ListField(
+                child=serializers.IntegerField()
+            ).run_validation(data)
+        except serializers.ValidationError as error:
+            raise serializers.ValidationError({"members": error.detail})
+
+        members = list(User.objects.filter(id__in=ids))
+        unknown = sorted(set(ids) - {member.pk for member in members})
+        if unknown:
+            raise serializers.ValidationError(
+                {
+                    "members": [
+                        "Unknown user ids: "
+                        f"{', '.join(map(str, unknown))}."
+                    ]
+                }
+            )
+        return members
+
     def update(self, instance, validated_data):
         """Update Team."""
         if "members" in self.context["request"].data:
-            for member in self.context["request"].data["members"]:
-                instance.members.add(User.objects.get(id=member))
+            members = self.lookup_members(
+                self.context["request"].data["members"]
+            )
+            instance.members.add(*members)
+            token_cache.discard_users(member.pk for member in members)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -0,0 +1,97 @@
+"""
+Signal handlers for the tracker app.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Comment, Issue, Project, Team
+from tracker import changes, events, stats
+from tracker.caching import bump_team_version
+
+
+def invalidate_team(team_id):
+    """Bump the team's cache version now and again once committed.
+
+    The second bump stops a read that ran between the write and the
+    commit from caching the old rows under the new version.
+    """
+    bump_team_version(team_id)
+    transaction.on_commit(lambda: bump_team_version(team_id))
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_team_on_write(sender, instance, **kwargs):
+    """Invalidate cached responses for the team of an issue or project."""
+    invalidate_team(instance.team_id)
+
+
+@receiver(post_save, sender=Team)
+def invalidate_renamed_team(sender, instance, created, **kwargs):
+    """Invalidate cached responses that render the team's name."""
+    if not created:
+        invalidate_team(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_team_on_comment(sender, instance, **kwargs):
+    """Invalidate cached responses for the team of a commented issue."""
+    team_id = (
+        Issue.objects.filter(pk=instance.issue_id)
+        .values_list("team_id", flat=True)
+        .first()
+    )
+    invalidate_team(team_id)
+
+
+@receiver(post_save, sender=Issue)
+def record_issue_saved(sender, instance, created, raw=False, **kwargs):
+    """Update the daily rollups for a created or changed issue."""
+    if not raw:
+        stats.record_issue_saved(instance, created)
+
+
+@receiver(post_delete, sender=Issue)
+def record_issue_deleted(sender, instance, **kwargs):
+    """Update the daily rollups for a deleted issue."""
+    stats.record_issue_deleted(instance)
+
+
+@receiver(post_delete, sender=Issue)
+def record_issue_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone for clients syncing the team's changes."""
+    tombstone = changes.record_deleted(instance)
+    if tombstone is not None:
+        events.publish([events.deleted_event(tombstone)])
+
+
+@receiver(post_save, sender=Issue)
+def publish_issue_saved(sender, instance, created, raw=False, **kwargs):
+    """Push a created or changed issue to the team's live streams."""
+    if not raw:
+        name = events.CREATED if created else events.UPDATED
+        events.publish([events.issue_event(instance, name)])
+
+
+@receiver(post_save, sender=Comment)
+def count_created_comment(sender, instance, created, raw=False, **kwargs):
+    """Increment the comment count of the commented issue."""
+    if created and not raw:
+        Issue.objects.filter(pk=instance.issue_id).update(
+            comment_count=F("comment_count") + 1, updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Decrement the comment count of the commented issue."""
+    Issue.objects.filter(pk=instance.issue_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1, updated_at=timezone.now()
+    )
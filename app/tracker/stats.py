@@ -0,0 +1,297 @@
+"""
+Incremental daily issue rollups for the tracker analytics endpoints.
+
+Every write that creates, deletes, or moves an issue between statuses or
+projects is turned into deltas on `IssueDailyStat` rows, so charts never
+have to scan the issue table.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import Issue, IssueDailyStat
+
+KEY_FIELDS = ("team_id", "project_id", "status")
+
+
+def _add(deltas, key, day, created=0, entered=0, exited=0):
+    """Add counter deltas for an issue key on a day."""
+    team_id, project_id, status = key
+    if team_id is None:
+        return
+
+    counts = deltas.setdefault((team_id, project_id, day, status), [0, 0, 0])
+    counts[0] += created
+    counts[1] += entered
+    counts[2] += exited
+
+
+def _lock_order(key):
+    team_id, project_id, day, status = key
+    return team_id, project_id or 0, day, status
+
+
+UPSERT_SQL = """
+INSERT INTO {table} AS stat
+    (team_id, project_id, day, status, created, entered, exited)
+VALUES {values}
+ON CONFLICT {target} DO UPDATE SET
+    created = stat.created + EXCLUDED.created,
+    entered = stat.entered + EXCLUDED.entered,
+    exited = stat.exited + EXCLUDED.exited
+"""
+
+# Conflict targets matching the two unique constraints of IssueDailyStat.
+UPSERT_TARGETS = {
+    True: "(team_id, project_id, day, status)",
+    False: "(team_id, day, status) WHERE project_id IS NULL",
+}
+
+
+def _upsert(rows):
+    """Add (key, counts) rows to the rollups in one statement per target."""
+    for has_project, target in UPSERT_TARGETS.items():
+        params = [
+            value
+            for key, counts in rows
+            if (key[1] is not None) == has_project
+            for value in (*key, *counts)
+        ]
+        if not params:
+            continue
+
+        row_sql = "(%s, %s, %s, %s, %s, %s, %s)"
+        values = ", ".join([row_sql] * (len(params) // 7))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                UPSERT_SQL.format(
+                    table=IssueDailyStat._meta.db_table,
+                    values=values,
+                    target=target,
+                ),
+                params,
+            )
+
+
+def _update_or_create(rows):
+    """Add (key, counts) rows to the rollups on any database backend."""
+    for (team_id, project_id, day, status), counts in rows:
+        created, entered, exited = counts
+        lookup = {
+            "team_id": team_id,
+            "project_id": project_id,
+            "day": day,
+            "status": status,
+        }
+        changes = {
+            "created": F("created") + created,
+            "entered": F("entered") + entered,
+            "exited": F("exited") + exited,
+        }
+        if IssueDailyStat.objects.filter(**lookup).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                IssueDailyStat.objects.create(
+                    created=created, entered=entered, exited=exited, **lookup
+                )
+        except IntegrityError:
+            IssueDailyStat.objects.filter(**lookup).update(**changes)
+
+
+def apply_deltas(deltas):
+    """Add the deltas to the rollup rows, creating rows as needed."""
+    # A stable order keeps concurrent writers from deadlocking.
+    rows = [
+        (key, deltas[key])
+        for key in sorted(deltas, key=_lock_order)
+        if any(deltas[key])
+    ]
+    if not rows:
+        return
+
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            _upsert(rows)
+        else:
+            _update_or_create(rows)
+
+
+def record_issue_saved(issue, created):
+    """Record the creation of an issue or a change of its status."""
+    current = tuple(getattr(issue, name) for name in KEY_FIELDS)
+    loaded = getattr(issue, "_loaded_values", None)
+    deltas = {}
+
+    if created:
+        _add(
+            deltas,
+            current,
+            timezone.localdate(issue.created_at),
+            created=1,
+            entered=1,
+        )
+    elif loaded is not None:
+        before = tuple(
+            loaded.get(name, value) for name, value in zip(KEY_FIELDS, current)
+        )
+        if before != current:
+            day = timezone.localdate(issue.updated_at or timezone.now())
+            _add(deltas, before, day, exited=1)
+            _add(deltas, current, day, entered=1)
+
+    # Later saves of the same instance compare against what is now stored.
+    issue._loaded_values = {**(loaded or {}), **dict(zip(KEY_FIELDS, current))}
+    apply_deltas(deltas)
+
+
+def record_issue_deleted(issue):
+    """Record an issue leaving its status because it was deleted."""
+    deltas = {}
+    _add(
+        deltas,
+        tuple(getattr(issue, name) for name in KEY_FIELDS),
+        timezone.localdate(),
+        exited=1,
+    )
+    apply_deltas(deltas)
+
+
+def record_issues_created(issues):
+    """Record issues inserted without signals, e.g. by bulk_create()."""
+    deltas = {}
+    for issue in issues:
+        _add(
+            deltas,
+            tuple(getattr(issue, name) for name in KEY_FIELDS),
+            timezone.localdate(issue.created_at),
+            created=1,
+            entered=1,
+        )
+    apply_deltas(deltas)
+
+
+def record_issues_updated(rows, changes, when):
+    """Record a queryset update() applying changes to the given rows.
+
+    `rows` are (team_id, project_id, status) tuples read before the
+    update.
+    """
+    deltas = {}
+    day = timezone.localdate(when)
+    for before in rows:
+        team_id, project_id, status = before
+        if "project" in changes:
+            project_id = getattr(changes["project"], "pk", changes["project"])
+        after = (team_id, project_id, changes.get("status", status))
+        if after != before:
+            _add(deltas, before, day, exited=1)
+            _add(deltas, after, day, entered=1)
+    apply_deltas(deltas)
+
+
+def rebuild_rollups(team_ids=None):
+    """Rebuild the rollups from the current issues and return the row count.
+
+    Status history is not stored, so every issue is taken to have been
+    opened in the default status on its creation day and, when its status
+    is different now, to have moved to it on the day it was last updated.
+    """
+    default_status = Issue._meta.get_field("status").default
+    issues = Issue.objects.exclude(team=None)
+    if team_ids is not None:
+        issues = issues.filter(team_id__in=team_ids)
+
+    deltas = {}
+    opened = issues.values(
+        "team_id", "project_id", day=TruncDate("created_at")
+    ).annotate(count=Count("id"))
+    for row in opened.order_by():
+        count = row["count"]
+        key = (row["team_id"], row["project_id"], default_status)
+        _add(deltas, key, row["day"], created=count, entered=count)
+
+    moved = (
+        issues.exclude(status=default_status)
+        .values(
+            "team_id", "project_id", "status", day=TruncDate("updated_at")
+        )
+        .annotate(count=Count("id"))
+    )
+    for row in moved.order_by():
+        count, day = row["count"], row["day"]
+        team_id, project_id = row["team_id"], row["project_id"]
+        _add(deltas, (team_id, project_id, default_status), day, exited=count)
+        _add(deltas, (team_id, project_id, row["status"]), day, entered=count)
+
+    with transaction.atomic():
+        stats = IssueDailyStat.objects.all()
+        if team_ids is not None:
+            stats = stats.filter(team_id__in=team_ids)
+        stats.delete()
+        IssueDailyStat.objects.bulk_create(
+            (
+                IssueDailyStat(
+                    team_id=key[0],
+                    project_id=key[1],
+                    day=key[2],
+                    status=key[3],
+                    created=counts[0],
+                    entered=counts[1],
+                    exited=counts[2],
+                )
+                for key, counts in deltas.items()
+            ),
+            batch_size=5000,
+        )
+
+    return len(deltas)
+
+
+def daily_series(team_id, start, end, project_id=None):
+    """Return opened, closed and backlog counts for each day in a range.
+
+    Backlog is the number of issues in a status other than
+    `TRACKER_CLOSED_STATUSES` at the end of the day.
+    """
+    closed = Q(status__in=settings.TRACKER_CLOSED_STATUSES)
+    stats = IssueDailyStat.objects.filter(team_id=team_id)
+    if project_id is not None:
+        stats = stats.filter(project_id=project_id)
+
+    backlog = (
+        stats.filter(day__lt=start)
+        .exclude(closed)
+        .aggregate(net=Sum(F("entered") - F("exited")))["net"]
+        or 0
+    )
+    rows = {
+        row["day"]: row
+        for row in stats.filter(day__range=(start, end))
+        .values("day")
+        .annotate(
+            opened=Sum("created"),
+            closed=Sum("entered", filter=closed),
+            net=Sum(F("entered") - F("exited"), filter=~closed),
+        )
+    }
+
+    series = []
+    for offset in range((end - start).days + 1):
+        day = start + datetime.timedelta(days=offset)
+        row = rows.get(day, {})
+        backlog += row.get("net") or 0
+        series.append(
+            {
+                "day": day.isoformat(),
+                "opened": row.get("opened") or 0,
+                "closed": row.get("closed") or 0,
+                "backlog": backlog,
+            }
+        )
+    return series
@@ -0,0 +1,247 @@
+"""
+Server-Sent Events endpoint streaming a team's issue events.
+
+The endpoint is a plain ASGI app mounted next to Django in `app.asgi`:
+an idle stream is one coroutine waiting on its queue, so a process holds
+thousands of them without a thread or a database connection each. The
+database is only used, in the async view pool, to authenticate and to
+replay what a resuming client missed.
+
+Every event's id is a change feed cursor. A client resuming with
+Last-Event-ID (or `last_event_id` for the first connection) is replayed
+the changes after it before the live events.
+"""
+
+import asyncio
+import datetime
+import json
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.utils import timezone
+
+from rest_framework import exceptions
+
+from core.async_views import blocking
+from core.models import Issue, IssueTombstone
+from tracker import changes, events
+from user.authentication import ExpiringTokenAuthentication
+
+REPLAY_PAGE_SIZE = 500
+
+
+class Position:
+    """The change feed positions of the events sent to a client."""
+
+    def __init__(self, issues, tombstones):
+        self.issues = issues
+        self.tombstones = tombstones
+
+    def advance(self, event):
+        """Move past an event; positions never move backwards."""
+        moment, pk = event["position"]
+        position = (datetime.datetime.fromisoformat(moment), pk)
+        if event["event"] == events.DELETED:
+            self.tombstones = max(self.tombstones, position)
+        else:
+            self.issues = max(self.issues, position)
+
+    @property
+    def cursor(self):
+        return changes.encode_cursor(self.issues, self.tombstones)
+
+
+@blocking
+def authenticate(key):
+    """Return the user of a token."""
+    user, _ = ExpiringTokenAuthentication().authenticate_credentials(key)
+    return user
+
+
+@blocking
+def replay_page(team_id, positions, until):
+    """Return the events of the next change feed page and its positions."""
+    changed, deleted, cursor, has_more = changes.next_page(
+        Issue.objects.filter(team_id=team_id),
+        team_id,
+        positions,
+        REPLAY_PAGE_SIZE,
+        until=until,
+    )
+    replayed = [events.issue_event(issue) for issue in changed] + [
+        events.deleted_event(
+            IssueTombstone(
+                pk=tombstone_id,
+                team_id=team_id,
+                issue_id=issue_id,
+                deleted_at=deleted_at,
+            )
+        )
+        for deleted_at, tombstone_id, issue_id in deleted
+    ]
+    return replayed, changes.decode_cursor(cursor), has_more
+
+
+def resume_positions(cursor):
+    """Return the positions to replay from for a Last-Event-ID.
+
+    Replays start a settle window early: a write committed after a
+    later-stamped one was sent live may be missing from the client.
+    Resending those few seconds of changes is harmless.
+    """
+    settle = datetime.timedelta(
+        seconds=settings.TRACKER_CHANGES_SETTLE_SECONDS
+    )
+    return tuple(
+        (moment - settle, 0) for moment, _ in changes.decode_cursor(cursor)
+    )
+
+
+def format_event(event, cursor):
+    """Return the Server-Sent Events frame of an event."""
+    return (
+        f"id: {cursor}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event['data'])}\n\n"
+    ).encode()
+
+
+def parse_request(scope):
+    """Return the token and Last-Event-ID of a stream request."""
+    headers = {
+        name.decode("latin-1").lower(): value.decode("latin-1")
+        for name, value in scope["headers"]
+    }
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+
+    token = query.get("token", [None])[0]
+    keyword, _, key = headers.get("authorization", "").partition(" ")
+    if keyword.lower() == "token" and key:
+        token = key.strip()
+    last_event_id = headers.get(
+        "last-event-id", query.get("last_event_id", [None])[0]
+    )
+    return token, last_event_id, headers.get("origin")
+
+
+def cors_headers(origin):
+    """Return the CORS headers allowing a whitelisted origin."""
+    if origin is None or origin not in settings.CORS_ORIGIN_WHITELIST:
+        return []
+    return [
+        (b"access-control-allow-origin", origin.encode("latin-1")),
+        (b"access-control-allow-credentials", b"true"),
+        (b"vary", b"Origin"),
+    ]
+
+
+async def send_error(send, exc, extra_headers):
+    """Send an API exception as a JSON error response."""
+    body = json.dumps({"detail": str(exc.detail)}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": exc.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *extra_headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_body(send, body, more=True):
+    """Send a chunk of the response body."""
+    await send({"type": "http.response.body", "body": body, "more_body": more})
+
+
+async def watch_disconnect(receive, stream):
+    """Close the stream once the client disconnects."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            stream.close()
+            return
+
+
+async def replay(send, stream, team_id, last_event_id):
+    """Send the changes after a Last-Event-ID; returns the new position."""
+    positions = resume_positions(last_event_id)
+    position = Position(*positions)
+    until = timezone.now()
+    has_more = True
+    while has_more and not stream.closed:
+        replayed, positions, has_more = await replay_page(
+            team_id, positions, until
+        )
+        body = b""
+        for event in replayed:
+            position.advance(event)
+            body += format_event(event, position.cursor)
+        await send_body(send, body)
+    return Position(*positions)
+
+
+async def issue_events(scope, receive, send):
+    """Stream the issue events of the authenticated user's team."""
+    token, last_event_id, origin = parse_request(scope)
+    extra_headers = cors_headers(origin)
+    try:
+        if scope["method"] != "GET":
+            raise exceptions.MethodNotAllowed(scope["method"])
+        if token is None:
+            raise exceptions.NotAuthenticated()
+        user = await authenticate(token)
+        if user.team_id is None:
+            raise exceptions.PermissionDenied("You are not in a team.")
+        if last_event_id:
+            changes.check_history(resume_positions(last_event_id)[1])
+    except exceptions.APIException as exc:
+        return await send_error(send, exc, extra_headers)
+
+    # Subscribing before the replay means nothing committed in between
+    # is missed; it may be sent twice, which clients apply as upserts.
+    stream = await events.broker.subscribe(user.team_id)
+    watcher = asyncio.ensure_future(watch_disconnect(receive, stream))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                    *extra_headers,
+                ],
+            }
+        )
+        if last_event_id:
+            position = await replay(send, stream, user.team_id, last_event_id)
+        else:
+            now = timezone.now()
+            position = Position((now, 0), (now, 0))
+
+        # Tells the client how soon to reconnect, and gives it a cursor
+        # to resume from before any event arrives.
+        await send_body(
+            send,
+            f"retry: {settings.TRACKER_EVENTS_RETRY_MS}\n"
+            f"id: {position.cursor}\n\n".encode(),
+        )
+        heartbeat = settings.TRACKER_EVENTS_HEARTBEAT_SECONDS
+        while True:
+            event = await stream.get(heartbeat)
+            if stream.closed:
+                break
+            if event is None:
+                await send_body(send, b": ping\n\n")
+            else:
+                position.advance(event)
+                await send_body(send, format_event(event, position.cursor))
+        await send_body(send, b"", more=False)
+    finally:
+        watcher.cancel()
+        events.broker.unsubscribe(stream)
@@ -0,0 +1,248 @@
+"""
+Test the bulk issue API.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Issue, Project, Team
+from tracker import stats
+
+BULK_URL = reverse("tracker:issue-bulk")
+TRANSITION_URL = reverse("tracker:issue-bulk-transition")
+
+
+def create_user(email="user@example.com", password="testpass123", **params):
+    """Create and return a sample user."""
+    return get_user_model().objects.create_user(
+        email=email, password=password, **params
+    )
+
+
+class TeamlessBulkIssueAPITests(TestCase):
+    """Test users without a team cannot write issues in bulk."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.orphan = Issue.objects.create(title="Orphan")
+        self.client.force_authenticate(self.user)
+
+    def assertRefused(self, res):
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            list(Issue.objects.values_list("title", "status")),
+            [("Orphan", "Open")],
+        )
+
+    def test_bulk_create_refused(self):
+        """Test no team-less issues are created."""
+        res = self.client.post(BULK_URL, [{"title": "New"}], format="json")
+
+        self.assertRefused(res)
+
+    def test_bulk_update_refused(self):
+        """Test team-less issues are not rewritten."""
+        res = self.client.patch(
+            BULK_URL,
+            [{"id": self.orphan.id, "status": "Closed"}],
+            format="json",
+        )
+
+        self.assertRefused(res)
+
+    def test_bulk_transition_refused(self):
+        """Test team-less issues are not transitioned."""
+        res = self.client.post(
+            TRANSITION_URL,
+            {"ids": [self.orphan.id], "status": "Closed"},
+            format="json",
+        )
+
+        self.assertRefused(res)
+
+
+class BulkIssueAPITests(TestCase):
+    """Test creating and updating issues in batches."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(team=self.team)
+        self.project = Project.objects.create(team=self.team, name="Project")
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_issues(self):
+        """Test creating a batch of issues in one request."""
+        payload = [
+            {"title": f"Issue {n}", "project": self.project.id}
+            for n in range(3)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        ids = [result["id"] for result in res.data]
+        issues = Issue.objects.filter(id__in=ids)
+        self.assertEqual(issues.count(), 3)
+        for issue in issues:
+            self.assertEqual(issue.team, self.team)
+            self.assertEqual(issue.created_by, self.user)
+            self.assertEqual(issue.project, self.project)
+
+    def test_bulk_create_query_count_is_constant(self):
+        """Test a bigger batch does not run more queries."""
+        payload = [{"title": "Issue", "project": self.project.id}]
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(BULK_URL, payload, format="json")
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(BULK_URL, payload * 20, format="json")
+
+        self.assertEqual(Issue.objects.count(), 21)
+        self.assertEqual(len(few), len(many))
+
+    def test_bulk_create_reports_invalid_items(self):
+        """Test invalid items are reported and valid ones still created."""
+        other_team = Team.objects.create(name="Other Team")
+        foreign = Project.objects.create(team=other_team, name="Foreign")
+        payload = [
+            {"title": "Valid"},
+            {"description": "No title"},
+            {"title": "Foreign project", "project": foreign.id},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r["status"] for r in res.data], [201, 400, 400])
+        self.assertIn("title", res.data[1]["errors"])
+        self.assertIn("project", res.data[2]["errors"])
+        self.assertEqual(Issue.objects.count(), 1)
+
+    @override_settings(TRACKER_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limits_batch_size(self):
+        """Test batches above the configured limit are rejected."""
+        payload = [{"title": "Issue"}] * 3
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Issue.objects.exists())
+
+    def test_bulk_update_issues(self):
+        """Test updating a batch of issues with per-item changes."""
+        first = Issue.objects.create(title="First", team=self.team)
+        second = Issue.objects.create(title="Second", team=self.team)
+        other_team = Team.objects.create(name="Other Team")
+        foreign = Issue.objects.create(title="Foreign", team=other_team)
+        payload = [
+            {"id": first.id, "status": "Closed"},
+            {"id": second.id, "title": "Renamed"},
+            {"id": foreign.id, "status": "Closed"},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r["status"] for r in res.data], [200, 200, 404])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        foreign.refresh_from_db()
+        self.assertEqual(first.status, "Closed")
+        self.assertEqual(second.title, "Renamed")
+        self.assertEqual(foreign.status, "Open")
+
+    def test_bulk_transition_issues(self):
+        """Test moving issues to a status and assignee in one update."""
+        assignee = create_user(email="assignee@example.com", team=self.team)
+        issues = [
+            Issue.objects.create(title=f"Issue {n}", team=self.team)
+            for n in range(3)
+        ]
+        ids = [issue.id for issue in issues] + [0]
+        payload = {"ids": ids, "status": "Closed", "assigned_to": assignee.id}
+
+        res = self.client.post(TRANSITION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r["status"] for r in res.data], [200, 200, 200, 404])
+        closed = Issue.objects.filter(status="Closed", assigned_to=assignee)
+        self.assertEqual(closed.count(), 3)
+
+    def test_bulk_transition_requires_a_change(self):
+        """Test a transition without status or assignee is rejected."""
+        issue = Issue.objects.create(title="Issue", team=self.team)
+
+        res = self.client.post(
+            TRANSITION_URL, {"ids": [issue.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkStampTests(TransactionTestCase):
+    """Test bulk writes are stamped close to their commit."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(team=self.team)
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+        self.client.force_authenticate(self.user)
+
+    def transition(self):
+        return self.client.post(
+            TRANSITION_URL,
+            {"ids": [self.issue.id], "status": "Closed"},
+            format="json",
+        )
+
+    def test_stamped_after_lock_wait(self):
+        """Test time spent waiting for row locks does not age the stamp."""
+        locked, released = threading.Event(), {}
+
+        def other_writer():
+            with transaction.atomic():
+                issues = Issue.objects.filter(id=self.issue.id)
+                list(issues.select_for_update())
+                locked.set()
+                time.sleep(0.3)
+                released["at"] = timezone.now()
+            connections.close_all()
+
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        locked.wait(5)
+        res = self.transition()
+        thread.join()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.issue.refresh_from_db()
+        self.assertGreaterEqual(self.issue.updated_at, released["at"])
+
+    @override_settings(TRACKER_CHANGES_SETTLE_SECONDS=0.05)
+    def test_write_outlasting_settle_window_rolled_back(self):
+        """Test a write that would commit after the window is refused."""
+        record = stats.record_issues_updated
+
+        def slow_record(*args):
+            time.sleep(0.1)
+            return record(*args)
+
+        with patch("tracker.stats.record_issues_updated", slow_record):
+            res = self.transition()
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.status, "Open")
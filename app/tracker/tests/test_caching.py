@@ -0,0 +1,183 @@
+"""
+Test the team-versioned response cache.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Comment, Issue, Project, Team
+from core.testing import shared_caches
+from tracker import caching
+from tracker.caching import bump_team_version, get_cache, get_team_version
+
+ISSUES_URL = reverse("tracker:issue-list")
+PROJECTS_URL = reverse("tracker:project-list")
+
+
+def create_user(email="user@example.com", password="testpass123", **params):
+    """Create and return a sample user."""
+    return get_user_model().objects.create_user(
+        email=email, password=password, **params
+    )
+
+
+@override_settings(CACHES=shared_caches())
+class TeamVersionTests(TestCase):
+    """Test the per-team version counter."""
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_bump_changes_version(self):
+        """Test bumping a team changes only that team's version."""
+        before = get_team_version(1)
+        other = get_team_version(2)
+
+        bump_team_version(1)
+
+        self.assertNotEqual(get_team_version(1), before)
+        self.assertEqual(get_team_version(2), other)
+
+    def test_evicted_version_not_reused(self):
+        """Test a team version lost from the cache is never handed out."""
+        before = get_team_version(1)
+        get_cache().clear()
+
+        self.assertGreater(get_team_version(1), before)
+
+
+@override_settings(CACHES=shared_caches())
+class CachedTrackerResponseTests(TestCase):
+    """Test caching tracker list and detail responses."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(team=self.team)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+
+    def test_repeat_list_served_from_cache(self):
+        """Test an unchanged issue list is served without queries."""
+        first = self.client.get(ISSUES_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(ISSUES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_not_modified(self):
+        """Test a matching ETag is answered with a 304."""
+        res = self.client.get(ISSUES_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ISSUES_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_write_invalidates_cached_list(self):
+        """Test creating an issue changes the ETag and the data."""
+        before = self.client.get(ISSUES_URL)
+
+        Issue.objects.create(title="Another", team=self.team)
+        res = self.client.get(ISSUES_URL, HTTP_IF_NONE_MATCH=before["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], before["ETag"])
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_comment_invalidates_issue_detail(self):
+        """Test commenting on an issue invalidates the team's cache."""
+        url = reverse("tracker:issue-detail", args=[self.issue.id])
+        before = self.client.get(url)
+
+        Comment.objects.create(issue=self.issue, content="Comment")
+        res = self.client.get(url)
+
+        self.assertNotEqual(res["ETag"], before["ETag"])
+
+    def test_query_params_cached_separately(self):
+        """Test different query strings get different cache entries."""
+        Project.objects.create(team=self.team, name="First")
+        Project.objects.create(team=self.team, name="Second")
+
+        full = self.client.get(PROJECTS_URL)
+        page = self.client.get(PROJECTS_URL, {"page_size": 1})
+
+        self.assertEqual(len(full.data["results"]), 2)
+        self.assertEqual(len(page.data["results"]), 1)
+        self.assertNotEqual(full["ETag"], page["ETag"])
+
+    def test_teams_cached_separately(self):
+        """Test one team's cached list is never served to another."""
+        self.client.get(ISSUES_URL)
+        other_team = Team.objects.create(name="Other Team")
+        other_user = create_user(email="other@example.com", team=other_team)
+        self.client.force_authenticate(other_user)
+
+        res = self.client.get(ISSUES_URL)
+
+        self.assertEqual(res.data["results"], [])
+
+
+class WorkerCacheTests(TestCase):
+    """Test writes invalidate the responses every worker serves.
+
+    Each worker process builds its own cache instance, so a write is
+    handled through one instance and the reads through another.
+    """
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(team=self.team)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+        self.url = reverse("tracker:issue-detail", args=[self.issue.id])
+
+    def read_write_read(self, reader, writer):
+        """Read the issue, rename it in another worker and read it again."""
+        with patch.object(caching, "get_cache", return_value=reader):
+            before = self.client.get(self.url)
+        with patch.object(caching, "get_cache", return_value=writer):
+            self.client.patch(self.url, {"title": "Renamed"})
+        with patch.object(caching, "get_cache", return_value=reader):
+            after = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=before.get("ETag", "*")
+            )
+        return before, after
+
+    @override_settings(CACHES=shared_caches())
+    def test_write_in_other_worker_invalidates_shared_cache(self):
+        """Test a write through one instance reaches another's reads."""
+        caches["default"].clear()
+        reader = caches.create_connection("default")
+        writer = caches.create_connection("default")
+
+        before, after = self.read_write_read(reader, writer)
+
+        self.assertIn("ETag", before)
+        self.assertEqual(after.status_code, status.HTTP_200_OK)
+        self.assertEqual(after.data["title"], "Renamed")
+
+    def test_per_process_cache_not_used(self):
+        """Test a per-process cache serves neither cached data nor 304s."""
+        reader = caches.create_connection("default")
+        writer = caches.create_connection("default")
+
+        before, after = self.read_write_read(reader, writer)
+
+        self.assertNotIn("ETag", before)
+        self.assertEqual(after.status_code, status.HTTP_200_OK)
+        self.assertEqual(after.data["title"], "Renamed")
@@ -0,0 +1,131 @@
+"""
+Test the issue comments API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Comment, Issue, Team
+
+ISSUES_URL = reverse("tracker:issue-list")
+
+
+def comments_url(issue_id):
+    """Return the comment list URL of an issue."""
+    return reverse("tracker:issue-comment-list", args=[issue_id])
+
+
+def comment_url(issue_id, comment_id):
+    """Return a comment detail URL."""
+    return reverse("tracker:issue-comment-detail", args=[issue_id, comment_id])
+
+
+class PublicCommentAPITests(TestCase):
+    """Test the publically available comment API."""
+
+    def test_login_required(self):
+        """Test that login is required for retrieving comments."""
+        res = APIClient().get(comments_url(1))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateCommentAPITests(TestCase):
+    """Test the private comment API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+        self.client.force_authenticate(self.user)
+
+    def test_create_comment(self):
+        """Test creating a comment on an issue."""
+        res = self.client.post(
+            comments_url(self.issue.id), {"content": "First!"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        comment = Comment.objects.get(id=res.data["id"])
+        self.assertEqual(comment.content, "First!")
+        self.assertEqual(comment.issue, self.issue)
+        self.assertEqual(comment.created_by, self.user)
+        self.assertEqual(str(comment), "First!")
+
+    def test_list_comments_oldest_first_by_cursor(self):
+        """Test comments are paged oldest first with a cursor."""
+        comments = [
+            Comment.objects.create(issue=self.issue, content=f"Comment {n}")
+            for n in range(3)
+        ]
+        other = Issue.objects.create(title="Other", team=self.team)
+        Comment.objects.create(issue=other, content="Elsewhere")
+
+        res = self.client.get(comments_url(self.issue.id), {"page_size": 2})
+        next_res = self.client.get(res.data["next"])
+
+        ids = [c["id"] for c in res.data["results"] + next_res.data["results"]]
+        self.assertEqual(ids, [comment.id for comment in comments])
+        self.assertIsNone(next_res.data["next"])
+
+    def test_list_comments_query_count_is_constant(self):
+        """Test listing comments does not run a query per comment."""
+        Comment.objects.create(issue=self.issue, content="One")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(comments_url(self.issue.id))
+
+        for n in range(5):
+            Comment.objects.create(issue=self.issue, content=f"{n}")
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(comments_url(self.issue.id))
+
+        self.assertEqual(len(res.data["results"]), 6)
+        self.assertEqual(len(few), len(many))
+
+    def test_other_team_issue_not_found(self):
+        """Test comments on another team's issue cannot be reached."""
+        other_team = Team.objects.create(name="Other Team")
+        issue = Issue.objects.create(title="Other", team=other_team)
+
+        res = self.client.get(comments_url(issue.id))
+        post = self.client.post(comments_url(issue.id), {"content": "Hi"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(post.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_comment_count_follows_comments(self):
+        """Test creating and deleting comments updates comment_count."""
+        for content in ["One", "Two"]:
+            res = self.client.post(
+                comments_url(self.issue.id), {"content": content}
+            )
+        self.client.delete(comment_url(self.issue.id, res.data["id"]))
+
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.comment_count, 1)
+        listed = self.client.get(ISSUES_URL).data["results"][0]
+        self.assertEqual(listed["comment_count"], 1)
+
+    def test_update_comment(self):
+        """Test editing a comment's content."""
+        comment = Comment.objects.create(issue=self.issue, content="Typo")
+
+        res = self.client.patch(
+            comment_url(self.issue.id, comment.id), {"content": "Fixed"}
+        )
+
+        comment.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(comment.content, "Fixed")
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.comment_count, 1)
@@ -0,0 +1,143 @@
+"""
+Test the issue export API.
+"""
+
+import asyncio
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from app.asgi import application
+from core.models import AuthToken, Issue, Team
+
+EXPORT_URL = reverse("tracker:issue-export")
+
+
+def create_user(email="user@example.com", password="testpass123", **params):
+    """Create and return a sample user."""
+    return get_user_model().objects.create_user(
+        email=email, password=password, **params
+    )
+
+
+class PublicExportAPITests(TestCase):
+    """Test the export API without authentication."""
+
+    def test_login_required(self):
+        """Test that login is required for exporting issues."""
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateExportAPITests(TestCase):
+    """Test exporting a team's issues."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(team=self.team)
+        self.client.force_authenticate(self.user)
+        self.issues = [
+            Issue.objects.create(title=f"Issue, {n}", team=self.team)
+            for n in range(3)
+        ]
+        other_team = Team.objects.create(name="Other Team")
+        Issue.objects.create(title="Foreign", team=other_team)
+
+    def test_export_ndjson(self):
+        """Test issues stream as one JSON object per line by default."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertTrue(res["Content-Type"].startswith("application/x-ndjson"))
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [row["id"] for row in rows], [issue.id for issue in self.issues]
+        )
+        self.assertEqual(rows[0]["title"], "Issue, 0")
+        self.assertTrue(rows[0]["created_at"].endswith("Z"))
+
+    def test_export_csv(self):
+        """Test issues stream as CSV with a header row."""
+        res = self.client.get(EXPORT_URL, {"format": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("issues.csv", res["Content-Disposition"])
+        content = b"".join(res.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["title"], "Issue, 1")
+
+    def test_export_unknown_format(self):
+        """Test an unsupported format is rejected."""
+        res = self.client.get(EXPORT_URL, {"format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(ROOT_URLCONF="app.urls_asgi")
+class ASGIExportTests(TransactionTestCase):
+    """Test exports stream under the ASGI application.
+
+    The rows are read on their own thread and connection, so they must
+    be committed for it to see them.
+    """
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Sample Team")
+        user = create_user(team=self.team)
+        self.token = AuthToken.objects.create(user=user)
+        self.issues = [
+            Issue.objects.create(title=f"Issue {n}", team=self.team)
+            for n in range(3)
+        ]
+
+    def get(self, path):
+        """Send a GET through the ASGI application; returns its messages."""
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "query_string": b"",
+            "server": ("testserver", 80),
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {self.token.key}".encode()),
+            ],
+        }
+        asyncio.run(application(scope, receive, send))
+        return sent
+
+    def test_export_streams_rows(self):
+        """Test every row is read and sent, then the body is closed."""
+        start, *body = self.get(EXPORT_URL)
+
+        self.assertEqual(start["status"], status.HTTP_200_OK)
+        self.assertFalse(body[-1].get("more_body", False))
+        content = b"".join(message.get("body", b"") for message in body)
+        lines = content.splitlines()
+        self.assertEqual(
+            [json.loads(line)["id"] for line in lines],
+            [issue.id for issue in self.issues],
+        )
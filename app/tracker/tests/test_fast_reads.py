@@ -0,0 +1,101 @@
+"""
+Test the compiled read path of the tracker list endpoints.
+"""
+
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core.models import Issue, Project, Team
+from tracker.caching import get_cache
+from tracker.serializers import IssueDetailSerializer, IssueSerializer
+
+ISSUES_URL = reverse("tracker:issue-list")
+PROJECTS_URL = reverse("tracker:project-list")
+
+
+class FastReadTests(TestCase):
+    """Test fast and regular list responses are identical."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        project = Project.objects.create(team=self.team, name="Sample")
+        Project.objects.create(team=self.team, name="Other")
+        created = timezone.make_aware(datetime.datetime(2024, 1, 2, 3, 4, 5))
+        for n in range(5):
+            issue = Issue.objects.create(
+                title=f"Issue {n}",
+                description="Ünïcode" if n % 2 else "",
+                status="Open",
+                project=project if n % 2 else None,
+                team=self.team,
+                created_by=self.user,
+            )
+        Issue.objects.filter(id=issue.id).update(created_at=created)
+        self.client.force_authenticate(self.user)
+
+    def get_both(self, url, params=None):
+        """Return the regular and the fast response bodies for a request."""
+        bodies = []
+        for fast in (False, True):
+            get_cache().clear()
+            with override_settings(TRACKER_FAST_READS=fast):
+                res = self.client.get(url, params)
+            self.assertEqual(res.status_code, 200)
+            bodies.append(res.content)
+        return bodies
+
+    def test_issue_list_is_identical(self):
+        """Test the issue list renders the same bytes on both paths."""
+        regular, fast = self.get_both(ISSUES_URL)
+
+        self.assertEqual(regular, fast)
+
+    def test_issue_list_pages_are_identical(self):
+        """Test cursors from both paths point at the same pages."""
+        params = {"ordering": "created_at", "page_size": 2}
+        regular, fast = self.get_both(ISSUES_URL, params)
+        self.assertEqual(regular, fast)
+
+        with override_settings(TRACKER_FAST_READS=True):
+            next_url = self.client.get(ISSUES_URL, params).data["next"]
+        regular, fast = self.get_both(next_url)
+        self.assertEqual(regular, fast)
+
+    def test_sparse_issue_list_is_identical(self):
+        """Test sparse fieldsets render the same on both paths."""
+        regular, fast = self.get_both(ISSUES_URL, {"fields": "id,created_at"})
+
+        self.assertEqual(regular, fast)
+
+    def test_project_list_is_identical(self):
+        """Test the project list renders the same bytes on both paths."""
+        regular, fast = self.get_both(PROJECTS_URL)
+
+        self.assertEqual(regular, fast)
+
+    def test_fast_list_skips_model_instances(self):
+        """Test the fast path builds no Issue instances."""
+        with patch.object(Issue, "from_db", wraps=Issue.from_db) as from_db:
+            with override_settings(TRACKER_FAST_READS=True):
+                self.client.get(ISSUES_URL)
+
+        from_db.assert_not_called()
+
+    def test_uncompiled_serializers_are_detected(self):
+        """Test serializers with unmapped fields report no lookups."""
+        self.assertIsNone(IssueDetailSerializer().read_lookups())
+        self.assertEqual(
+            IssueSerializer().read_lookups(),
+            list(IssueSerializer.read_columns.values()),
+        )
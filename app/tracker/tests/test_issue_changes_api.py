@@ -0,0 +1,182 @@
+"""
+Test the issue change feed API.
+"""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Comment, Issue, IssueTombstone, Team
+from tracker import changes
+
+CHANGES_URL = reverse("tracker:issue-changes")
+
+
+def detail_url(issue_id):
+    """Return issue detail URL."""
+    return reverse("tracker:issue-detail", args=[issue_id])
+
+
+class PublicIssueChangesAPITests(TestCase):
+    """Test the publically available change feed API."""
+
+    def test_login_required(self):
+        """Test that login is required for the change feed."""
+        res = APIClient().get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(TRACKER_CHANGES_SETTLE_SECONDS=0)
+class PrivateIssueChangesAPITests(TestCase):
+    """Test the private change feed API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.client.force_authenticate(self.user)
+        self.issues = [
+            Issue.objects.create(title=f"Issue {n}", team=self.team)
+            for n in range(3)
+        ]
+        other = Team.objects.create(name="Other Team")
+        Issue.objects.create(title="Elsewhere", team=other)
+
+    def sync(self, **params):
+        """Page through the feed and return (ids, deleted ids, cursor)."""
+        ids, deleted = [], []
+        while True:
+            res = self.client.get(CHANGES_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [issue["id"] for issue in res.data["results"]]
+            deleted += res.data["deleted"]
+            params = {"cursor": res.data["cursor"]}
+            if not res.data["has_more"]:
+                return ids, deleted, res.data["cursor"]
+
+    def test_full_sync_pages_through_team_issues(self):
+        """Test a sync without a cursor returns every issue of the team."""
+        ids, deleted, _ = self.sync(page_size=2)
+
+        self.assertEqual(ids, [issue.id for issue in self.issues])
+        self.assertEqual(deleted, [])
+
+    def test_cursor_returns_only_changes(self):
+        """Test a cursor resumes with the issues written after it."""
+        _, _, cursor = self.sync()
+        self.assertEqual(self.sync(cursor=cursor)[:2], ([], []))
+
+        res = self.client.patch(
+            detail_url(self.issues[0].id), {"status": "Closed"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        new = Issue.objects.create(title="New", team=self.team)
+
+        res = self.client.get(CHANGES_URL, {"cursor": cursor})
+
+        self.assertEqual(
+            [(issue["id"], issue["status"]) for issue in res.data["results"]],
+            [(self.issues[0].id, "Closed"), (new.id, "Open")],
+        )
+        self.assertIn("updated_at", res.data["results"][0])
+
+    def test_deleted_issues_returned_as_tombstones(self):
+        """Test issues deleted after the cursor are listed as deleted."""
+        _, _, cursor = self.sync()
+
+        res = self.client.delete(detail_url(self.issues[1].id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        ids, deleted, _ = self.sync(cursor=cursor)
+        self.assertEqual(ids, [])
+        self.assertEqual(deleted, [self.issues[1].id])
+
+    def test_comment_marks_issue_changed(self):
+        """Test a new comment re-sends its issue with the new count."""
+        _, _, cursor = self.sync()
+
+        Comment.objects.create(issue=self.issues[2], content="Comment")
+
+        res = self.client.get(CHANGES_URL, {"cursor": cursor})
+        self.assertEqual(res.data["results"][0]["id"], self.issues[2].id)
+        self.assertEqual(res.data["results"][0]["comment_count"], 1)
+
+    def test_updated_since(self):
+        """Test updated_since starts the feed from a timestamp."""
+        since = timezone.now() - datetime.timedelta(minutes=1)
+        Issue.objects.update(updated_at=since - datetime.timedelta(hours=1))
+        Issue.objects.filter(id=self.issues[1].id).update(
+            updated_at=since + datetime.timedelta(seconds=1)
+        )
+
+        ids, _, _ = self.sync(updated_since=since.isoformat())
+
+        self.assertEqual(ids, [self.issues[1].id])
+
+    @override_settings(TRACKER_CHANGES_SETTLE_SECONDS=60)
+    def test_recent_changes_held_back(self):
+        """Test changes inside the settle window wait for the next call."""
+        ids, _, cursor = self.sync()
+        self.assertEqual(ids, [])
+
+        Issue.objects.update(
+            updated_at=timezone.now() - datetime.timedelta(minutes=2)
+        )
+        ids, _, _ = self.sync(cursor=cursor)
+        self.assertEqual(ids, [issue.id for issue in self.issues])
+
+    def test_idle_cursor_does_not_expire(self):
+        """Test cursors move past stretches without deletes."""
+        old = timezone.now() - datetime.timedelta(days=29)
+        cursor = changes.encode_cursor((old, 0), (old, 0))
+
+        res = self.client.get(CHANGES_URL, {"cursor": cursor})
+
+        _, (deleted_at, _) = changes.decode_cursor(res.data["cursor"])
+        self.assertGreater(deleted_at, timezone.now() - datetime.timedelta(1))
+
+    @override_settings(TRACKER_TOMBSTONE_RETENTION_DAYS=1)
+    def test_expired_cursor(self):
+        """Test a cursor older than the tombstone history is refused."""
+        old = timezone.now() - datetime.timedelta(days=2)
+        cursor = changes.encode_cursor((old, 0), (old, 0))
+
+        res = self.client.get(CHANGES_URL, {"cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+    def test_invalid_parameters(self):
+        """Test malformed cursors and conflicting parameters are refused."""
+        res = self.client.get(CHANGES_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.get(
+            CHANGES_URL,
+            {"cursor": "x", "updated_since": timezone.now().isoformat()},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tombstones_purged_after_retention(self):
+        """Test purging keeps only tombstones within the retention days."""
+        issue_id = self.issues[0].id
+        self.issues[0].delete()
+        IssueTombstone.objects.create(
+            team=self.team,
+            issue_id=12345,
+            deleted_at=timezone.now() - datetime.timedelta(days=31),
+        )
+
+        self.assertEqual(changes.purge_tombstones(), 1)
+        self.assertEqual(
+            list(IssueTombstone.objects.values_list("issue_id", flat=True)),
+            [issue_id],
+        )
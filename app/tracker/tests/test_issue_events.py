@@ -0,0 +1,242 @@
+"""
+Test the live issue events stream.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from app.asgi import application
+from core.models import AuthToken, Issue, Team
+from tracker import changes, events
+
+EVENTS_PATH = "/api/tracker/events/"
+
+
+class StreamClient:
+    """Drive one request to the ASGI application."""
+
+    def __init__(self, headers=(), query=""):
+        self.scope = {
+            "type": "http",
+            "method": "GET",
+            "path": EVENTS_PATH,
+            "query_string": query.encode(),
+            "headers": [
+                (name.encode(), value.encode()) for name, value in headers
+            ],
+        }
+        self.messages = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.buffer = ""
+        self.task = None
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        await self.messages.put(message)
+
+    async def open(self):
+        """Start the request and return its response start message."""
+        self.task = asyncio.ensure_future(
+            application(self.scope, self.receive, self.send)
+        )
+        return await asyncio.wait_for(self.messages.get(), 5)
+
+    async def frames(self, count):
+        """Return the next count frames as {field: value} dicts."""
+        frames = []
+        while len(frames) < count:
+            if "\n\n" not in self.buffer:
+                message = await asyncio.wait_for(self.messages.get(), 5)
+                self.buffer += message.get("body", b"").decode()
+                if not message.get("more_body", False):
+                    self.buffer += "\n\n" if self.buffer else ""
+                    if not self.buffer:
+                        return frames
+                continue
+            frame, self.buffer = self.buffer.split("\n\n", 1)
+            fields = dict(
+                line.split(": ", 1) for line in frame.splitlines() if line
+            )
+            frames.append(fields)
+        return frames
+
+    async def events(self, count):
+        """Return the next count (event, data, id) issue events."""
+        found = []
+        while len(found) < count:
+            for frame in await self.frames(1):
+                if "event" in frame:
+                    data = json.loads(frame["data"])
+                    found.append((frame["event"], data, frame["id"]))
+        return found
+
+    async def close(self):
+        """Disconnect and wait for the application to finish."""
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+class IssueEventsTestsMixin:
+    """Set up a team member with a token and tidy up the broker."""
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Sample Team")
+        self.other = Team.objects.create(name="Other Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.token = AuthToken.objects.create(user=self.user)
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+        self.addCleanup(events.broker.stop)
+
+    def connect(self, *headers, query=""):
+        return StreamClient(
+            [("authorization", f"Token {self.token.key}"), *headers],
+            query=query,
+        )
+
+    async def open(self, client):
+        """Open a stream and return the id sent before any event."""
+        start = await client.open()
+        self.assertEqual(start["status"], 200)
+        (hello,) = await client.frames(1)
+        self.assertEqual(hello["retry"], "2000")
+        return hello["id"]
+
+
+@override_settings(TRACKER_EVENTS_BACKEND="tracker.events.LocalBackend")
+class IssueEventsTests(IssueEventsTestsMixin, TransactionTestCase):
+    """Test the stream with the in-process backend."""
+
+    async def test_token_required(self):
+        """Test the stream refuses requests without a valid token."""
+        for headers in ([], [("authorization", "Token wrong")]):
+            client = StreamClient(headers)
+            start = await client.open()
+            self.assertEqual(start["status"], 401)
+
+    async def test_token_in_query_string(self):
+        """Test browsers can pass the token as a query parameter."""
+        client = StreamClient(query=f"token={self.token.key}")
+        await self.open(client)
+        await client.close()
+
+    async def test_writes_stream_to_the_team(self):
+        """Test creates, updates and deletes reach the team's streams."""
+        client = self.connect()
+        await self.open(client)
+
+        new = await sync_to_async(Issue.objects.create)(
+            title="New", team=self.team
+        )
+        await sync_to_async(Issue.objects.create)(
+            title="Elsewhere", team=self.other
+        )
+        new.status = "Closed"
+        await sync_to_async(new.save)()
+        issue_id = self.issue.id
+        await sync_to_async(self.issue.delete)()
+
+        received = await client.events(3)
+        await client.close()
+
+        self.assertEqual(
+            [(name, data["id"]) for name, data, _ in received],
+            [
+                (events.CREATED, new.id),
+                (events.UPDATED, new.id),
+                (events.DELETED, issue_id),
+            ],
+        )
+        self.assertEqual(received[1][1]["status"], "Closed")
+        self.assertNotIn("description", received[0][1])
+        changes.decode_cursor(received[-1][2])
+
+    async def test_bulk_transition_streams_issues(self):
+        """Test issues changed in bulk reach the team's streams."""
+        client = self.connect()
+        await self.open(client)
+
+        api = APIClient()
+        api.force_authenticate(self.user)
+        res = await sync_to_async(api.post)(
+            reverse("tracker:issue-bulk-transition"),
+            {"ids": [self.issue.id], "status": "Closed"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+
+        ((name, data, _),) = await client.events(1)
+        await client.close()
+        self.assertEqual((name, data["status"]), (events.UPDATED, "Closed"))
+
+    async def test_resume_replays_missed_changes(self):
+        """Test a client resuming with Last-Event-ID gets what it missed."""
+        client = self.connect()
+        last_event_id = await self.open(client)
+        await client.close()
+
+        deleted = await sync_to_async(Issue.objects.create)(
+            title="Deleted", team=self.team
+        )
+        deleted_id = deleted.id
+        await sync_to_async(deleted.delete)()
+        self.issue.title = "Renamed"
+        await sync_to_async(self.issue.save)()
+
+        client = self.connect(("last-event-id", last_event_id))
+        start = await client.open()
+        self.assertEqual(start["status"], 200)
+        replayed = await client.events(2)
+        await client.close()
+
+        self.assertEqual(
+            [(name, data["id"]) for name, data, _ in replayed],
+            [(events.UPDATED, self.issue.id), (events.DELETED, deleted_id)],
+        )
+        self.assertEqual(replayed[0][1]["title"], "Renamed")
+
+    async def test_invalid_last_event_id(self):
+        """Test a malformed Last-Event-ID is refused."""
+        client = self.connect(("last-event-id", "not-a-cursor"))
+        start = await client.open()
+        self.assertEqual(start["status"], 404)
+
+    @override_settings(TRACKER_EVENTS_QUEUE_SIZE=2)
+    async def test_stream_closed_when_client_falls_behind(self):
+        """Test a stream whose queue fills up ends instead of growing."""
+        client = self.connect()
+        await self.open(client)
+
+        events.broker.publish([events.issue_event(self.issue)] * 3)
+
+        self.assertEqual(await client.frames(3), [])
+        await asyncio.wait_for(client.task, 5)
+        self.assertEqual(events.broker.streams, {})
+
+
+class PostgresIssueEventsTests(IssueEventsTestsMixin, TransactionTestCase):
+    """Test the stream with events sent through PostgreSQL."""
+
+    async def test_notifications_reach_the_stream(self):
+        """Test committed writes are delivered through NOTIFY."""
+        client = self.connect()
+        await self.open(client)
+
+        new = await sync_to_async(Issue.objects.create)(
+            title="New", team=self.team
+        )
+
+        ((name, data, _),) = await client.events(1)
+        await client.close()
+        self.assertEqual((name, data["id"]), (events.CREATED, new.id))
@@ -0,0 +1,245 @@
+"""
+Test the issue analytics rollups and API.
+"""
+
+import datetime
+import threading
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Issue, IssueDailyStat, Project, Team
+from tracker import stats
+from tracker.stats import rebuild_rollups
+
+STATS_URL = reverse("tracker:stats-list")
+ISSUES_URL = reverse("tracker:issue-list")
+BULK_URL = reverse("tracker:issue-bulk")
+TRANSITION_URL = reverse("tracker:issue-bulk-transition")
+
+
+def detail_url(issue_id):
+    """Return issue detail URL."""
+    return reverse("tracker:issue-detail", args=[issue_id])
+
+
+def counters(**filters):
+    """Return {(status, project_id): (created, entered, exited)}."""
+    return {
+        (stat.status, stat.project_id): (
+            stat.created,
+            stat.entered,
+            stat.exited,
+        )
+        for stat in IssueDailyStat.objects.filter(**filters)
+    }
+
+
+class IssueStatsTests(TestCase):
+    """Test the rollups are kept up to date and served."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.project = Project.objects.create(team=self.team, name="Sample")
+        self.client.force_authenticate(self.user)
+        self.today = timezone.localdate()
+
+    def test_create_update_and_delete_are_recorded(self):
+        """Test each issue write moves counts between statuses."""
+        res = self.client.post(ISSUES_URL, {"title": "Issue"})
+        issue_id = res.data["id"]
+        self.assertEqual(counters(), {("Open", None): (1, 1, 0)})
+
+        self.client.patch(detail_url(issue_id), {"status": "Closed"})
+        self.assertEqual(
+            counters(),
+            {("Open", None): (1, 1, 1), ("Closed", None): (0, 1, 0)},
+        )
+
+        self.client.patch(detail_url(issue_id), {"title": "Renamed"})
+        self.client.delete(detail_url(issue_id))
+        self.assertEqual(
+            counters(),
+            {("Open", None): (1, 1, 1), ("Closed", None): (0, 1, 1)},
+        )
+
+    def test_project_change_is_recorded(self):
+        """Test moving an issue to a project moves its count."""
+        issue = Issue.objects.create(title="Issue", team=self.team)
+        issue = Issue.objects.get(pk=issue.pk)
+        issue.project = self.project
+        issue.save()
+
+        self.assertEqual(
+            counters(),
+            {("Open", None): (1, 1, 1), ("Open", self.project.id): (0, 1, 0)},
+        )
+
+    def test_bulk_writes_are_recorded(self):
+        """Test bulk create, update and transition record their changes."""
+        res = self.client.post(
+            BULK_URL, [{"title": "One"}, {"title": "Two"}], format="json"
+        )
+        one, two = (result["id"] for result in res.data)
+        self.assertEqual(counters(), {("Open", None): (2, 2, 0)})
+
+        self.client.patch(
+            BULK_URL,
+            [{"id": one, "status": "In Progress"}, {"id": two}],
+            format="json",
+        )
+        self.client.post(
+            TRANSITION_URL, {"ids": [one, two], "status": "Closed"}
+        )
+
+        self.assertEqual(
+            counters(),
+            {
+                ("Open", None): (2, 2, 2),
+                ("In Progress", None): (0, 1, 1),
+                ("Closed", None): (0, 2, 0),
+            },
+        )
+
+    def test_daily_series(self):
+        """Test opened, closed and backlog counts per day."""
+        yesterday = self.today - datetime.timedelta(days=1)
+        IssueDailyStat.objects.bulk_create(
+            [
+                IssueDailyStat(
+                    team=self.team,
+                    day=yesterday,
+                    status="Open",
+                    created=3,
+                    entered=3,
+                    exited=1,
+                ),
+                IssueDailyStat(
+                    team=self.team, day=yesterday, status="Closed", entered=1
+                ),
+                IssueDailyStat(
+                    team=self.team,
+                    project=self.project,
+                    day=self.today,
+                    status="Open",
+                    created=2,
+                    entered=2,
+                ),
+            ]
+        )
+
+        res = self.client.get(STATS_URL, {"start": yesterday})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["days"],
+            [
+                {
+                    "day": yesterday.isoformat(),
+                    "opened": 3,
+                    "closed": 1,
+                    "backlog": 2,
+                },
+                {
+                    "day": self.today.isoformat(),
+                    "opened": 2,
+                    "closed": 0,
+                    "backlog": 4,
+                },
+            ],
+        )
+
+        res = self.client.get(
+            STATS_URL, {"start": self.today, "project": self.project.id}
+        )
+        self.assertEqual(res.data["days"][0]["backlog"], 2)
+
+    def test_series_query_count_is_constant(self):
+        """Test the series runs the same queries however long it is."""
+        Issue.objects.create(title="Issue", team=self.team)
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                STATS_URL, {"start": self.today - datetime.timedelta(90)}
+            )
+
+        self.assertEqual(len(res.data["days"]), 91)
+        self.assertEqual(res.data["days"][-1]["backlog"], 1)
+
+    def test_invalid_range_rejected(self):
+        """Test ranges ending before they start or too long are rejected."""
+        for params in [
+            {"start": self.today, "end": self.today - datetime.timedelta(1)},
+            {"start": self.today - datetime.timedelta(1000)},
+        ]:
+            res = self.client.get(STATS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        """Test rebuilding from issues gives the incremental counts."""
+        for title in ["One", "Two", "Three"]:
+            self.client.post(ISSUES_URL, {"title": title})
+        issue = Issue.objects.get(title="Two")
+        self.client.patch(detail_url(issue.id), {"status": "Closed"})
+        incremental = counters()
+
+        rebuilt = rebuild_rollups([self.team.id])
+
+        self.assertEqual(rebuilt, 2)
+        self.assertEqual(counters(), incremental)
+
+    def test_no_stats_detail_route(self):
+        """Test the stats endpoint exposes only its list route."""
+        res = self.client.get(f"{STATS_URL}1/")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConcurrentIssueStatsTests(TransactionTestCase):
+    """Test concurrent updates record a status change once."""
+
+    def test_concurrent_status_changes_counted_once(self):
+        """Test two PATCHes moving an issue to Closed count one exit."""
+        team = Team.objects.create(name="Sample Team")
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=team
+        )
+        issue = Issue.objects.create(title="Issue", team=team)
+        IssueDailyStat.objects.all().delete()
+        record = stats.record_issue_saved
+
+        def slow_record(*args):
+            # Keeps the first update's transaction open while the second
+            # one loads the issue.
+            time.sleep(0.3)
+            return record(*args)
+
+        def close():
+            client = APIClient()
+            client.force_authenticate(user)
+            client.patch(detail_url(issue.id), {"status": "Closed"})
+            connections.close_all()
+
+        with patch("tracker.stats.record_issue_saved", slow_record):
+            threads = [threading.Thread(target=close) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(
+            counters(),
+            {("Open", None): (0, 0, 1), ("Closed", None): (0, 1, 0)},
+        )
@@ -3,13 +3,15 @@ Test the issues API.
 """
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Issue, Team
+from core.models import Comment, Issue, Team
 
 from tracker.serializers import IssueSerializer
 
@@ -18,7 +20,7 @@ ISSUES_URL = reverse("tracker:issue-list")
 
 def detail_url(issue_id):
     """Return issue detail URL."""
-    return reverse("issue:issue-detail", args=[issue_id])
+    return reverse("tracker:issue-detail", args=[issue_id])
 
 
 def create_user(email="user@example.com", password="testpass123"):
@@ -53,6 +55,28 @@ class PublicIssueAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class TeamlessIssueAPITests(TestCase):
+    """Test users without a team cannot read or write issues."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_list_refused(self):
+        """Test listing issues is forbidden without a team."""
+        res = self.client.get(ISSUES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_create_refused(self):
+        """Test no team-less issue is created."""
+        res = self.client.post(ISSUES_URL, {"title": "Orphan"})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Issue.objects.exists())
+
+
 class PrivateIssueAPITests(TestCase):
     """Test the private issue API."""
 
@@ -74,7 +98,7 @@ class PrivateIssueAPITests(TestCase):
         serializer = IssueSerializer(issues, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_retrieve_issues_limited_to_members(self):
         """Test retrieving issues for user."""
@@ -89,4 +113,137 @@ class PrivateIssueAPITests(TestCase):
         res = self.client.get(ISSUES_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_issues_paginated_by_cursor(self):
+        """Test walking the issue list page by page with cursors."""
+        for i in range(5):
+            create_issue(user=self.user, title=f"Issue {i}")
+
+        res = self.client.get(ISSUES_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNone(res.data["previous"])
+
+        ids = [issue["id"] for issue in res.data["results"]]
+        next_url = res.data["next"]
+        while next_url:
+            res = self.client.get(next_url)
+            ids += [issue["id"] for issue in res.data["results"]]
+            next_url = res.data["next"]
+
+        expected = list(
+            Issue.objects.order_by("-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_issues_ordered_by_supported_field(self):
+        """Test the issue list honours a supported ordering."""
+        first = create_issue(user=self.user)
+        second = create_issue(user=self.user)
+
+        res = self.client.get(ISSUES_URL, {"ordering": "created_at"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [issue["id"] for issue in res.data["results"]]
+        self.assertEqual(ids, [first.id, second.id])
+
+    def test_invalid_cursor_returns_not_found(self):
+        """Test a malformed cursor is rejected."""
+        res = self.client.get(ISSUES_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def walk_pages(self, params):
+        """Return the ids on every page and the SQL each page ran."""
+        ids, statements = [], []
+        url, data = ISSUES_URL, params
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(url, data)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [issue["id"] for issue in res.data["results"]]
+            statements += [query["sql"] for query in queries]
+            url, data = res.data["next"], None
+        return ids, statements
+
+    def test_tied_ordering_paged_by_keyset(self):
+        """Test ties on the ordering field are paged by id, not offset."""
+        issues = [create_issue(user=self.user) for _ in range(5)]
+        Issue.objects.update(updated_at=issues[0].updated_at)
+
+        ids, statements = self.walk_pages(
+            {"ordering": "updated_at", "page_size": 2}
+        )
+
+        self.assertEqual(ids, [issue.id for issue in issues])
+        self.assertFalse(
+            [sql for sql in statements if "OFFSET" in sql.upper()]
+        )
+
+    def test_mixed_direction_ordering_paged(self):
+        """Test orderings mixing directions page without gaps."""
+        issues = [create_issue(user=self.user) for _ in range(5)]
+        Issue.objects.filter(id__in=[i.id for i in issues[:3]]).update(
+            created_at=issues[0].created_at
+        )
+
+        ids, _ = self.walk_pages(
+            {"ordering": "created_at,-id", "page_size": 2}
+        )
+
+        expected = [issue.id for issue in issues[2::-1]]
+        expected += [issue.id for issue in issues[3:]]
+        self.assertEqual(ids, expected)
+
+    def test_previous_page_by_keyset(self):
+        """Test the previous link returns to the page before."""
+        for _ in range(5):
+            create_issue(user=self.user)
+        first = self.client.get(ISSUES_URL, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        res = self.client.get(second.data["previous"])
+
+        self.assertEqual(res.data["results"], first.data["results"])
+
+    def test_cursor_with_invalid_position_returns_not_found(self):
+        """Test a cursor whose position does not fit the ordering."""
+        for _ in range(3):
+            create_issue(user=self.user)
+        res = self.client.get(ISSUES_URL, {"page_size": 1})
+        cursor = res.data["next"].split("cursor=")[1].split("&")[0]
+
+        res = self.client.get(
+            ISSUES_URL, {"cursor": cursor, "ordering": "updated_at"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_issues_query_count_is_constant(self):
+        """Test listing issues does not run a query per issue."""
+        create_issue(user=self.user)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(ISSUES_URL)
+
+        for _ in range(5):
+            create_issue(user=self.user)
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(ISSUES_URL)
+
+        self.assertEqual(len(res.data["results"]), 6)
+        self.assertEqual(len(few), len(many))
+
+    def test_delete_issue_with_comments(self):
+        """Test deleting a commented issue deletes its comments."""
+        issue = create_issue(user=self.user)
+        Comment.objects.create(issue=issue, content="First")
+        Comment.objects.create(issue=issue, content="Second")
+
+        res = self.client.delete(detail_url(issue.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Comment.objects.exists())
+        # Foreign keys are checked at commit, which a TestCase never does.
+        connection.check_constraints()
@@ -0,0 +1,255 @@
+"""
+Test the webhook and notification outbox.
+"""
+
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Issue, OutboxMessage, Team, Webhook
+from tracker import events, outbox
+
+ISSUES_URL = reverse("tracker:issue-list")
+TRANSITION_URL = reverse("tracker:issue-bulk-transition")
+
+
+def detail_url(issue_id):
+    """Return issue detail URL."""
+    return reverse("tracker:issue-detail", args=[issue_id])
+
+
+class StubReceiver:
+    """Local HTTP server recording the webhooks posted to it."""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.requests.append((dict(self.headers), body))
+                self.send_response(receiver.status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        ).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OutboxTestsMixin:
+    """Set up a team with a member, an issue and an API client."""
+
+    def setUp(self):
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.member = get_user_model().objects.create_user(
+            email="member@example.com", password="testpass123", team=self.team
+        )
+        self.issue = Issue.objects.create(title="Issue", team=self.team)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class OutboxWriteTests(OutboxTestsMixin, TestCase):
+    """Test writes queue their webhooks and notifications."""
+
+    def test_issue_write_queues_team_webhooks(self):
+        """Test a write queues one message per active webhook of the team."""
+        webhook = Webhook.objects.create(team=self.team, url="http://a/")
+        Webhook.objects.create(
+            team=self.team, url="http://b/", is_active=False
+        )
+        other = Team.objects.create(name="Other Team")
+        Webhook.objects.create(team=other, url="http://c/")
+
+        res = self.client.post(ISSUES_URL, {"title": "New"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.webhook, webhook)
+        self.assertEqual(message.event, events.CREATED)
+        self.assertEqual(message.payload["id"], res.data["id"])
+
+    def test_failed_write_queues_nothing(self):
+        """Test messages roll back with the write they announce."""
+        Webhook.objects.create(team=self.team, url="http://a/")
+
+        with patch(
+            "tracker.stats.record_issue_saved", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(ISSUES_URL, {"title": "New"})
+
+        self.assertFalse(OutboxMessage.objects.exists())
+        self.assertFalse(Issue.objects.filter(title="New").exists())
+
+    def test_assignment_notifies_assignee(self):
+        """Test the assignee is notified when assigned_to changes."""
+        url = detail_url(self.issue.id)
+        self.client.patch(url, {"assigned_to": self.member.id})
+        self.client.patch(url, {"assigned_to": self.member.id})
+        self.client.patch(url, {"title": "Renamed"})
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.event, outbox.ASSIGNED)
+        self.assertEqual(message.recipient, self.member)
+        self.assertEqual(
+            message.payload,
+            {"issues": [{"id": self.issue.id, "title": "Issue"}]},
+        )
+
+    def test_bulk_transition_notifies_newly_assigned(self):
+        """Test a bulk assignment sends one notification for new issues."""
+        assigned = Issue.objects.create(
+            title="Assigned", team=self.team, assigned_to=self.member
+        )
+
+        res = self.client.post(
+            TRANSITION_URL,
+            {
+                "ids": [self.issue.id, assigned.id],
+                "assigned_to": self.member.id,
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.recipient, self.member)
+        self.assertEqual(
+            [issue["id"] for issue in message.payload["issues"]],
+            [self.issue.id],
+        )
+
+
+class OutboxWorkerTests(OutboxTestsMixin, TransactionTestCase):
+    """Test the process_outbox worker.
+
+    The worker refreshes its connection between batches, which a
+    TestCase transaction would not survive.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.receiver = StubReceiver()
+        self.addCleanup(self.receiver.close)
+        self.webhook = Webhook.objects.create(
+            team=self.team, url=self.receiver.url, secret="s3cret"
+        )
+
+    def process(self):
+        """Run the worker until no message is due and return its output."""
+        out = StringIO()
+        call_command("process_outbox", "--once", stdout=out)
+        return out.getvalue()
+
+    def test_delivers_webhooks_and_notifications(self):
+        """Test messages are posted or mailed, then deleted."""
+        self.issue.assigned_to = self.member
+        self.issue.save()
+        outbox.notify_assigned([(self.member, [self.issue])])
+
+        output = self.process()
+
+        self.assertIn("Delivered 2 messages", output)
+        self.assertFalse(OutboxMessage.objects.exists())
+        ((headers, body),) = self.receiver.requests
+        self.assertEqual(headers["X-Tracker-Event"], events.UPDATED)
+        self.assertEqual(
+            headers["X-Tracker-Signature"], outbox.sign("s3cret", body)
+        )
+        self.assertEqual(json.loads(body)["data"]["id"], self.issue.id)
+        self.assertEqual(mail.outbox[0].to, [self.member.email])
+        self.assertIn("Issue", mail.outbox[0].subject)
+
+    @override_settings(TRACKER_OUTBOX_RETRY_BASE_SECONDS=3600)
+    def test_failed_delivery_retried_later(self):
+        """Test a failed delivery is rescheduled with backoff."""
+        self.receiver.status = 500
+        Issue.objects.create(title="New", team=self.team)
+
+        output = self.process()
+
+        self.assertIn("1 to retry", output)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.attempts, 1)
+        self.assertIn("500", message.last_error)
+        self.assertIsNone(message.failed_at)
+        self.assertGreater(message.available_at, timezone.now())
+
+    @override_settings(TRACKER_OUTBOX_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        """Test a message is marked failed once out of attempts."""
+        self.receiver.status = 500
+        Issue.objects.create(title="New", team=self.team)
+        OutboxMessage.objects.update(attempts=1)
+
+        output = self.process()
+
+        self.assertIn("1 failed", output)
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.attempts, 2)
+        self.assertIsNotNone(message.failed_at)
+        self.assertEqual(outbox.claim(10), [])
+
+
+class OutboxClaimTests(TransactionTestCase):
+    """Test concurrent workers claim different messages."""
+
+    def test_locked_messages_skipped(self):
+        """Test a claim skips the rows another worker has locked."""
+        past = timezone.now() - datetime.timedelta(seconds=1)
+        ids = [
+            OutboxMessage.objects.create(
+                event="test", payload={}, available_at=past
+            ).id
+            for _ in range(3)
+        ]
+        locked, release = threading.Event(), threading.Event()
+
+        def other_worker():
+            with transaction.atomic():
+                list(
+                    OutboxMessage.objects.filter(id=ids[0]).select_for_update()
+                )
+                locked.set()
+                release.wait(5)
+            connections.close_all()
+
+        thread = threading.Thread(target=other_worker)
+        thread.start()
+        locked.wait(5)
+        try:
+            claimed = [message.id for message in outbox.claim(10)]
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(claimed, ids[1:])
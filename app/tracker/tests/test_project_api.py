@@ -3,13 +3,15 @@ Test the project API.
 """
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Team, Project
+from core.models import Issue, Team, Project
 
 from tracker.serializers import ProjectSerializer
 
@@ -82,11 +84,58 @@ class PrivaeProjectAPITests(TestCase):
 
         res = self.client.get(PROJECTS_URL)
 
-        projects = Project.objects.all().order_by("-name")
+        projects = Project.objects.all().order_by("-id")
         serializer = ProjectSerializer(projects, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_projects_paginated_by_cursor(self):
+        """Test the project list is split into cursor pages."""
+        team = create_team(user=self.user)
+        for i in range(3):
+            create_project(user=self.user, team=team, name=f"Project {i}")
+
+        res = self.client.get(PROJECTS_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertIsNotNone(res.data["next"])
+
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertIsNone(res.data["next"])
+
+    def test_project_detail_query_count_is_constant(self):
+        """Test project detail loads its issues in a single query."""
+        team = create_team(user=self.user)
+        project = create_project(user=self.user, team=team)
+        Issue.objects.create(title="Issue", team=team, project=project)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(detail_url(project.id))
+
+        for _ in range(5):
+            Issue.objects.create(title="Issue", team=team, project=project)
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(detail_url(project.id))
+
+        self.assertEqual(len(res.data["issues"]), 6)
+        self.assertEqual(len(few), len(many))
+
+    def test_create_project_in_users_team(self):
+        """Test a new project belongs to the user's team."""
+        team = create_team(user=self.user)
+        other = Team.objects.create(name="Other Team")
+        self.user.refresh_from_db()
+
+        res = self.client.post(
+            PROJECTS_URL, {"name": "New Project", "team": other.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        project = Project.objects.get(id=res.data["id"])
+        self.assertEqual(project.team, team)
 
     # def test_retrieve_projects_limited_to_members(self):
     #     """Test retrieving projects for members."""
@@ -0,0 +1,499 @@
+"""
+Test the tracker API runs a bounded number of queries per request.
+"""
+
+import itertools
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    AuthToken,
+    Comment,
+    Issue,
+    IssueTombstone,
+    Project,
+    Team,
+)
+from core.testing import QueryBudgetMixin
+
+ISSUES = "tracker:issue-list"
+ISSUE = "tracker:issue-detail"
+COMMENTS = "tracker:issue-comment-list"
+COMMENT = "tracker:issue-comment-detail"
+PROJECTS = "tracker:project-list"
+PROJECT = "tracker:project-detail"
+TEAMS = "tracker:team-list"
+TEAM = "tracker:team-detail"
+
+
+class TrackerQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test every tracker endpoint against its query budget."""
+
+    query_budget_namespace = "tracker"
+    query_budgets = {
+        ("tracker:api-root", "GET"): 1,
+        (ISSUES, "GET"): 2,
+        (ISSUES, "POST"): 11,
+        (ISSUE, "GET"): 2,
+        (ISSUE, "PUT"): 10,
+        (ISSUE, "PATCH"): 10,
+        # Comments go in one statement, before the cascade looks for any.
+        (ISSUE, "DELETE"): 13,
+        ("tracker:issue-export", "GET"): 2,
+        ("tracker:issue-changes", "GET"): 3,
+        ("tracker:issue-search", "GET"): 2,
+        ("tracker:issue-bulk", "POST"): 12,
+        ("tracker:issue-bulk", "PATCH"): 12,
+        ("tracker:issue-bulk-transition", "POST"): 12,
+        (COMMENTS, "GET"): 3,
+        (COMMENTS, "POST"): 7,
+        (COMMENT, "GET"): 3,
+        (COMMENT, "PUT"): 5,
+        (COMMENT, "PATCH"): 5,
+        (COMMENT, "DELETE"): 8,
+        (PROJECTS, "GET"): 2,
+        (PROJECTS, "POST"): 4,
+        (PROJECT, "GET"): 3,
+        (PROJECT, "PUT"): 6,
+        (PROJECT, "PATCH"): 5,
+        (PROJECT, "DELETE"): 5,
+        (TEAMS, "GET"): 4,
+        (TEAMS, "POST"): 7,
+        (TEAM, "GET"): 4,
+        (TEAM, "PUT"): 10,
+        (TEAM, "PATCH"): 9,
+        (TEAM, "DELETE"): 8,
+        ("tracker:stats-list", "GET"): 3,
+    }
+
+    def setUp(self):
+        self.names = (f"Name {n}" for n in itertools.count())
+        # Every update changes the status, so each one records it in the
+        # stats rollups.
+        self.statuses = itertools.cycle(["Closed", "Open"])
+        self.team = Team.objects.create(name=next(self.names))
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.project = Project.objects.create(name="Project", team=self.team)
+        self.issue = self.create_issue()
+        token = AuthToken.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def create_issue(self, **params):
+        """Create an issue of the team, assigned within the team."""
+        return Issue.objects.create(
+            title="Searchable issue",
+            team=self.team,
+            project=self.project,
+            created_by=self.user,
+            assigned_to=self.user,
+            **params,
+        )
+
+    def grow_issues(self, size):
+        """Give the team `size` issues and return them."""
+        for _ in range(size - self.team.issues.count()):
+            self.create_issue()
+        return list(self.team.issues.order_by("id"))
+
+    def grow_comments(self, size):
+        """Give the issue `size` comments and return the last one."""
+        for _ in range(size - self.issue.comments.count()):
+            Comment.objects.create(
+                issue=self.issue, content="Comment", created_by=self.user
+            )
+        return self.issue.comments.order_by("-id").first()
+
+    def grow_projects(self, size):
+        """Give the team `size` projects, each with issues."""
+        for _ in range(size - self.team.projects.count()):
+            project = Project.objects.create(name="Project", team=self.team)
+            Issue.objects.create(
+                title="Issue", team=self.team, project=project
+            )
+
+    def grow_members(self, size):
+        """Give the team `size` members besides the user and return them."""
+        members = self.team.members.exclude(id=self.user.id)
+        for _ in range(size - members.count()):
+            get_user_model().objects.create_user(
+                email=f"{next(self.names).replace(' ', '')}@example.com",
+                password="testpass123",
+                team=self.team,
+            )
+        return list(members.values_list("id", flat=True))
+
+    def url(self, name, *args):
+        return reverse(name, args=args)
+
+    def test_api_root(self):
+        self.assertQueryBudget(
+            "tracker:api-root",
+            "GET",
+            lambda size: None,
+            lambda _: self.client.get(self.url("tracker:api-root")),
+        )
+
+    def test_list_issues(self):
+        self.assertQueryBudget(
+            ISSUES,
+            "GET",
+            self.grow_issues,
+            lambda _: self.client.get(self.url(ISSUES)),
+        )
+
+    def test_create_issue(self):
+        payload = {"title": "New", "project": self.project.id}
+        self.assertQueryBudget(
+            ISSUES,
+            "POST",
+            self.grow_issues,
+            lambda _: self.client.post(self.url(ISSUES), payload),
+        )
+
+    def test_retrieve_issue(self):
+        self.assertQueryBudget(
+            ISSUE,
+            "GET",
+            self.grow_comments,
+            lambda _: self.client.get(self.url(ISSUE, self.issue.id)),
+        )
+
+    def test_update_issue(self):
+        self.assertQueryBudget(
+            ISSUE,
+            "PUT",
+            self.grow_comments,
+            lambda _: self.client.put(
+                self.url(ISSUE, self.issue.id),
+                {"title": "Updated", "status": next(self.statuses)},
+            ),
+        )
+
+    def test_partial_update_issue(self):
+        self.assertQueryBudget(
+            ISSUE,
+            "PATCH",
+            self.grow_comments,
+            lambda _: self.client.patch(
+                self.url(ISSUE, self.issue.id), {"status": next(self.statuses)}
+            ),
+        )
+
+    def test_delete_issue(self):
+        def grow(size):
+            issue = self.create_issue()
+            Comment.objects.bulk_create(
+                Comment(issue=issue, content="Comment") for _ in range(size)
+            )
+            return issue
+
+        self.assertQueryBudget(
+            ISSUE,
+            "DELETE",
+            grow,
+            lambda issue: self.client.delete(self.url(ISSUE, issue.id)),
+        )
+
+    def test_export_issues(self):
+        self.assertQueryBudget(
+            "tracker:issue-export",
+            "GET",
+            self.grow_issues,
+            lambda _: self.client.get(
+                self.url("tracker:issue-export"), {"format": "ndjson"}
+            ),
+        )
+
+    @override_settings(TRACKER_CHANGES_SETTLE_SECONDS=0)
+    def test_issue_changes(self):
+        def grow(size):
+            self.grow_issues(size)
+            for issue in self.team.issues.all()[: size // 2]:
+                issue.delete()
+
+        self.assertQueryBudget(
+            "tracker:issue-changes",
+            "GET",
+            grow,
+            lambda _: self.client.get(self.url("tracker:issue-changes")),
+        )
+
+    def test_search_issues(self):
+        self.assertQueryBudget(
+            "tracker:issue-search",
+            "GET",
+            self.grow_issues,
+            lambda _: self.client.get(
+                self.url("tracker:issue-search"), {"q": "searchable"}
+            ),
+        )
+
+    def test_bulk_create_issues(self):
+        def items(size):
+            return [
+                {
+                    "title": f"Bulk {n}",
+                    "project": self.project.id,
+                    "assigned_to": self.user.id,
+                }
+                for n in range(size)
+            ]
+
+        self.assertQueryBudget(
+            "tracker:issue-bulk",
+            "POST",
+            items,
+            lambda payload: self.client.post(
+                self.url("tracker:issue-bulk"), payload, format="json"
+            ),
+        )
+
+    def test_bulk_update_issues(self):
+        def items(size):
+            statuses = itertools.cycle(["Open", "Closed"])
+            return [
+                {"id": issue.id, "status": next(statuses)}
+                for issue in self.grow_issues(size)
+            ]
+
+        self.assertQueryBudget(
+            "tracker:issue-bulk",
+            "PATCH",
+            items,
+            lambda payload: self.client.patch(
+                self.url("tracker:issue-bulk"), payload, format="json"
+            ),
+        )
+
+    def test_bulk_transition_issues(self):
+        self.assertQueryBudget(
+            "tracker:issue-bulk-transition",
+            "POST",
+            lambda size: [issue.id for issue in self.grow_issues(size)],
+            lambda ids: self.client.post(
+                self.url("tracker:issue-bulk-transition"),
+                {
+                    "ids": ids,
+                    "status": next(self.statuses),
+                    "assigned_to": self.user.id,
+                },
+                format="json",
+            ),
+        )
+
+    def test_list_comments(self):
+        self.assertQueryBudget(
+            COMMENTS,
+            "GET",
+            self.grow_comments,
+            lambda _: self.client.get(self.url(COMMENTS, self.issue.id)),
+        )
+
+    def test_create_comment(self):
+        self.assertQueryBudget(
+            COMMENTS,
+            "POST",
+            self.grow_comments,
+            lambda _: self.client.post(
+                self.url(COMMENTS, self.issue.id), {"content": "New"}
+            ),
+        )
+
+    def test_retrieve_comment(self):
+        self.assertQueryBudget(
+            COMMENT,
+            "GET",
+            self.grow_comments,
+            lambda comment: self.client.get(
+                self.url(COMMENT, self.issue.id, comment.id)
+            ),
+        )
+
+    def test_update_comment(self):
+        self.assertQueryBudget(
+            COMMENT,
+            "PUT",
+            self.grow_comments,
+            lambda comment: self.client.put(
+                self.url(COMMENT, self.issue.id, comment.id),
+                {"content": "Updated"},
+            ),
+        )
+
+    def test_partial_update_comment(self):
+        self.assertQueryBudget(
+            COMMENT,
+            "PATCH",
+            self.grow_comments,
+            lambda comment: self.client.patch(
+                self.url(COMMENT, self.issue.id, comment.id),
+                {"content": "Updated"},
+            ),
+        )
+
+    def test_delete_comment(self):
+        self.assertQueryBudget(
+            COMMENT,
+            "DELETE",
+            self.grow_comments,
+            lambda comment: self.client.delete(
+                self.url(COMMENT, self.issue.id, comment.id)
+            ),
+        )
+
+    def test_list_projects(self):
+        self.assertQueryBudget(
+            PROJECTS,
+            "GET",
+            self.grow_projects,
+            lambda _: self.client.get(self.url(PROJECTS)),
+        )
+
+    def test_create_project(self):
+        self.assertQueryBudget(
+            PROJECTS,
+            "POST",
+            self.grow_projects,
+            lambda _: self.client.post(
+                self.url(PROJECTS), {"name": "New", "team": self.team.id}
+            ),
+        )
+
+    def test_retrieve_project(self):
+        self.assertQueryBudget(
+            PROJECT,
+            "GET",
+            self.grow_issues,
+            lambda _: self.client.get(self.url(PROJECT, self.project.id)),
+        )
+
+    def test_update_project(self):
+        self.assertQueryBudget(
+            PROJECT,
+            "PUT",
+            self.grow_issues,
+            lambda _: self.client.put(
+                self.url(PROJECT, self.project.id),
+                {"name": "Updated", "team": self.team.id},
+            ),
+        )
+
+    def test_partial_update_project(self):
+        self.assertQueryBudget(
+            PROJECT,
+            "PATCH",
+            self.grow_issues,
+            lambda _: self.client.patch(
+                self.url(PROJECT, self.project.id), {"name": "Updated"}
+            ),
+        )
+
+    def test_delete_project(self):
+        def project(size):
+            self.grow_projects(size)
+            return Project.objects.create(name="Doomed", team=self.team)
+
+        self.assertQueryBudget(
+            PROJECT,
+            "DELETE",
+            project,
+            lambda project: self.client.delete(self.url(PROJECT, project.id)),
+        )
+
+    def test_list_teams(self):
+        def grow(size):
+            self.grow_members(size)
+            self.grow_projects(size)
+
+        self.assertQueryBudget(
+            TEAMS,
+            "GET",
+            grow,
+            lambda _: self.client.get(self.url(TEAMS)),
+        )
+
+    def test_create_team(self):
+        self.assertQueryBudget(
+            TEAMS,
+            "POST",
+            self.grow_members,
+            lambda _: self.client.post(
+                self.url(TEAMS), {"name": next(self.names)}
+            ),
+        )
+
+    def test_retrieve_team(self):
+        def grow(size):
+            self.grow_members(size)
+            self.grow_projects(size)
+
+        self.assertQueryBudget(
+            TEAM,
+            "GET",
+            grow,
+            lambda _: self.client.get(self.url(TEAM, self.team.id)),
+        )
+
+    def test_update_team(self):
+        self.assertQueryBudget(
+            TEAM,
+            "PUT",
+            self.grow_members,
+            lambda members: self.client.put(
+                self.url(TEAM, self.team.id),
+                {"name": next(self.names), "members": members},
+                format="json",
+            ),
+        )
+
+    def test_partial_update_team(self):
+        self.assertQueryBudget(
+            TEAM,
+            "PATCH",
+            self.grow_members,
+            lambda members: self.client.patch(
+                self.url(TEAM, self.team.id),
+                {"members": members},
+                format="json",
+            ),
+        )
+
+    def test_delete_team(self):
+        def team(size):
+            self.team = Team.objects.create(name=next(self.names))
+            self.user.team = self.team
+            self.user.save()
+            self.grow_members(size)
+            self.grow_projects(size)
+            return self.team
+
+        self.addCleanup(self.detach_from_deleted_teams)
+        self.assertQueryBudget(
+            TEAM,
+            "DELETE",
+            team,
+            lambda team: self.client.delete(self.url(TEAM, team.id)),
+        )
+
+    def detach_from_deleted_teams(self):
+        """Remove the rows a team delete leaves pointing at the team."""
+        teams = Team.objects.values("id")
+        get_user_model().objects.exclude(team__in=teams).update(team=None)
+        Issue.objects.exclude(team__in=teams).delete()
+        IssueTombstone.objects.exclude(team__in=teams).delete()
+        Project.objects.exclude(team__in=teams).delete()
+
+    def test_issue_stats(self):
+        self.assertQueryBudget(
+            "tracker:stats-list",
+            "GET",
+            self.grow_issues,
+            lambda _: self.client.get(self.url("tracker:stats-list")),
+        )
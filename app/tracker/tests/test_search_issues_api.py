@@ -0,0 +1,115 @@
+"""
+Test the issue search API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Issue, Team
+
+SEARCH_URL = reverse("tracker:issue-search")
+
+
+def create_user(email="user@example.com", password="testpass123", **params):
+    """Create and return a sample user."""
+    return get_user_model().objects.create_user(
+        email=email, password=password, **params
+    )
+
+
+class SearchIssueAPITests(TestCase):
+    """Test searching a team's issues."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(team=self.team)
+        self.client.force_authenticate(self.user)
+
+    def create_issue(self, title, description="", team=None):
+        """Create and return an issue for the team."""
+        return Issue.objects.create(
+            title=title, description=description, team=team or self.team
+        )
+
+    def test_search_matches_title_and_description(self):
+        """Test issues match on words in the title or description."""
+        in_title = self.create_issue("Login page crashes")
+        in_description = self.create_issue("Broken", "The login form fails")
+        self.create_issue("Unrelated")
+
+        res = self.client.get(SEARCH_URL, {"q": "login"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [issue["id"] for issue in res.data["results"]]
+        self.assertEqual(ids, [in_title.id, in_description.id])
+
+    def test_search_uses_stemming(self):
+        """Test different forms of a word match each other."""
+        issue = self.create_issue("Export crashed on save")
+
+        res = self.client.get(SEARCH_URL, {"q": "crashes"})
+
+        self.assertEqual(
+            [found["id"] for found in res.data["results"]], [issue.id]
+        )
+
+    def test_search_reflects_updated_title(self):
+        """Test the search index follows title changes."""
+        issue = self.create_issue("Original wording")
+        issue.title = "Replacement wording"
+        issue.save()
+
+        res = self.client.get(SEARCH_URL, {"q": "replacement"})
+
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_search_limited_to_team(self):
+        """Test other teams' issues are never returned."""
+        other_team = Team.objects.create(name="Other Team")
+        self.create_issue("Secret login", team=other_team)
+
+        res = self.client.get(SEARCH_URL, {"q": "login"})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_search_paginated(self):
+        """Test search results are split into cursor pages."""
+        for n in range(3):
+            self.create_issue(f"Timeout number {n}")
+
+        res = self.client.get(SEARCH_URL, {"q": "timeout", "page_size": 2})
+        second = self.client.get(res.data["next"])
+
+        ids = [issue["id"] for issue in res.data["results"]]
+        ids += [issue["id"] for issue in second.data["results"]]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertIsNone(second.data["next"])
+
+    def test_search_ties_paged_by_keyset(self):
+        """Test equally ranked results are paged by id, not offset."""
+        issues = [self.create_issue("Timeout") for _ in range(5)]
+
+        res = self.client.get(SEARCH_URL, {"q": "timeout", "page_size": 2})
+        ids = [issue["id"] for issue in res.data["results"]]
+        with CaptureQueriesContext(connection) as queries:
+            while res.data["next"]:
+                res = self.client.get(res.data["next"])
+                ids += [issue["id"] for issue in res.data["results"]]
+
+        self.assertEqual(ids, [issue.id for issue in reversed(issues)])
+        self.assertFalse(
+            [q["sql"] for q in queries if "OFFSET" in q["sql"].upper()]
+        )
+
+    def test_search_requires_query(self):
+        """Test a search without terms is rejected."""
+        res = self.client.get(SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,139 @@
+"""
+Test sparse fieldsets on the tracker APIs.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Issue, Project, Team
+
+ISSUES_URL = reverse("tracker:issue-list")
+TEAMS_URL = reverse("tracker:team-list")
+
+
+def issue_detail_url(issue_id):
+    """Return issue detail URL."""
+    return reverse("tracker:issue-detail", args=[issue_id])
+
+
+def project_detail_url(project_id):
+    """Return project detail URL."""
+    return reverse("tracker:project-detail", args=[project_id])
+
+
+class SparseFieldsetTests(TestCase):
+    """Test the `fields` and `omit` query parameters."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", team=self.team
+        )
+        self.project = Project.objects.create(
+            team=self.team, name="Sample Project"
+        )
+        self.issue = Issue.objects.create(
+            title="Sample Issue",
+            description="Sample Description",
+            status="Open",
+            project=self.project,
+            team=self.team,
+            created_by=self.user,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_issues_with_fields(self):
+        """Test only the requested fields are returned, in serializer order."""
+        res = self.client.get(ISSUES_URL, {"fields": "status,id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(res.data["results"][0]), ["id", "title", "status"]
+        )
+
+    def test_list_issues_with_omit(self):
+        """Test omitted fields are left out."""
+        res = self.client.get(
+            ISSUES_URL, {"omit": "description,team,comment_count"}
+        )
+
+        self.assertEqual(
+            list(res.data["results"][0]),
+            ["id", "title", "status", "project", "created_at"],
+        )
+
+    def test_unknown_fields_are_ignored(self):
+        """Test names that are not serializer fields are ignored."""
+        res = self.client.get(ISSUES_URL, {"fields": "id,password"})
+
+        self.assertEqual(res.data["results"], [{"id": self.issue.id}])
+
+    def test_sparse_issue_list_narrows_select(self):
+        """Test a sparse list skips the team join and unrequested columns."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ISSUES_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("core_team", sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_sparse_issue_list_pages_by_ordering_field(self):
+        """Test the cursor still works when ordering on an omitted field."""
+        Issue.objects.create(title="Second", team=self.team)
+        res = self.client.get(
+            ISSUES_URL,
+            {"fields": "id", "ordering": "-updated_at", "page_size": 1},
+        )
+        with self.assertNumQueries(1):
+            next_res = self.client.get(res.data["next"])
+
+        self.assertEqual(next_res.data["results"], [{"id": self.issue.id}])
+
+    def test_retrieve_issue_with_fields(self):
+        """Test the detail view honours sparse fieldsets."""
+        res = self.client.get(
+            issue_detail_url(self.issue.id), {"fields": "id,assigned_to"}
+        )
+
+        self.assertEqual(res.data, {"id": self.issue.id, "assigned_to": None})
+
+    def test_write_ignores_sparse_fieldsets(self):
+        """Test sparse parameters cannot drop submitted data on writes."""
+        url = issue_detail_url(self.issue.id) + "?fields=id"
+        res = self.client.patch(url, {"title": "Changed"})
+
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.title, "Changed")
+        self.assertEqual(res.data["title"], "Changed")
+
+    def test_project_detail_omit_issues_skips_prefetch(self):
+        """Test omitting issues skips loading them."""
+        url = project_detail_url(self.project.id)
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as sparse:
+            res = self.client.get(url, {"omit": "issues"})
+
+        self.assertNotIn("issues", res.data)
+        self.assertEqual(len(sparse), len(full) - 1)
+
+    def test_team_list_fields_skips_prefetches(self):
+        """Test listing teams without members or projects skips both."""
+        self.team.members.add(self.user)
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(TEAMS_URL)
+        with CaptureQueriesContext(connection) as sparse:
+            res = self.client.get(TEAMS_URL, {"fields": "id,name"})
+
+        self.assertEqual(
+            res.data["results"], [{"id": self.team.id, "name": "Sample Team"}]
+        )
+        self.assertEqual(len(sparse), len(full) - 2)
@@ -0,0 +1,121 @@
+"""
+Test the team API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Project, Team
+
+from tracker.serializers import TeamSerializer
+
+TEAMS_URL = reverse("tracker:team-list")
+
+
+def detail_url(team_id):
+    """Return team detail URL."""
+    return reverse("tracker:team-detail", args=[team_id])
+
+
+def create_user(email="user@example.com", password="testpass123"):
+    """Create and return a sample user."""
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+def create_team(user, **params):
+    """Create and return a sample team with the user as a member."""
+    defaults = {
+        "name": "Sample Team",
+    }
+    defaults.update(params)
+
+    team = Team.objects.create(**defaults)
+    team.members.add(user)
+    return team
+
+
+class PublicTeamAPITests(TestCase):
+    """Test the publically available team API."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_login_required(self):
+        """Test that login is required for retrieving teams."""
+        res = self.client.get(TEAMS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTeamAPITests(TestCase):
+    """Test the private team API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_retrieve_teams(self):
+        """Test retrieving teams for the authenticated user."""
+        create_team(user=self.user)
+        other_user = create_user(email="other@example.com")
+        create_team(user=other_user, name="Other Team")
+
+        res = self.client.get(TEAMS_URL)
+
+        teams = Team.objects.filter(members=self.user).order_by("-id")
+        serializer = TeamSerializer(teams, many=True)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertIsNone(res.data["next"])
+
+    def test_list_teams_query_count_is_constant(self):
+        """Test listing teams does not run a query per member or project."""
+        team = create_team(user=self.user)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(TEAMS_URL)
+
+        for n in range(5):
+            team.members.add(create_user(email=f"member{n}@example.com"))
+            Project.objects.create(team=team, name=f"Project {n}")
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(TEAMS_URL)
+
+        self.assertEqual(len(res.data["results"][0]["members"]), 6)
+        self.assertEqual(len(few), len(many))
+
+    def test_add_members(self):
+        """Test adding existing users to a team by id."""
+        team = create_team(user=self.user)
+        other = create_user(email="other@example.com")
+
+        res = self.client.patch(
+            detail_url(team.id), {"members": [other.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(team.members.filter(id=other.id).exists())
+
+    def test_add_unknown_members_rejected(self):
+        """Test adding member ids that do not exist returns a 400."""
+        team = create_team(user=self.user)
+        other = create_user(email="other@example.com")
+
+        res = self.client.patch(
+            detail_url(team.id),
+            {"members": [other.id, 9998, 9999]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["members"], ["Unknown user ids: 9998, 9999."]
+        )
+        self.assertFalse(team.members.filter(id=other.id).exists())
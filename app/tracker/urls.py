@@ -10,8 +10,14 @@ from tracker import views
 
 router = DefaultRouter()
 router.register("issues", views.IssueViewSet)
+router.register(
+    r"issues/(?P<issue_pk>[^/.]+)/comments",
+    views.CommentViewSet,
+    basename="issue-comment",
+)
 router.register("projects", views.ProjectViewSet)
 router.register("teams", views.TeamViewSet)
+router.register("stats", views.IssueStatsViewSet, basename="stats")
 
 app_name = "tracker"
 
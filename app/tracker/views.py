@@ -2,25 +2,61 @@
 Views for the tracker APIs.
 """
 
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Prefetch, Q
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
+
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from core.models import Issue, Team, Project
-from tracker import serializers
+from core.models import Comment, Issue, Team, Project, User
+from tracker import (
+    changes,
+    events,
+    outbox,
+    renderers,
+    serializers,
+    stats,
+)
+from tracker.pagination import CommentPagination, SearchPagination
+from tracker.changes import stamp
+from tracker.caching import (
+    TeamCachedResponseMixin,
+    TeamVersionedCacheMixin,
+    bump_team_version,
+)
+from tracker.mixins import CompiledListMixin, SparseQuerysetMixin
+from user.authentication import ExpiringTokenAuthentication
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(
+    SparseQuerysetMixin,
+    TeamVersionedCacheMixin,
+    CompiledListMixin,
+    viewsets.ModelViewSet,
+):
     """View for manage projects in tracker APIs."""
 
     serializer_class = serializers.ProjectDetailSerializer
     queryset = Project.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    prefetch_related_fields = {
+        "issues": Prefetch(
+            "issues", queryset=Issue.objects.only("id", "project_id")
+        ),
+    }
 
     def perform_create(self, serializer):
-        """Create a new project."""
-        serializer.save(team=[self.request.user])
+        """Create a new project in the user's team."""
+        serializer.save(team=self.request.user.team)
 
     def get_serializer_class(self):
         """Return appropriate serializer class."""
@@ -30,50 +66,454 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
     def get_queryset(self):
-        return self.queryset.filter(team__id=self.request.user.team.id)
+        """Retrieve projects for the authenticated user's team."""
+        queryset = self.queryset.filter(
+            team_id=self.request.user.team_id
+        ).order_by("-id")
+
+        return self.narrow_queryset(queryset)
 
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(
+    SparseQuerysetMixin,
+    TeamVersionedCacheMixin,
+    CompiledListMixin,
+    viewsets.ModelViewSet,
+):
     """View for manage issues in tracker APIs."""
 
+    export_columns = [
+        "id",
+        "title",
+        "description",
+        "status",
+        "project_id",
+        "assigned_to_id",
+        "created_by_id",
+        "created_at",
+        "updated_at",
+    ]
+
     serializer_class = serializers.IssueDetailSerializer
     queryset = Issue.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ["id", "created_at", "updated_at"]
+    ordering = ["-id"]
+    select_related_fields = {"team": "team"}
+
+    def team_id(self):
+        """Return the user's team id, refusing users without a team."""
+        team_id = self.request.user.team_id
+        if team_id is None:
+            raise PermissionDenied(
+                "User must be assigned to a team before viewing, "
+                "editing, or creating issues."
+            )
+        return team_id
 
     def get_queryset(self):
         """Retrieve issues for authenticated user."""
-        if self.request.user.team is not None:
-            return self.queryset.filter(
-                team__id=self.request.user.team.id
-            ).order_by("-id")
-        else:
-            raise PermissionError(
-                """User must be assigned to a team before viewing,
-                editing, or creating issues."""
-            )
+        queryset = self.narrow_queryset(
+            self.queryset.filter(team_id=self.team_id())
+            .defer("search_vector")
+            .order_by("-id")
+        )
+        if self.action in ("update", "partial_update"):
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
 
     def get_serializer_class(self):
         """Return appropriate serializer class."""
-        if self.action == "list":
+        if self.action in ("list", "search"):
             return serializers.IssueSerializer
 
         return self.serializer_class
 
     def perform_create(self, serializer):
         """Create a new issue."""
-        team = Team.objects.get(id=self.request.user.team.id)
-        serializer.save(created_by=self.request.user)
-        serializer.save(team=team)
+        # Atomic, so the outbox messages of a write commit with it.
+        with transaction.atomic():
+            serializer.save(
+                created_by=self.request.user, team_id=self.team_id()
+            )
+
+    def update(self, request, *args, **kwargs):
+        """Update an issue, locked from loading it to saving it.
+
+        The stats and notifications diff the saved issue against the
+        loaded one, so concurrent updates must not load the same state.
+        """
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        """Delete an issue and its comments."""
+        with transaction.atomic():
+            # One statement for all the comments, instead of the cascade
+            # loading them to send each one's delete signals, whose count
+            # and cache updates the issue's own deletion makes moot.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {Comment._meta.db_table} "
+                    "WHERE issue_id = %s",
+                    [instance.pk],
+                )
+            instance.delete()
+
+    def _bulk_items(self, items):
+        """Check a bulk payload is a list within the size limit."""
+        if not isinstance(items, list) or not items:
+            raise ValidationError("Expected a non-empty list of items.")
+        if len(items) > settings.TRACKER_BULK_MAX_ITEMS:
+            raise ValidationError(
+                f"At most {settings.TRACKER_BULK_MAX_ITEMS} items "
+                "can be sent in one request."
+            )
+        return items
+
+    def _bulk_context(self, items):
+        """Load every project and assignee referenced by the items."""
+
+        def referenced_ids(field):
+            ids = set()
+            for item in items:
+                try:
+                    ids.add(int(item[field]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            return ids
+
+        team_id = self.team_id()
+        projects = Project.objects.filter(
+            team_id=team_id, id__in=referenced_ids("project")
+        ).only("id", "team_id")
+        members = User.objects.filter(
+            team_id=team_id, id__in=referenced_ids("assigned_to")
+        ).only("id", "team_id")
+
+        return {
+            **self.get_serializer_context(),
+            "projects": {project.id: project for project in projects},
+            "members": {member.id: member for member in members},
+        }
+
+    def _bulk_response(self, results):
+        """Return 2xx when every item succeeded, else 207 Multi-Status."""
+        if all(result["status"] < 400 for result in results):
+            return Response(results, status=results[0]["status"])
+
+        return Response(results, status=status.HTTP_207_MULTI_STATUS)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[renderers.NDJSONRenderer, renderers.CSVRenderer],
+    )
+    def export(self, request):
+        """Stream every issue of the team as NDJSON or CSV.
+
+        Rows are read through a server-side cursor in chunks and written
+        out as they arrive, so memory use does not grow with the team.
+        """
+        rows = (
+            self.get_queryset()
+            .order_by("id")
+            .values_list(*self.export_columns)
+            .iterator(chunk_size=settings.TRACKER_EXPORT_CHUNK_SIZE)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(self.export_columns, rows),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="issues.{renderer.format}"'
+        )
+        return response
+
+    def search_queryset(self, terms):
+        """Return the team's issues matching terms, annotated with a rank.
+
+        PostgreSQL matches against the trigger-maintained `search_vector`
+        through its GIN index. Other backends fall back to icontains on
+        the title and description, ranked by recency.
+        """
+        queryset = self.get_queryset()
+        if connection.vendor != "postgresql":
+            return queryset.filter(
+                Q(title__icontains=terms) | Q(description__icontains=terms)
+            ).annotate(rank=Cast("id", FloatField()))
+
+        query = SearchQuery(terms, config="english", search_type="websearch")
+        # Ranks are cast to double precision so the cursor position
+        # round-trips exactly through its string form.
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        filter_backends=[],
+        pagination_class=SearchPagination,
+    )
+    def search(self, request):
+        """Search the team's issues by words in their title or description."""
+        terms = request.query_params.get("q", "").strip()
+        if not terms:
+            raise ValidationError({"q": ["This query parameter is required."]})
+
+        page = self.paginate_queryset(self.search_queryset(terms))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"], filter_backends=[])
+    def changes(self, request):
+        """Return the issues changed and deleted since the client's cursor.
+
+        Without a cursor the feed starts from `updated_since`, or from
+        the beginning for a full sync. Each response carries the cursor
+        for the next call; `has_more` says to call again right away.
+        """
+        serializer = serializers.IssueChangesQuerySerializer(
+            data=request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        if "cursor" in params:
+            positions = changes.decode_cursor(params["cursor"])
+        else:
+            positions = changes.start_positions(params.get("updated_since"))
+
+        changed, deleted, cursor, has_more = changes.next_page(
+            self.get_queryset(),
+            request.user.team_id,
+            positions,
+            params["page_size"],
+        )
+        return Response(
+            {
+                "results": self.get_serializer(changed, many=True).data,
+                "deleted": [issue_id for _, _, issue_id in deleted],
+                "cursor": cursor,
+                "has_more": has_more,
+            }
+        )
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request):
+        """Create (POST) or update (PATCH) a batch of issues."""
+        items = self._bulk_items(request.data)
+        context = self._bulk_context(
+            [item for item in items if isinstance(item, dict)]
+        )
+
+        if request.method == "POST":
+            return self._bulk_create(items, context)
+
+        return self._bulk_update(items, context)
+
+    def _bulk_validate(self, items, context, partial=False):
+        """Yield (index, validated data, errors) for every item.
+
+        One serializer validates every item, so its fields are built once
+        per batch rather than once per item.
+        """
+        serializer = serializers.BulkIssueSerializer(
+            context=context, partial=partial
+        )
+        for index, item in enumerate(items):
+            try:
+                yield index, serializer.run_validation(item), None
+            except ValidationError as exc:
+                yield index, None, exc.detail
+
+    def _bulk_create(self, items, context):
+        """Validate every item and insert the valid ones in one statement."""
+        team_id = self.team_id()
+        results, issues = [], []
+        for index, data, errors in self._bulk_validate(items, context):
+            if errors:
+                results.append(
+                    {"index": index, "status": 400, "errors": errors}
+                )
+                continue
 
+            issues.append(
+                Issue(
+                    team_id=team_id,
+                    created_by=self.request.user,
+                    **data,
+                )
+            )
+            results.append({"index": index, "status": 201})
+
+        with transaction.atomic():
+            issues = Issue.objects.bulk_create(issues, batch_size=500)
+            stats.record_issues_created(issues)
+            events.publish_issues(issues, events.CREATED)
+            assigned = {}
+            for issue in issues:
+                if issue.assigned_to is not None:
+                    assigned.setdefault(issue.assigned_to, []).append(issue)
+            outbox.notify_assigned(assigned.items())
+        created = iter(issues)
+        for result in results:
+            if result["status"] == 201:
+                result["id"] = next(created).id
+
+        bump_team_version(team_id)
+        return self._bulk_response(results)
+
+    def _lock_issues(self, team_id, ids):
+        """Lock the team's issues among ids and return their state.
+
+        Maps each id to its (team_id, project_id, status) rollup key and
+        assignee id. Locking keeps concurrent updates from recording the
+        same status change or assignment twice.
+        """
+        rows = (
+            Issue.objects.filter(team_id=team_id, id__in=ids)
+            .select_for_update()
+            .values_list(
+                "id", "team_id", "project_id", "status", "assigned_to"
+            )
+        )
+        return {row[0]: (row[1:4], row[4]) for row in rows}
+
+    def _new_assignment(self, changes, issues, existing):
+        """Return the assignee set by changes and the issues new to them.
+
+        `existing` is the state of the issues before the changes, as
+        returned by _lock_issues().
+        """
+        assignee = changes.get("assigned_to")
+        if assignee is None:
+            return None, []
+        return assignee, [
+            issue for issue in issues if existing[issue.pk][1] != assignee.pk
+        ]
+
+    def _bulk_update(self, items, context):
+        """Apply item changes with one UPDATE per distinct change set."""
+        team_id = self.team_id()
+        results, groups = [], {}
+        validated = self._bulk_validate(items, context, partial=True)
+        for (index, data, errors), item in zip(validated, items):
+            issue_id = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(issue_id, int):
+                errors = {"id": ["An integer id is required."]}
+            if errors:
+                results.append(
+                    {
+                        "index": index,
+                        "id": issue_id,
+                        "status": 400,
+                        "errors": errors,
+                    }
+                )
+                continue
+
+            changes = tuple(sorted(data.items()))
+            groups.setdefault(changes, []).append(issue_id)
+            results.append({"index": index, "id": issue_id, "status": 200})
 
-class TeamViewSet(viewsets.ModelViewSet):
+        requested = [issue_id for ids in groups.values() for issue_id in ids]
+        with transaction.atomic():
+            existing = self._lock_issues(team_id, requested)
+            with stamp() as now:
+                for changes, ids in groups.items():
+                    Issue.objects.filter(team_id=team_id, id__in=ids).update(
+                        updated_at=now, **dict(changes)
+                    )
+                    stats.record_issues_updated(
+                        [existing[pk][0] for pk in ids if pk in existing],
+                        dict(changes),
+                        now,
+                    )
+                issues = events.publish_issues(
+                    Issue.objects.filter(
+                        team_id=team_id, id__in=list(existing)
+                    )
+                )
+                by_id = {issue.pk: issue for issue in issues}
+                outbox.notify_assigned(
+                    self._new_assignment(
+                        dict(changes),
+                        [by_id[pk] for pk in ids if pk in by_id],
+                        existing,
+                    )
+                    for changes, ids in groups.items()
+                )
+
+        for result in results:
+            if result["status"] == 200 and result["id"] not in existing:
+                result["status"] = 404
+
+        bump_team_version(team_id)
+        return self._bulk_response(results)
+
+    @action(detail=False, methods=["post"], url_path="bulk/transition")
+    def bulk_transition(self, request):
+        """Move a batch of issues to a status and/or assignee at once."""
+        team_id = self.team_id()
+        context = self._bulk_context(
+            [request.data] if isinstance(request.data, dict) else []
+        )
+        serializer = serializers.IssueTransitionSerializer(
+            data=request.data, context=context
+        )
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        ids = self._bulk_items(changes.pop("ids"))
+
+        with transaction.atomic():
+            existing = self._lock_issues(team_id, ids)
+            with stamp() as now:
+                Issue.objects.filter(team_id=team_id, id__in=ids).update(
+                    updated_at=now, **changes
+                )
+                stats.record_issues_updated(
+                    [key for key, _ in existing.values()], changes, now
+                )
+                issues = events.publish_issues(
+                    Issue.objects.filter(
+                        team_id=team_id, id__in=list(existing)
+                    )
+                )
+                outbox.notify_assigned(
+                    [self._new_assignment(changes, issues, existing)]
+                )
+
+        bump_team_version(team_id)
+        return self._bulk_response(
+            [
+                {
+                    "id": issue_id,
+                    "status": 200 if issue_id in existing else 404,
+                }
+                for issue_id in ids
+            ]
+        )
+
+
+class TeamViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """View for manage teams in tracker APIs."""
 
     serializer_class = serializers.TeamDetailSerializer
     queryset = Team.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [ExpiringTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    prefetch_related_fields = {
+        "projects": Prefetch(
+            "projects", queryset=Project.objects.only("id", "team_id")
+        ),
+        "members": Prefetch(
+            "members", queryset=User.objects.only("id", "email", "team_id")
+        ),
+    }
 
     def get_serializer_class(self):
         """Return appropriate serializer class."""
@@ -84,8 +524,93 @@ class TeamViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Retrieve teams for authenticated user."""
-        return self.queryset.filter(members=self.request.user).order_by("-id")
+        return self.narrow_queryset(
+            self.queryset.filter(members=self.request.user).order_by("-id")
+        )
 
     def perform_create(self, serializer):
         """Create a new teams."""
         serializer.save(members=[self.request.user])
+
+
+class CommentViewSet(
+    SparseQuerysetMixin, TeamVersionedCacheMixin, viewsets.ModelViewSet
+):
+    """View for manage an issue's comments in tracker APIs."""
+
+    serializer_class = serializers.CommentSerializer
+    queryset = Comment.objects.all()
+    authentication_classes = [ExpiringTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = CommentPagination
+
+    def get_issue(self):
+        """Return the issue from the URL if it belongs to the user's team."""
+        if not hasattr(self, "_issue"):
+            if self.request.user.team_id is None:
+                raise PermissionDenied(
+                    "User must be assigned to a team before viewing, "
+                    "editing, or creating comments."
+                )
+            self._issue = get_object_or_404(
+                Issue.objects.only("id", "team_id"),
+                pk=self.kwargs["issue_pk"],
+                team_id=self.request.user.team_id,
+            )
+        return self._issue
+
+    def get_queryset(self):
+        """Retrieve the comments of the issue, oldest first."""
+        return self.narrow_queryset(
+            self.queryset.filter(issue=self.get_issue()).order_by(
+                "created_at", "id"
+            )
+        )
+
+    def perform_create(self, serializer):
+        """Create a comment and count it on its issue atomically."""
+        with transaction.atomic():
+            serializer.save(
+                issue=self.get_issue(), created_by=self.request.user
+            )
+
+    def perform_destroy(self, instance):
+        """Delete a comment and uncount it from its issue atomically."""
+        with transaction.atomic():
+            instance.delete()
+
+
+class IssueStatsViewSet(TeamCachedResponseMixin, viewsets.ViewSet):
+    """View for issue analytics in tracker APIs."""
+
+    authentication_classes = [ExpiringTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """Return daily opened, closed and backlog counts for the team.
+
+        Counts come from the daily rollups, so the cost depends on the
+        number of days requested rather than the number of issues.
+        """
+        return self.cached_response(self.daily, request)
+
+    def daily(self, request):
+        serializer = serializers.IssueStatsQuerySerializer(
+            data=request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        series = stats.daily_series(
+            request.user.team_id,
+            params["start"],
+            params["end"],
+            project_id=params.get("project"),
+        )
+        return Response(
+            {
+                "start": params["start"],
+                "end": params["end"],
+                "project": params.get("project"),
+                "days": series,
+            }
+        )
@@ -0,0 +1,275 @@
+"""
+Authentication for the API.
+"""
+
+import copy
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from core.models import AuthToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """Bounded LRU of resolved tokens whose entries expire after a TTL.
+
+    The cache is per process. Signals drop entries when a token, user or
+    team changes in this process; the TTL bounds how long other worker
+    processes can keep serving a stale entry.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Cache value under key, evicting the least recently used entry."""
+        expires_at = time.monotonic() + settings.TOKEN_AUTH_CACHE_TTL
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.TOKEN_AUTH_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        """Drop the entry for key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose (user, token) value matches predicate."""
+        with self._lock:
+            stale = [
+                key
+                for key, (_, value) in self._entries.items()
+                if predicate(*value)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def discard_users(self, user_ids):
+        """Drop the entries of the given users."""
+        user_ids = set(user_ids)
+        self.discard_where(lambda user, token: user.pk in user_ids)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LastUsedBuffer:
+    """Per-process record of token uses, written in one batch.
+
+    Writing `last_used_at` on every request would turn every read into a
+    write. Instead each process keeps the latest use of every token and
+    writes them all with one UPDATE once TOKEN_LAST_USED_FLUSH_SECONDS
+    have passed since the last write.
+    """
+
+    def __init__(self):
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def get(self, key):
+        """Return the buffered last use of a token, if any."""
+        with self._lock:
+            return self._uses.get(key)
+
+    def record(self, key, when):
+        """Record a use of a token, flushing the buffer when due."""
+        with self._lock:
+            self._uses[key] = when
+            due = (
+                time.monotonic() - self._flushed_at
+                >= settings.TOKEN_LAST_USED_FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered uses; returns the number of tokens."""
+        with self._lock:
+            uses, self._uses = self._uses, {}
+            self._flushed_at = time.monotonic()
+        if not uses:
+            return 0
+
+        values = ", ".join(["(%s, %s::timestamptz)"] * len(uses))
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {AuthToken._meta.db_table} AS token
+                    SET last_used_at = used.at
+                    FROM (VALUES {values}) AS used (key, at)
+                    WHERE token.key = used.key
+                        AND token.last_used_at < used.at
+                    """,
+                    [param for use in uses.items() for param in use],
+                )
+        except DatabaseError:
+            # Losing a few uses only shortens some sliding windows, so
+            # the request goes on; the next flush retries them.
+            logger.exception("Could not record %d token uses.", len(uses))
+            with self._lock:
+                for key, when in uses.items():
+                    self._uses[key] = max(self._uses.get(key, when), when)
+            return 0
+        return len(uses)
+
+    def clear(self):
+        """Drop every buffered use and restart the flush interval."""
+        with self._lock:
+            self._uses.clear()
+            self._flushed_at = time.monotonic()
+
+
+token_cache = TokenCache()
+last_used = LastUsedBuffer()
+
+
+def idle_cutoff(now=None):
+    """Return the last use before which a token has expired."""
+    return (now or timezone.now()) - datetime.timedelta(
+        days=settings.TOKEN_IDLE_DAYS
+    )
+
+
+def is_expired(token, now):
+    """Return whether a token went unused for the whole idle window."""
+    buffered = last_used.get(token.key)
+    used_at = token.last_used_at
+    if buffered is not None:
+        used_at = max(used_at, buffered)
+    return used_at < idle_cutoff(now)
+
+
+def obtain_token(user):
+    """Return a valid token of user, creating one if they have none."""
+    now = timezone.now()
+    token = (
+        AuthToken.objects.filter(user=user, last_used_at__gte=idle_cutoff(now))
+        .order_by("-last_used_at")
+        .first()
+    )
+    if token is None:
+        return AuthToken.objects.create(user=user, last_used_at=now)
+
+    last_used.record(token.key, now)
+    return token
+
+
+def purge_expired_tokens(batch_size):
+    """Delete expired tokens in batches; returns how many were deleted.
+
+    Tokens get a grace of two flush intervals, since uses still buffered
+    in the workers may not have been written yet.
+    """
+    cutoff = idle_cutoff() - datetime.timedelta(
+        seconds=2 * settings.TOKEN_LAST_USED_FLUSH_SECONDS
+    )
+    table = AuthToken._meta.db_table
+    deleted = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {table} WHERE key IN (
+                    SELECT key FROM {table} WHERE last_used_at < %s LIMIT %s
+                )
+                """,
+                [cutoff, batch_size],
+            )
+            deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the resolved user in memory.
+
+    The user is loaded together with its team, so views can read
+    `request.user.team` and `request.user.user_role` without querying.
+    A cache hit authenticates the request without touching the database.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related("user__team").get(
+                    key=key
+                )
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    _("User inactive or deleted.")
+                )
+
+            cached = (token.user, token)
+            token_cache.set(key, cached)
+
+        user, token = cached
+        # Every request gets its own copy so changes made while handling
+        # one request never leak into another through the cache.
+        return (copy.copy(user), token)
+
+
+class ExpiringTokenAuthentication(CachedTokenAuthentication):
+    """Cached authentication for tokens that expire when left unused.
+
+    A token expires TOKEN_IDLE_DAYS after its last use, and every use
+    moves that along. Expiry is checked against the cached token and the
+    uses buffered by this process, so a request still runs no queries. A
+    token that looks expired is reloaded once, in case another process
+    used it since it was cached.
+    """
+
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        now = timezone.now()
+        user, token = super().authenticate_credentials(key)
+        if is_expired(token, now):
+            token_cache.discard(key)
+            user, token = super().authenticate_credentials(key)
+            if is_expired(token, now):
+                raise exceptions.AuthenticationFailed(_("Token has expired."))
+
+        last_used.record(key, now)
+        return (user, token)
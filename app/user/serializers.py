@@ -7,8 +7,12 @@ from django.utils.translation import gettext as _
 
 from rest_framework import serializers
 
+from core.serializers import SparseFieldsetMixin, TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(
+    TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer
+):
     """Serializer for the user object."""
 
     team_name = serializers.StringRelatedField(
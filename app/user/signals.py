@@ -0,0 +1,29 @@
+"""
+Signal handlers keeping the token authentication cache consistent.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import AuthToken, Team, User
+from user.authentication import token_cache
+
+
+@receiver(post_delete, sender=AuthToken)
+def discard_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted."""
+    token_cache.discard(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def discard_changed_user(sender, instance, **kwargs):
+    """Reload a user whose details, role or team changed."""
+    token_cache.discard_users([instance.pk])
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def discard_changed_team(sender, instance, **kwargs):
+    """Reload the members of a team that changed."""
+    token_cache.discard_where(lambda user, token: user.team_id == instance.pk)
@@ -0,0 +1,201 @@
+"""
+Tests for the cached token authentication.
+"""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import AuthToken, Team
+from user.authentication import TokenCache, last_used, token_cache
+
+ME_URL = reverse("user:me")
+
+
+def create_user(**params):
+    """Create a user with the given parameters."""
+    return get_user_model().objects.create_user(**params)
+
+
+class TokenCacheTests(TestCase):
+    """Test the bounded token cache."""
+
+    @override_settings(TOKEN_AUTH_CACHE_SIZE=2)
+    def test_least_recently_used_entry_evicted(self):
+        """Test the cache never grows beyond its configured size."""
+        cache = TokenCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+    @override_settings(TOKEN_AUTH_CACHE_TTL=0)
+    def test_expired_entry_not_returned(self):
+        """Test entries are dropped once their TTL has passed."""
+        cache = TokenCache()
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating requests with cached tokens."""
+
+    def setUp(self):
+        token_cache.clear()
+        last_used.clear()
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = create_user(
+            email="user@example.com",
+            password="testpass123",
+            name="Test Name",
+            team=self.team,
+        )
+        self.token = AuthToken.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_cache_hit_runs_no_queries(self):
+        """Test a cached token reaches the view without auth queries."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["team_name"], self.team.name)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating immediately."""
+        self.client.get(ME_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_invalidates_cache(self):
+        """Test changing a user's role is visible on the next request."""
+        self.client.get(ME_URL)
+        self.user.user_role = "1"
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["user_role"], 1)
+
+    def test_team_change_invalidates_cache(self):
+        """Test renaming the user's team is visible on the next request."""
+        self.client.get(ME_URL)
+        self.team.name = "Renamed Team"
+        self.team.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["team_name"], "Renamed Team")
+
+    def test_inactive_user_rejected(self):
+        """Test a deactivated user can no longer authenticate."""
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ExpiringTokenAuthenticationTests(TestCase):
+    """Test tokens expire when left unused."""
+
+    def setUp(self):
+        token_cache.clear()
+        last_used.clear()
+        self.user = create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.token = AuthToken.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def age(self, days):
+        """Move the token's last use days into the past."""
+        used_at = timezone.now() - datetime.timedelta(days=days)
+        AuthToken.objects.filter(key=self.token.key).update(
+            last_used_at=used_at
+        )
+
+    def test_idle_token_rejected(self):
+        """Test a token unused for the idle window stops authenticating."""
+        self.age(31)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.data["detail"], "Token has expired.")
+
+    def test_buffered_use_keeps_token_alive(self):
+        """Test a use not yet written still counts against expiry."""
+        self.client.get(ME_URL)
+        self.age(31)
+        token_cache.clear()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_cached_token_reloaded_before_expiry(self):
+        """Test a use written by another process is seen before refusing."""
+        self.age(29)
+        self.client.get(ME_URL)
+        last_used.clear()
+        AuthToken.objects.filter(key=self.token.key).update(
+            last_used_at=timezone.now()
+        )
+
+        with self.settings(TOKEN_IDLE_DAYS=28):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_flush_writes_uses_in_one_query(self):
+        """Test the buffered uses of many tokens are written at once."""
+        self.age(10)
+        other = AuthToken.objects.create(user=self.user)
+        AuthToken.objects.filter(key=other.key).update(
+            last_used_at=timezone.now() - datetime.timedelta(days=10)
+        )
+        now = timezone.now()
+        last_used.record(self.token.key, now)
+        last_used.record(other.key, now)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(last_used.flush(), 2)
+
+        self.assertEqual(
+            set(AuthToken.objects.values_list("last_used_at", flat=True)),
+            {now},
+        )
+
+    @override_settings(TOKEN_LAST_USED_FLUSH_SECONDS=0)
+    def test_request_flushes_when_due(self):
+        """Test a request writes the buffered uses once the interval ends."""
+        self.age(10)
+
+        self.client.get(ME_URL)
+
+        self.token.refresh_from_db()
+        self.assertGreater(
+            self.token.last_used_at,
+            timezone.now() - datetime.timedelta(minutes=1),
+        )
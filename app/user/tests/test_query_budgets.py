@@ -0,0 +1,105 @@
+"""
+Test the user API runs a bounded number of queries per request.
+"""
+
+import itertools
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import AuthToken, Team
+from core.testing import QueryBudgetMixin
+
+CREATE = "user:create"
+TOKEN = "user:token"
+ME = "user:me"
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Test every user endpoint against its query budget."""
+
+    query_budget_namespace = "user"
+    query_budgets = {
+        (CREATE, "POST"): 2,
+        (TOKEN, "POST"): 2,
+        (ME, "GET"): 1,
+        (ME, "PUT"): 4,
+        (ME, "PATCH"): 2,
+    }
+
+    def setUp(self):
+        self.emails = (f"user{n}@example.com" for n in itertools.count())
+        self.team = Team.objects.create(name="Sample Team")
+        self.user = get_user_model().objects.create_user(
+            email=next(self.emails), password="testpass123", team=self.team
+        )
+        token = AuthToken.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def grow_members(self, size):
+        """Give the team `size` members."""
+        for _ in range(size - self.team.members.count()):
+            get_user_model().objects.create_user(
+                email=next(self.emails), password="testpass123", team=self.team
+            )
+
+    def test_create_user(self):
+        self.assertQueryBudget(
+            CREATE,
+            "POST",
+            self.grow_members,
+            lambda _: APIClient().post(
+                reverse(CREATE),
+                {
+                    "email": next(self.emails),
+                    "password": "testpass123",
+                    "name": "New User",
+                },
+            ),
+        )
+
+    def test_create_token(self):
+        self.assertQueryBudget(
+            TOKEN,
+            "POST",
+            self.grow_members,
+            lambda _: APIClient().post(
+                reverse(TOKEN),
+                {"email": self.user.email, "password": "testpass123"},
+            ),
+        )
+
+    def test_retrieve_profile(self):
+        self.assertQueryBudget(
+            ME,
+            "GET",
+            self.grow_members,
+            lambda _: self.client.get(reverse(ME)),
+        )
+
+    def test_update_profile(self):
+        self.assertQueryBudget(
+            ME,
+            "PUT",
+            self.grow_members,
+            lambda _: self.client.put(
+                reverse(ME),
+                {
+                    "email": self.user.email,
+                    "name": "Updated",
+                    "password": "newpass123",
+                },
+            ),
+        )
+
+    def test_partial_update_profile(self):
+        self.assertQueryBudget(
+            ME,
+            "PATCH",
+            self.grow_members,
+            lambda _: self.client.patch(reverse(ME), {"name": "Updated"}),
+        )
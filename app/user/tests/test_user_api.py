@@ -2,12 +2,17 @@
 Test for the user API
 """
 
+import datetime
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core.models import AuthToken
+
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
 ME_URL = reverse("user:me")
@@ -81,6 +86,39 @@ class PublicUserApiTests(TestCase):
         self.assertIn("token", res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_create_token_reuses_valid_token(self):
+        """Test logging in again returns the token still in use."""
+        create_user(email="testuser@example.com", password="test-pass-123")
+        payload = {
+            "email": "testuser@example.com",
+            "password": "test-pass-123",
+        }
+
+        first = self.client.post(TOKEN_URL, payload)
+        second = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(first.data["token"], second.data["token"])
+        self.assertEqual(AuthToken.objects.count(), 1)
+
+    def test_create_token_replaces_expired_token(self):
+        """Test an expired token is not handed out again."""
+        user = create_user(
+            email="testuser@example.com", password="test-pass-123"
+        )
+        expired = AuthToken.objects.create(
+            user=user,
+            last_used_at=timezone.now() - datetime.timedelta(days=31),
+        )
+        payload = {
+            "email": "testuser@example.com",
+            "password": "test-pass-123",
+        }
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data["token"], expired.key)
+
     def test_create_bad_credentials(self):
         """Test returns error with invalid credentials."""
         create_user(email="testuser@example.com", password="test-password-123")
@@ -136,6 +174,14 @@ class PrivateUserApiTests(TestCase):
             },
         )
 
+    def test_retrieve_profile_with_fields(self):
+        """Test retrieving only the requested profile fields."""
+        res = self.client.get(ME_URL, {"fields": "email,name"})
+
+        self.assertEqual(
+            res.data, {"email": self.user.email, "name": self.user.name}
+        )
+
     def test_post_me_not_allowed(self):
         """Test that POST is not allowed on the me URL."""
         res = self.client.post(ME_URL, {})
@@ -2,10 +2,12 @@
 Views for the user API.
 """
 
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
+from user.authentication import ExpiringTokenAuthentication, obtain_token
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -16,19 +18,25 @@ class CreateUserView(generics.CreateAPIView):
 
 
 class CreateTokenView(ObtainAuthToken):
-    """Create a new auth token."""
+    """Return the user's valid auth token, or create a new one."""
 
     serializer_class = AuthTokenSerializer
     renderer_classes = (
         api_settings.DEFAULT_RENDERER_CLASSES
     )  # we wouldn't get the browsable api for rest_framework UI
 
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = obtain_token(serializer.validated_data["user"])
+        return Response({"token": token.key})
+
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (ExpiringTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self, format=None):
@@ -0,0 +1,45 @@
+#########
+# Cache #
+#########
+
+# Shared by every worker of every task: response cache versions and
+# replica pins only work if a write is seen by all of them.
+
+resource "aws_elasticache_subnet_group" "main" {
+  name = "${local.prefix}-cache"
+  subnet_ids = [
+    aws_subnet.private_a.id,
+    aws_subnet.private_b.id
+  ]
+}
+
+resource "aws_security_group" "cache" {
+  description = "Allow access to the memcached cluster."
+  name        = "${local.prefix}-cache-inbound-access"
+  vpc_id      = aws_vpc.main.id
+
+  ingress {
+    protocol  = "tcp"
+    from_port = 11211
+    to_port   = 11211
+
+    security_groups = [
+      aws_security_group.ecs_service.id
+    ]
+  }
+
+  tags = {
+    Name = "${local.prefix}-cache-security-group"
+  }
+}
+
+resource "aws_elasticache_cluster" "main" {
+  cluster_id           = "${local.prefix}-cache"
+  engine               = "memcached"
+  node_type            = "cache.t4g.micro"
+  num_cache_nodes      = 1
+  parameter_group_name = "default.memcached1.6"
+  port                 = 11211
+  subnet_group_name    = aws_elasticache_subnet_group.main.name
+  security_group_ids   = [aws_security_group.cache.id]
+}
@@ -85,6 +85,14 @@ resource "aws_ecs_task_definition" "api" {
           {
             name  = "ALLOWED_HOSTS"
             value = aws_route53_record.app.fqdn
+          },
+          {
+            name  = "CACHE_BACKEND"
+            value = "django.core.cache.backends.memcached.PyMemcacheCache"
+          },
+          {
+            name  = "CACHE_LOCATION"
+            value = aws_elasticache_cluster.main.configuration_endpoint
           }
         ]
         mountPoints = [
@@ -196,6 +204,17 @@ resource "aws_security_group" "ecs_service" {
     ]
   }
 
+  # Memcached connectivity
+  egress {
+    from_port = 11211
+    to_port   = 11211
+    protocol  = "tcp"
+    cidr_blocks = [
+      aws_subnet.private_a.cidr_block,
+      aws_subnet.private_b.cidr_block,
+    ]
+  }
+
   # NFS Port for EFS volumes
   egress {
     from_port = 2049
@@ -43,8 +43,11 @@ resource "aws_lb_target_group" "api" {
   target_type = "ip"
   port        = 8000
 
+  # Liveness only: the readiness probe checks the database and cache,
+  # so a brief outage would fail every target at once. Readiness is for
+  # orchestrators deciding when a new task may take traffic.
   health_check {
-    path = "/api/health-check/"
+    path = "/api/health-check/live/"
   }
 }
 
@@ -9,6 +9,11 @@ server {
         alias /vol/media;
     }
 
+    # Prometheus scrapes the app containers directly.
+    location = /metrics {
+        deny                    all;
+    }
+
     location / {
         include                 gunicorn_headers;
         proxy_redirect          off;
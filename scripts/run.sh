@@ -2,8 +2,18 @@
 
 set -e
 
-python manage.py wait_for_db
-python manage.py collectstatic --noinput
-python manage.py migrate
+python manage.py boot
 
-gunicorn --bind :9000 --workers 4 app.wsgi
+# Workers share metrics through this directory; samples left by an
+# earlier run would be summed with the new ones.
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    rm -f "$PROMETHEUS_MULTIPROC_DIR"/*.db
+fi
+
+if [ "$SERVER_MODE" = "asgi" ]; then
+    gunicorn --bind :9000 --workers 4 \
+        --worker-class uvicorn.workers.UvicornWorker app.asgi
+else
+    gunicorn --bind :9000 --workers 4 app.wsgi
+fi